@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Auth Transforms
+The individual edits behind migrate-unprotected-routes.py and
+migrate_auth.py, written as content -> (content, hits) functions so the
+codemod engine can apply any ordered subset of them to one in-memory buffer.
+"""
+
+import re
+
+from ts_tokens import SourceFile
+
+# Admin routes that may be intentionally public and never get a guard
+PUBLIC_ADMIN_ROUTES = {
+    "login/route.ts",
+    "logout/route.ts",
+    "test-login/route.ts",
+    "debug-auth/route.ts",
+}
+
+ADMIN_IMPORT = "import { requireAdminAPI } from '@/lib/auth/guards'"
+ADMIN_GUARD = (
+    "\n    // ✅ SECURITY: Require admin authentication\n    const authResult = await requireAdminAPI({param})\n"
+    "    if (authResult.error) return authResult.error\n\n    const admin = authResult.data\n"
+)
+
+# Module of the old requireAdmin helper; guards.ts also exports a requireAdmin
+# (the page guard), which must be left alone
+OLD_REQUIRE_ADMIN_MODULE = "@/lib/auth/requireAdmin"
+
+# Old requireAdmin -> requireAdminAPI, applied in a single pass over the file
+REQUIRE_ADMIN_REPLACEMENTS = {
+    "from '@/lib/auth/requireAdmin'": "from '@/lib/auth/guards'",
+    "import { requireAdmin }": "import { requireAdminAPI }",
+    "const auth = await requireAdmin(": "const authResult = await requireAdminAPI(",
+    "auth.user!.id": "admin.id",
+    "auth.user.id": "admin.id",
+    "auth.profile?.full_name": "admin.email",
+    "auth.profile?.email": "admin.email",
+    "auth.profile.full_name": "admin.email",
+    "auth.profile.email": "admin.email",
+}
+REQUIRE_ADMIN_PATTERN = re.compile(
+    "|".join(re.escape(k) for k in sorted(REQUIRE_ADMIN_REPLACEMENTS, key=len, reverse=True))
+    + r"|(?P<check>if \(!auth\.authorized\) \{\s*return auth\.response!\s*\})"
+)
+REQUIRE_ADMIN_CHECK = "if (authResult.error) return authResult.error\n\n    const admin = authResult.data"
+# Properties of the old requireAdmin result; any left after the rewrite means an unhandled shape
+OLD_AUTH_PROPERTIES = frozenset(["authorized", "response", "user", "profile"])
+
+MECHANIC_GUARD = (
+    "\n    // ✅ SECURITY: Require mechanic authentication\n    const authResult = await requireMechanicAPI({param})\n"
+    "    if (authResult.error) return authResult.error\n\n    const mechanic = authResult.data\n"
+)
+
+MECHANIC_IMPORT_PATTERN = re.compile(r"(import.*from '@/lib/supabaseAdmin')")
+COOKIES_IMPORT_PATTERN = re.compile(r"import \{ cookies \} from 'next/headers'\n?")
+TOKEN_CHECK_PATTERN = re.compile(
+    r"const token = req\.cookies\.get\('aad_mech'\)\?\.value\s*\n\s*\n\s*if \(!token\) \{\s*\n\s*return NextResponse\.json\(\{ error: 'Not authenticated' \}, \{ status: 401 \}\)\s*\n\s*\}",
+    re.MULTILINE
+)
+SESSION_VALIDATION_PATTERN = re.compile(r"""// Validate session
+    const \{ data: session, error: sessionError \} = await supabaseAdmin
+      \.from\('mechanic_sessions'\)
+      \.select\('mechanic_id, expires_at'\)
+      \.eq\('token', token\)
+      \.single\(\)
+
+    if \(sessionError \|\| !session\) \{
+      return NextResponse\.json\(\{ error: 'Invalid session' \}, \{ status: 401 \}\)
+    \}
+
+    // Check if session is expired
+    if \(new Date\(session\.expires_at\) < new Date\(\)\) \{
+      return NextResponse\.json\(\{ error: 'Session expired' \}, \{ status: 401 \}\)
+    \}""", re.MULTILINE | re.DOTALL)
+# Simpler pattern for blocks formatted differently
+SESSION_VALIDATION_LOOSE_PATTERN = re.compile(r"\s*// Validate session.*?Session expired.*?\n\s*\}", re.DOTALL)
+
+# Bounded-time matching: the two patterns above that can backtrack across the
+# whole file (leading \s*, lazy .*? with no closing anchor, .* over a long
+# line) are only tried at occurrences of a literal anchor, and the session
+# pattern never looks more than MATCH_WINDOW characters past its anchor.
+# 0 restores plain full-file matching.
+MATCH_WINDOW = 8192
+SESSION_VALIDATION_ANCHOR = "// Validate session"
+SESSION_VALIDATION_TAIL_PATTERN = re.compile(r"// Validate session.*?Session expired.*?\n\s*\}", re.DOTALL)
+MECHANIC_IMPORT_ANCHOR = "from '@/lib/supabaseAdmin'"
+
+# Patterns that must only be used through the bounded helpers below
+BOUNDED_PATTERNS = {
+    "SESSION_VALIDATION_LOOSE_PATTERN", "SESSION_VALIDATION_TAIL_PATTERN", "MECHANIC_IMPORT_PATTERN"
+}
+
+
+def set_match_window(window):
+    """Set MATCH_WINDOW (also used as a process pool initializer)"""
+    global MATCH_WINDOW
+    MATCH_WINDOW = window
+
+def bounded_subn(pattern, repl, content, anchor, window, strip_before=False):
+    """
+    pattern.subn(repl, content), trying pattern only where the literal anchor
+    occurs and with matches limited to window characters. strip_before also
+    removes whitespace right before each match (stands in for a leading \\s*).
+    """
+    parts = []
+    pos = 0
+    hits = 0
+    start = content.find(anchor)
+    while start >= 0:
+        match = pattern.match(content, start, min(len(content), start + window))
+        if match is None:
+            start = content.find(anchor, start + 1)
+            continue
+        before = content[pos:start]
+        parts.append(before.rstrip() if strip_before else before)
+        parts.append(match.expand(repl))
+        pos = match.end()
+        hits += 1
+        start = content.find(anchor, pos)
+    if not hits:
+        return content, 0
+    parts.append(content[pos:])
+    return "".join(parts), hits
+
+def _guard_targets(source):
+    """(handler, parameter list "(") for every handler add_admin_guard should guard"""
+    targets = []
+    for handler in source.handlers():
+        if handler.wrapper or handler.open < 0:
+            continue
+
+        # Only calls made by the handler itself count, not ones in nested functions
+        calls = source.direct_calls(handler)
+        if 'requireAdminAPI' in calls or 'requireAdmin' in calls:
+            continue  # Already has auth
+
+        paren = source.parameters(handler)
+        if handler.param is None and not (paren >= 0 and source.partner[paren] == paren + 1):
+            continue  # Destructured first parameter: no request to pass
+        targets.append((handler, paren))
+    return targets
+
+def add_admin_import(content):
+    """
+    Import requireAdminAPI after the next/server import (after the last import
+    if there is none), plus NextRequest when a handler to guard takes no request
+    """
+    source = SourceFile(content)
+    imports = source.imports()
+    targets = _guard_targets(source)
+    if 'requireAdminAPI' in imports or not targets:
+        return content, 0
+    declarations = source.import_declarations()
+    next_server = next((d for d in declarations if d[2] == "next/server"), None)
+    anchor = next_server or (declarations[-1] if declarations else None)
+    lines = [ADMIN_IMPORT]
+    edits = []
+    if any(handler.param is None for handler, _ in targets) and 'NextRequest' not in imports:
+        if next_server is not None and source._is(next_server[0] + 1, "{"):
+            edits.append((source.tokens[next_server[0] + 1].end, " NextRequest,"))
+        else:
+            lines.insert(0, "import { NextRequest } from 'next/server'")
+    if anchor is None:
+        edits.append((0, "\n".join(lines) + "\n"))
+    else:
+        edits.append((source.tokens[anchor[1]].end, "".join("\n" + line for line in lines)))
+
+    for offset, text in sorted(edits, key=lambda edit: edit[0], reverse=True):
+        content = content[:offset] + text + content[offset:]
+    return content, 1
+
+def _insert_guards(source, content, targets, template, imports):
+    """Insert template at the top of each target handler; (content, handlers guarded)"""
+    inserts = []
+    guarded = 0
+    for handler, paren in targets:
+        param = handler.param
+        if param is None:
+            if 'NextRequest' not in imports:
+                continue
+            param = 'req'
+            inserts.append((source.tokens[paren].end, "req: NextRequest"))
+
+        guard = template.format(param=param)
+        try_start = source.leading_try(handler)
+        if try_start is not None:
+            inserts.append((try_start, guard))
+        else:
+            inserts.append((handler.body_start, guard.replace("\n    ", "\n  ")))
+        guarded += 1
+
+    for offset, text in sorted(inserts, key=lambda insert: insert[0], reverse=True):
+        content = content[:offset] + text + content[offset:]
+    return content, guarded
+
+def add_admin_guard(content):
+    """
+    Call requireAdminAPI with the handler's own request parameter at the top of
+    every exported handler that lacks it; a handler with no parameters gets
+    req: NextRequest. Nothing is inserted unless requireAdminAPI (and
+    NextRequest, where needed) is imported.
+    """
+    source = SourceFile(content)
+    imports = source.imports()
+    if 'requireAdminAPI' not in imports:
+        return content, 0
+    return _insert_guards(source, content, _guard_targets(source), ADMIN_GUARD, imports)
+
+def migrate_require_admin(content):
+    """
+    Migrate from old requireAdmin to requireAdminAPI. All or nothing: if any
+    requireAdmin reference or old auth.* property survives the rewrite (a call
+    shape other than `const auth = await requireAdmin(req)`), the file is left
+    as it was.
+    """
+    def replace(match):
+        if match.group("check"):
+            return REQUIRE_ADMIN_CHECK
+        return REQUIRE_ADMIN_REPLACEMENTS[match.group()]
+    migrated, hits = REQUIRE_ADMIN_PATTERN.subn(replace, content)
+    if not hits:
+        return content, 0
+    source = SourceFile(migrated)
+    tokens = source.tokens
+    for i, token in enumerate(tokens):
+        if token.kind != "ident" or source._is(i - 1, ".") or source._is(i - 1, "?."):
+            continue
+        if token.value == "requireAdmin":
+            return content, 0
+        if token.value == "auth" and source._is(i + 1, ".") and i + 2 < len(tokens) \
+                and tokens[i + 2].value in OLD_AUTH_PROPERTIES:
+            return content, 0
+    return migrated, hits
+
+def add_mechanic_import(content):
+    """Import requireMechanicAPI after the supabaseAdmin import"""
+    if 'requireMechanicAPI' in content:
+        return content, 0
+    replacement = r"\1\nimport { requireMechanicAPI } from '@/lib/auth/guards'"
+    if not MATCH_WINDOW:
+        return MECHANIC_IMPORT_PATTERN.subn(replacement, content, count=1)
+
+    # The first match is on the first line holding the anchor after an "import"
+    anchor = content.find(MECHANIC_IMPORT_ANCHOR)
+    while anchor >= 0:
+        line_start = content.rfind("\n", 0, anchor) + 1
+        line_end = content.find("\n", anchor)
+        line_end = len(content) if line_end < 0 else line_end
+        keyword = content.find("import", line_start, anchor)
+        if keyword >= 0:
+            match = MECHANIC_IMPORT_PATTERN.match(content, keyword, line_end)
+            return content[:keyword] + match.expand(replacement) + content[match.end():], 1
+        anchor = content.find(MECHANIC_IMPORT_ANCHOR, line_end)
+    return content, 0
+
+def _handlers_reading(source, needle):
+    """Handlers with a string literal containing needle in their code"""
+    tokens = source.tokens
+    return [
+        handler for handler in source.handlers()
+        if handler.open >= 0 and any(tokens[i].kind in ("string", "template") and needle in tokens[i].value
+                                     for i in range(handler.open + 1, handler.close))
+    ]
+
+def _mechanic_guarded(content, needle):
+    """True if every handler whose code mentions needle calls requireMechanicAPI itself"""
+    source = SourceFile(content)
+    return all('requireMechanicAPI' in source.direct_calls(h) for h in _handlers_reading(source, needle))
+
+def add_mechanic_guard(content):
+    """
+    Call requireMechanicAPI (binding `mechanic`) at the top of every handler
+    that reads the aad_mech cookie. All or nothing: if requireMechanicAPI isn't
+    imported or a handler already binds mechanic/authResult, nothing is
+    inserted, and the removals below leave the old checks in place.
+    """
+    source = SourceFile(content)
+    imports = source.imports()
+    if 'requireMechanicAPI' not in imports:
+        return content, 0
+    targets = []
+    for handler in _handlers_reading(source, 'aad_mech'):
+        if 'requireMechanicAPI' in source.direct_calls(handler):
+            continue
+        paren = source.parameters(handler)
+        if source.declares(handler, 'mechanic') or source.declares(handler, 'authResult') or (
+            handler.param is None and not (paren >= 0 and source.partner[paren] == paren + 1)
+        ):
+            return content, 0
+        targets.append((handler, paren))
+    if any(handler.param is None for handler, _ in targets) and 'NextRequest' not in imports:
+        return content, 0
+    return _insert_guards(source, content, targets, MECHANIC_GUARD, imports)
+
+def remove_cookies_import(content):
+    """Remove the next/headers cookies import if nothing else uses cookies()"""
+    if COOKIES_IMPORT_PATTERN.search(content) is None:
+        return content, 0
+    source = SourceFile(content)
+    if any(source._is(i, "cookies") and source._is(i + 1, "(") and not source._is(i - 1, ".")
+           for i in range(len(source.tokens))):
+        return content, 0
+    return COOKIES_IMPORT_PATTERN.subn("", content)
+
+def remove_token_check(content):
+    """Remove the aad_mech cookie token retrieval, once requireMechanicAPI replaces it"""
+    if "aad_mech" not in content or not _mechanic_guarded(content, 'aad_mech'):
+        return content, 0
+    return TOKEN_CHECK_PATTERN.subn("", content)
+
+def remove_session_validation(content):
+    """Remove the mechanic_sessions lookup and expiry check, once requireMechanicAPI replaces it"""
+    if SESSION_VALIDATION_ANCHOR not in content or not _mechanic_guarded(content, 'mechanic_sessions'):
+        return content, 0
+    content, hits = SESSION_VALIDATION_PATTERN.subn("", content)
+    if "Session expired" not in content:
+        return content, hits
+    if MATCH_WINDOW:
+        content, loose_hits = bounded_subn(
+            SESSION_VALIDATION_TAIL_PATTERN, "", content,
+            SESSION_VALIDATION_ANCHOR, MATCH_WINDOW, strip_before=True
+        )
+    else:
+        content, loose_hits = SESSION_VALIDATION_LOOSE_PATTERN.subn("", content)
+    return content, hits + loose_hits
+
+def rename_session_mechanic_id(content):
+    """
+    session.mechanic_id -> mechanic.id, only in code inside handlers whose own
+    mechanic_sessions lookup has been removed and that bind mechanic through
+    requireMechanicAPI
+    """
+    source = SourceFile(content)
+    spans = []
+    for handler in source.handlers():
+        if handler.open < 0 or source.declares(handler, "session"):
+            continue
+        if 'requireMechanicAPI' not in source.direct_calls(handler):
+            continue
+        spans.extend(source.member_accesses(handler, "session", "mechanic_id"))
+    for start, end in reversed(spans):
+        content = content[:start] + "mechanic.id" + content[end:]
+    return content, len(spans)
+
+# Transform groups, in the order they are applied to a file
+ADMIN_GUARD_TRANSFORMS = [
+    ("admin-import", add_admin_import),
+    ("admin-guard", add_admin_guard),
+]
+REQUIRE_ADMIN_TRANSFORMS = [
+    ("require-admin-api", migrate_require_admin),
+]
+MECHANIC_TRANSFORMS = [
+    ("mechanic-import", add_mechanic_import),
+    ("mechanic-guard", add_mechanic_guard),
+    ("cookies-import", remove_cookies_import),
+    ("token-check", remove_token_check),
+    ("session-validation", remove_session_validation),
+    ("mechanic-id", rename_session_mechanic_id),
+]
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Sequential Await Scan
+Finds runs of awaits in API route handlers that don't depend on each other
+(no await uses a name bound by an earlier one, and no two touch the same
+table when either writes) and could be batched with Promise.all. Routes are
+ranked by the round trips batching would save: awaits in the run minus the
+longest dependency chain through it. Guard calls (requireXxxAPI) and auth
+checks (an early return with status 401 or 403) end a run, so nothing is ever
+batched ahead of authentication. Other early-exit checks such as
+`if (error) return ...` and plain declarations don't end a run. Awaits
+inside loop bodies are counted separately.
+
+Route files come from route_scan.py, which also supplies each handler's
+guard status.
+
+Usage:
+  python await_scan.py                     # ranked table
+  python await_scan.py --min-saved 2
+  python await_scan.py --json-out awaits.json
+"""
+
+import argparse
+import json
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from route_scan import API_DIR, GUARDS, POOL_THRESHOLD, RouteScan, route_name
+from ts_tokens import SourceFile
+
+LOOP_KEYWORDS = frozenset(["for", "while", "do"])
+BLOCK_KEYWORDS = frozenset(["if", "else", "try", "catch", "finally", "for", "while", "do"])
+WRITE_METHODS = frozenset(["insert", "update", "upsert", "delete", "rpc"])
+DECLARE_KEYWORDS = frozenset(["const", "let", "var"])
+# Status codes that make an early-exit check an authentication check
+AUTH_STATUSES = frozenset(["401", "403"])
+
+
+class Step:
+    """One statement of a block, as far as batching is concerned"""
+
+    def __init__(self, kind, line, binds=(), uses=(), tables=(), writes=False):
+        self.kind = kind          # await, plain, check or barrier
+        self.line = line
+        self.binds = set(binds)
+        self.uses = set(uses)
+        self.tables = set(tables)
+        self.writes = writes
+
+
+class AwaitAnalyzer:
+    def __init__(self, text):
+        self.source = SourceFile(text)
+        self.tokens = self.source.tokens
+        self.text = text
+
+    def _line(self, i):
+        return self.text.count("\n", 0, self.tokens[i].start) + 1
+
+    def _is(self, i, value):
+        return self.source._is(i, value)
+
+    def _names(self, first, last):
+        """Identifiers read in first..last (property names after . skipped)"""
+        return {
+            self.tokens[i].value for i in range(first, last + 1)
+            if self.tokens[i].kind == "ident" and not (self._is(i - 1, ".") or self._is(i - 1, "?."))
+        }
+
+    def _bindings(self, first, last):
+        """Names bound by a declaration or destructuring pattern in first..last"""
+        names = set()
+        for i in range(first, last + 1):
+            token = self.tokens[i]
+            if token.kind == "ident" and token.value not in DECLARE_KEYWORDS and not self._is(i + 1, ":"):
+                names.add(token.value)
+        return names
+
+    def _tables(self, first, last):
+        tables = set()
+        writes = False
+        for i in range(first, last + 1):
+            if self._is(i, "from") and self._is(i + 1, "(") and self.tokens[i + 2].kind == "string":
+                tables.add(self.tokens[i + 2].value.strip("'\""))
+            elif self.tokens[i].value in WRITE_METHODS and self._is(i - 1, ".") and self._is(i + 1, "("):
+                writes = True
+        return tables, writes
+
+    def _awaits(self, first, last):
+        """"top", "nested" (inside brackets) or None: where await appears before any nested function"""
+        depth = 0
+        found = None
+        i = first
+        while i <= last:
+            token = self.tokens[i]
+            if self._is(i, "=>") or self._is(i, "function"):
+                return found
+            if token.kind == "punct" and token.value in "([{":
+                depth += 1
+            elif token.kind == "punct" and token.value in ")]}":
+                depth -= 1
+            elif token.kind == "ident" and token.value == "await":
+                if depth == 0:
+                    return "top"
+                found = "nested"
+            i += 1
+        return found
+
+    def _is_check(self, first, last):
+        """if (...) return/throw ... with no else and nothing else in its body"""
+        if not (self._is(first, "if") and self._is(first + 1, "(")):
+            return False
+        body = self.source.partner[first + 1] + 1
+        if self._is(body, "{"):
+            inner = self.source.statements(body)
+            return len(inner) == 1 and self.tokens[inner[0][0]].value in ("return", "throw") \
+                and self.source.partner[body] == last
+        return self.tokens[body].value in ("return", "throw")
+
+    def _is_auth_check(self, first, last):
+        return any(self.tokens[i].kind == "number" and self.tokens[i].value in AUTH_STATUSES
+                   for i in range(first, last + 1))
+
+    def step(self, first, last):
+        token = self.tokens[first]
+        line = self._line(first)
+        if token.value in BLOCK_KEYWORDS or self._is(first, "{") or token.value in ("return", "throw"):
+            if self._is_check(first, last) and self._awaits(first, last) is None \
+                    and not self._is_auth_check(first, last):
+                return Step("check", line, uses=self._names(first, last))
+            return Step("barrier", line)
+
+        where = self._awaits(first, last)
+        binds = ()
+        start = first
+        if token.value in DECLARE_KEYWORDS:
+            equals = next((i for i in range(first, last + 1) if self._is(i, "=")
+                           and not self._is(i + 1, "=") and not self._is(i - 1, "=")), None)
+            if equals is None:
+                return Step("plain", line, binds=self._bindings(first + 1, last))
+            binds = self._bindings(first + 1, equals - 1)
+            start = equals + 1
+        elif token.kind == "ident" and self._is(first + 1, "=") and not self._is(first + 2, "="):
+            binds = {token.value}
+            start = first + 2
+
+        if where == "top":
+            called = {self.tokens[i].value for i in range(start, last + 1)
+                      if self.tokens[i].kind == "ident" and self._is(i + 1, "(")}
+            if called & set(GUARDS) or any(name.startswith("require") for name in called):
+                return Step("barrier", line)
+            tables, writes = self._tables(start, last)
+            return Step("await", line, binds, self._names(start, last), tables, writes)
+        if where is not None:
+            return Step("barrier", line)
+        uses = self._names(start, last)
+        # A statement that may mutate what it touches binds everything it uses
+        return Step("plain", line, binds=set(binds) | (uses if not binds else set()), uses=uses)
+
+    def runs(self, open_):
+        """Yield the steps of each run in a block, then of the blocks nested in it"""
+        run = []
+        for first, last in self.source.statements(open_):
+            step = self.step(first, last)
+            if step.kind != "barrier":
+                run.append(step)
+                continue
+            yield run
+            run = []
+            yield from self._nested_runs(first, last)
+        yield run
+
+    def _nested_runs(self, first, last):
+        """Runs of the blocks inside a compound statement"""
+        in_loop = self.tokens[first].value in LOOP_KEYWORDS
+        i = first
+        while i <= last:
+            if self._is(i, "{") and self.source.partner[i] > 0:
+                keyword = self.tokens[i - 1].value
+                if keyword == ")" or keyword in BLOCK_KEYWORDS:
+                    for run in self.runs(i):
+                        if in_loop:
+                            self.loop_awaits += sum(1 for step in run if step.kind == "await")
+                        yield run
+                i = self.source.partner[i]
+            elif self._is(i, "(") and self.source.partner[i] > 0:
+                i = self.source.partner[i]
+            i += 1
+
+    def handler_report(self, handler):
+        """Awaits, round trips saved over all runs, and the run saving the most"""
+        self.loop_awaits = 0
+        best = (0, 0, None)
+        awaits = saved = 0
+        for run in self.runs(handler.open):
+            count, depth, line = chain(run)
+            awaits += count
+            saved += count - depth
+            if count - depth > best[0] - best[1]:
+                best = (count, depth, line)
+        return {
+            "method": handler.method,
+            "line": best[2],
+            "awaits": awaits,
+            "run_awaits": best[0],
+            "round_trips": best[1],
+            "saved": saved,
+            "loop_awaits": self.loop_awaits,
+        }
+
+
+def chain(run):
+    """(awaits, longest dependency chain in awaits, first await line) for one run"""
+    depths = []
+    awaits = 0
+    line = None
+    for i, step in enumerate(run):
+        depth = 0
+        for j in range(i):
+            earlier = run[j]
+            same_table = step.tables & earlier.tables and (step.writes or earlier.writes)
+            if earlier.binds & step.uses or same_table:
+                depth = max(depth, depths[j])
+        if step.kind == "await":
+            depth += 1
+            awaits += 1
+            line = line or step.line
+        depths.append(depth)
+    return awaits, max(depths, default=0), line
+
+def analyze_file(path):
+    """Per-handler await report for one route file"""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        analyzer = AwaitAnalyzer(f.read())
+    return [analyzer.handler_report(h) for h in analyzer.source.handlers() if h.open >= 0]
+
+def scan_awaits(api_dir, workers=None):
+    """(rows ranked by round trips saved, RouteScan)"""
+    scan = RouteScan(api_dir).run(workers)
+    relpaths = list(scan.routes)
+    paths = [str(Path(api_dir) / relpath) for relpath in relpaths]
+    if len(paths) >= POOL_THRESHOLD and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(analyze_file, paths, chunksize=16))
+    else:
+        results = [analyze_file(p) for p in paths]
+
+    rows = []
+    for relpath, handlers in zip(relpaths, results):
+        status = {h["method"]: h["status"] for h in scan.routes[relpath]}
+        for report in handlers:
+            rows.append({"route": route_name(relpath), "status": status.get(report["method"]), **report})
+    rows.sort(key=lambda r: (-r["saved"], -r["loop_awaits"], r["route"], r["method"]))
+    return rows, scan
+
+def print_table(rows):
+    width = max((len(r["route"]) for r in rows), default=10)
+    print(f"{'ROUTE':<{width}}  {'METHOD':<7} {'SAVED':>5} {'RUN':>4} {'CHAIN':>5} {'LOOP':>4}  LINE")
+    for r in rows:
+        print(f"{r['route']:<{width}}  {r['method']:<7} {r['saved']:>5} {r['run_awaits']:>4} "
+              f"{r['round_trips']:>5} {r['loop_awaits']:>4}  {r['line'] or ''}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank API routes by awaits that could be batched")
+    parser.add_argument("--api-dir", default=str(API_DIR), help="src/app/api directory")
+    parser.add_argument("--min-saved", type=int, default=1,
+                        help="only list handlers saving at least this many round trips")
+    parser.add_argument("--json-out", metavar="PATH", help="write every handler's report as JSON")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size")
+    args = parser.parse_args()
+
+    rows, scan = scan_awaits(args.api_dir, args.workers)
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=1)
+
+    listed = [r for r in rows if r["saved"] >= args.min_saved or (args.min_saved <= 1 and r["loop_awaits"])]
+    print_table(listed)
+
+    print("\n" + "=" * 60)
+    print("SEQUENTIAL AWAIT SUMMARY")
+    print("=" * 60)
+    print(f"Route files: {len(scan.routes)}  handlers: {len(rows)}")
+    print(f"Handlers with batchable awaits: {sum(1 for r in rows if r['saved'])}")
+    print(f"Round trips saved by batching: {sum(r['saved'] for r in rows)}")
+    print(f"Handlers awaiting inside loops: {sum(1 for r in rows if r['loop_awaits'])}")
+    print("=" * 60 + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Codemod Benchmark
+Generates a synthetic src/app/api tree of N route files (admin routes with
+and without guards, old requireAdmin routes, aad_mech mechanic routes, both
+quote styles, with and without try blocks), runs the route scan and every
+auth transform over it, and reports files/s, MB/s, peak memory and cost
+per transform. Results can be saved as a JSON baseline and later runs
+compared against it (exit 1 on regression).
+
+Usage:
+  python bench_codemods.py                          # 1k, 10k and 100k files
+  python bench_codemods.py --sizes 1000 10000
+  python bench_codemods.py --save-baseline          # record numbers
+  python bench_codemods.py --compare                # fail if slower than baseline
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+import auth_transforms
+from codemod import CHANGED, CodemodEngine, Job, plan_auth_migrations
+from route_scan import RouteScan
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BASELINE_PATH = Path(__file__).resolve().parent / ".codemod_bench_baseline.json"
+
+SIZES = (1000, 10000, 100000)
+
+# A run is a regression if throughput drops, or a transform gets slower, by more than this
+TOLERANCE = 0.25
+
+# Share of each route style in the corpus
+STYLES = [
+    ("admin-unguarded", 0.25),
+    ("admin-require-admin", 0.10),
+    ("admin-guarded", 0.20),
+    ("mechanic-cookie", 0.20),
+    ("mechanic-guarded", 0.10),
+    ("public", 0.15),
+]
+
+AREAS = ["sessions", "users", "workshops", "intakes", "plans", "claims", "fees", "analytics"]
+TABLES = ["profiles", "sessions", "mechanics", "workshops", "session_requests", "payments"]
+METHODS = ["GET", "POST", "PATCH", "DELETE"]
+
+COOKIE_BLOCK = """    const token = req.cookies.get('aad_mech')?.value
+
+    if (!token) {{
+      return NextResponse.json({{ error: 'Not authenticated' }}, {{ status: 401 }})
+    }}
+
+    // Validate session
+    const {{ data: session, error: sessionError }} = await supabaseAdmin
+      .from('mechanic_sessions')
+      .select('mechanic_id, expires_at')
+      .eq('token', token)
+      .single()
+
+    if (sessionError || !session) {{
+      return NextResponse.json({{ error: 'Invalid session' }}, {{ status: 401 }})
+    }}
+
+    // Check if session is expired
+    if (new Date(session.expires_at) < new Date()) {{
+      return NextResponse.json({{ error: 'Session expired' }}, {{ status: 401 }})
+    }}
+
+    const {{ data }} = await supabaseAdmin.from('{table}').select('*').eq('mechanic_id', session.mechanic_id)
+"""
+
+REQUIRE_ADMIN_BLOCK = """    const auth = await requireAdmin(req)
+    if (!auth.authorized) {{
+      return auth.response!
+    }}
+
+    const {{ data }} = await supabaseAdmin.from('{table}').update({{ reviewed_by: auth.user.id }}).eq('id', id)
+"""
+
+
+def _query_lines(rng, indent):
+    lines = []
+    for _ in range(rng.randint(2, 12)):
+        table = rng.choice(TABLES)
+        column = rng.choice(["id", "status", "created_at", "user_id"])
+        lines.append(f"{indent}const {{ data: {table}{len(lines)} }} = await supabaseAdmin.from('{table}')"
+                     f".select('*').eq('{column}', body.{column}).order('created_at')")
+    return "\n".join(lines) + "\n"
+
+def make_route(rng, style):
+    """Source text of one synthetic route file"""
+    quote = rng.choice(["'", '"'])
+    imports = [f"import {{ NextRequest, NextResponse }} from {quote}next/server{quote}"]
+    imports.append("import { supabaseAdmin } from '@/lib/supabaseAdmin'")
+    if style == "mechanic-cookie" and rng.random() < 0.5:
+        imports.append("import { cookies } from 'next/headers'")
+    if style == "admin-require-admin":
+        imports.append("import { requireAdmin } from '@/lib/auth/requireAdmin'")
+    if style in ("admin-guarded", "mechanic-guarded"):
+        guard = "requireAdminAPI" if style == "admin-guarded" else "requireMechanicAPI"
+        imports.append(f"import {{ {guard} }} from '@/lib/auth/guards'")
+
+    parts = ["\n".join(imports), "\nexport const dynamic = 'force-dynamic'\n"]
+    for method in rng.sample(METHODS, rng.randint(1, 3)):
+        use_try = rng.random() < 0.7
+        indent = "    " if use_try else "  "
+        body = ""
+        if style == "admin-guarded":
+            body += f"{indent}const authResult = await requireAdminAPI(req)\n{indent}if (authResult.error) return authResult.error\n\n"
+        elif style == "mechanic-guarded":
+            body += f"{indent}const authResult = await requireMechanicAPI(req)\n{indent}if (authResult.error) return authResult.error\n\n"
+        elif style == "mechanic-cookie":
+            body += COOKIE_BLOCK.format(table=rng.choice(TABLES))
+        elif style == "admin-require-admin":
+            body += REQUIRE_ADMIN_BLOCK.format(table=rng.choice(TABLES))
+        body += f"{indent}const body = await req.json().catch(() => ({{}}))\n"
+        body += _query_lines(rng, indent)
+        body += f"{indent}return NextResponse.json({{ ok: true, label: `{method} ${{body.id}}` }})\n"
+        if use_try:
+            body = (f"  try {{\n{body}  }} catch (error) {{\n    console.error('[{method}]', error)\n"
+                    f"    return NextResponse.json({{ error: 'Internal error' }}, {{ status: 500 }})\n  }}\n")
+        parts.append(f"export async function {method}(req: NextRequest) {{\n{body}}}\n")
+    return "\n".join(parts)
+
+def generate_corpus(root, count, seed=0):
+    """Write count route files below root/src/app/api; returns total bytes"""
+    rng = random.Random(seed)
+    api_dir = Path(root) / "src" / "app" / "api"
+    styles, weights = zip(*STYLES)
+    total = 0
+    for i in range(count):
+        style = rng.choices(styles, weights)[0]
+        if style.startswith("admin"):
+            folder = f"admin/{rng.choice(AREAS)}/r{i}"
+        elif style.startswith("mechanic"):
+            folder = f"mechanics/{rng.choice(AREAS)}/r{i}"
+        else:
+            folder = f"{rng.choice(AREAS)}/r{i}"
+        path = api_dir / folder / "route.ts"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = make_route(rng, style).encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(data)
+        total += len(data)
+    return total
+
+
+def peak_memory_mb():
+    """Peak RSS of this process in MB (each size runs in its own process), None if unknown"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return round(peak / (1e6 if sys.platform == "darwin" else 1e3), 1)
+
+def bench_in_subprocess(count, seed, keep):
+    """Run one size in a fresh interpreter so peak memory isn't shared between sizes"""
+    command = [sys.executable, __file__, "--run-one", str(count), "--seed", str(seed),
+               "--match-window", str(auth_transforms.MATCH_WINDOW)]
+    if keep:
+        command.append("--keep")
+    output = subprocess.run(command, check=True, stdout=subprocess.PIPE, text=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+class TimedTransform:
+    """Wraps a transform, accumulating its wall time and calls"""
+
+    def __init__(self, name, func, totals):
+        self.name = name
+        self.func = func
+        self.totals = totals
+
+    def __call__(self, content):
+        start = time.perf_counter()
+        result = self.func(content)
+        self.totals[self.name] += time.perf_counter() - start
+        return result
+
+def timed_plan(plan, totals):
+    wrapped = {}
+    for relpath, transforms in plan.items():
+        wrapped[relpath] = [(name, TimedTransform(name, func, totals)) for name, func in transforms]
+    return wrapped
+
+def run_codemods(api_dir, plan, dry_run):
+    engine = CodemodEngine(dry_run=dry_run, workers=1)
+    jobs = [Job(api_dir / relpath, transforms) for relpath, transforms in plan.items()]
+    changed = sum(1 for result in engine.run(jobs) if result.status == CHANGED)
+    return engine, changed
+
+def bench_size(count, seed, keep=False):
+    root = Path(tempfile.mkdtemp(prefix=f"codemod-bench-{count}-"))
+    try:
+        start = time.perf_counter()
+        total_bytes = generate_corpus(root, count, seed)
+        generate_seconds = time.perf_counter() - start
+        api_dir = root / "src" / "app" / "api"
+
+        # Cold scan, then every transform with real writes
+        start = time.perf_counter()
+        scan = RouteScan(api_dir, cache_path=root / "scan_cache.json").run(workers=1)
+        scan_seconds = time.perf_counter() - start
+
+        totals = Counter()
+        plan = timed_plan(plan_auth_migrations(scan), totals)
+        # Input size of the planned files, taken before the write phase rewrites them
+        planned_bytes = sum(os.path.getsize(api_dir / relpath) for relpath in plan)
+        start = time.perf_counter()
+        engine, changed = run_codemods(api_dir, plan, dry_run=False)
+        codemod_seconds = time.perf_counter() - start
+
+        calls = Counter()
+        for transforms in plan.values():
+            calls.update(name for name, _ in transforms)
+        return {
+            "files": count,
+            "bytes": total_bytes,
+            "generate_seconds": round(generate_seconds, 3),
+            "scan_seconds": round(scan_seconds, 3),
+            "scan_files_per_second": round(count / scan_seconds, 1),
+            "scan_mb_per_second": round(total_bytes / scan_seconds / 1e6, 2),
+            "codemod_files": len(plan),
+            "codemod_changed": changed,
+            "codemod_seconds": round(codemod_seconds, 3),
+            "codemod_files_per_second": round(len(plan) / codemod_seconds, 1) if plan else None,
+            "codemod_mb_per_second": round(planned_bytes / codemod_seconds / 1e6, 2) if plan else None,
+            "peak_memory_mb": peak_memory_mb(),
+            "hits": dict(engine.hits),
+            "transform_us_per_file": {
+                name: round(totals[name] / calls[name] * 1e6, 1) for name in sorted(calls)
+            },
+        }
+    finally:
+        if keep:
+            print(f"  corpus kept at {root}")
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+def compare(results, baseline):
+    """Regression messages for results against a saved baseline"""
+    problems = []
+    for size, current in results.items():
+        previous = baseline.get("sizes", {}).get(size)
+        if not previous:
+            continue
+        for key in ("scan_files_per_second", "codemod_files_per_second"):
+            if previous.get(key) and current.get(key) and current[key] < previous[key] * (1 - TOLERANCE):
+                problems.append(f"{size} files: {key} {current[key]} < baseline {previous[key]}")
+        for name, cost in current["transform_us_per_file"].items():
+            old = previous.get("transform_us_per_file", {}).get(name)
+            if old and cost > old * (1 + TOLERANCE):
+                problems.append(f"{size} files: {name} {cost} us/file > baseline {old}")
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the route codemods on a synthetic corpus")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="corpus sizes in files")
+    parser.add_argument("--seed", type=int, default=0, help="corpus random seed")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH), help="baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="write these results as the baseline")
+    parser.add_argument("--compare", action="store_true", help="exit 1 if slower than the baseline")
+    parser.add_argument("--match-window", type=int, default=auth_transforms.MATCH_WINDOW,
+                        help="bounded-time matching window (0 = match whole files)")
+    parser.add_argument("--keep", action="store_true", help="keep the generated corpora")
+    parser.add_argument("--run-one", type=int, metavar="N", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    auth_transforms.set_match_window(args.match_window)
+
+    if args.run_one:
+        print(json.dumps(bench_size(args.run_one, args.seed, args.keep)))
+        return
+
+    print("=" * 60)
+    print("CODEMOD BENCHMARK")
+    print("=" * 60)
+    results = {}
+    for count in args.sizes:
+        print(f"\n{count} files...")
+        r = bench_in_subprocess(count, args.seed, args.keep)
+        results[str(count)] = r
+        print(f"  corpus       {r['bytes'] / 1e6:8.1f} MB (generated in {r['generate_seconds']:.1f}s)")
+        print(f"  scan         {r['scan_files_per_second']:8.0f} files/s {r['scan_mb_per_second']:7.2f} MB/s")
+        if r["codemod_files"]:
+            print(f"  codemods     {r['codemod_files_per_second']:8.0f} files/s {r['codemod_mb_per_second']:7.2f} MB/s"
+                  f"  ({r['codemod_changed']} of {r['codemod_files']} planned files changed)")
+        if r["peak_memory_mb"] is not None:
+            print(f"  peak memory  {r['peak_memory_mb']:8.1f} MB (RSS)")
+        for name, cost in r["transform_us_per_file"].items():
+            print(f"    {name:<20} {cost:9.1f} us/file  {r['hits'].get(name, 0):>7} hits")
+
+    report = {"python": sys.version.split()[0], "match_window": args.match_window, "sizes": results}
+    status = 0
+    if args.compare:
+        try:
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        except (OSError, ValueError):
+            print(f"\n⚠ No baseline at {args.baseline}; run with --save-baseline first")
+            baseline = None
+        if baseline:
+            problems = compare(results, baseline)
+            for problem in problems:
+                print(f"✗ REGRESSION: {problem}")
+            if not problems:
+                print("\n✓ No regressions against the baseline")
+            status = 1 if problems else 0
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✓ Baseline saved to {args.baseline}")
+    print("=" * 60 + "\n")
+    sys.exit(status)
+
+if __name__ == "__main__":
+    main()
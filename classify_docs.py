@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Documentation Classifier
+Suggests a documentation/ category for root .md files that aren't in the
+reorganization plan, using a TF-IDF model built from the already-categorized
+docs. The model is cached on disk and only changed docs are re-read.
+
+Usage:
+  python classify_docs.py                 # classify unplanned root .md files
+  python classify_docs.py FILE.md ...     # classify specific files
+"""
+
+import argparse
+import json
+import math
+import re
+from collections import Counter
+from pathlib import Path
+
+from doc_plan import file_mapping
+from doc_snapshot import DirSnapshot
+
+# Base paths
+ROOT_PATH = Path("c:/Users/Faiz Hashmi/theautodoctor")
+DOC_PATH = ROOT_PATH / "documentation"
+
+# Model cache, stored inside documentation/
+CACHE_NAME = ".classifier_cache.json"
+
+CACHE_VERSION = 1
+
+# Categories are the numbered top-level folders (00-summaries-analysis ... 13-archived)
+CATEGORY_PATTERN = re.compile(r"^\d\d-[^/]+")
+
+TOKEN_PATTERN = re.compile(r"[a-z][a-z0-9]{2,}")
+
+# Filenames like STRIPE_PAYMENT_FIX_COMPLETE.md carry most of the signal
+FILENAME_WEIGHT = 5
+
+# Nearest categorized docs that vote on a category
+NEIGHBOURS = 7
+
+# Terms kept per cached doc (keeps the cache small without hurting ranking)
+MAX_TERMS_PER_DOC = 300
+
+STOPWORDS = frozenset("""
+the and for with this that from are was were have has had not but all any can
+will would should could into onto than then them they their there these those
+what when where which while who why how its our your you yes also been being
+only just more most some such very each other over under after before about
+md true false null const return import export function async await new
+""".split())
+
+
+def tokenize_line(line, counts):
+    """Add the tokens of one line to counts"""
+    for token in TOKEN_PATTERN.findall(line.lower()):
+        if token not in STOPWORDS:
+            counts[token] += 1
+
+def filename_terms(name):
+    """Tokens from a file name, e.g. DYNAMIC_PRICING_FIX.md -> dynamic, pricing, fix"""
+    counts = Counter()
+    tokenize_line(re.sub(r"[_\-.]+", " ", Path(name).stem), counts)
+    return counts
+
+def read_terms(path):
+    """Stream a file once and return its term counts (filename terms boosted)"""
+    counts = Counter()
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            tokenize_line(line, counts)
+    for term, n in filename_terms(Path(path).name).items():
+        counts[term] += n * FILENAME_WEIGHT
+    return counts
+
+def category_of(relpath):
+    """Top-level category for a path relative to documentation/, or None"""
+    match = CATEGORY_PATTERN.match(relpath)
+    return match.group(0) if match and "/" in relpath else None
+
+
+class DocClassifier:
+    """k-nearest-neighbour TF-IDF classifier over the documentation categories"""
+
+    def __init__(self, doc_path=None, cache_path=None):
+        self.doc_path = Path(doc_path or DOC_PATH)
+        self.cache_path = Path(cache_path or self.doc_path / CACHE_NAME)
+        self.docs = {}        # relpath -> {"size", "mtime", "terms"}
+        self.idf = {}
+        self.vectors = []     # (category, {term: weight}) per doc, unit length
+        self.reads = 0
+
+    def load_cache(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return
+        if cache.get("version") == CACHE_VERSION:
+            self.docs = cache["docs"]
+
+    def save_cache(self):
+        with open(self.cache_path, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "docs": self.docs}, f, separators=(",", ":"))
+
+    def refresh(self):
+        """Re-read only docs whose size or mtime changed; returns True if any did"""
+        snapshot = DirSnapshot(self.doc_path, recursive=True)
+        current = {
+            name: info for name, info in snapshot.files.items()
+            if name.endswith(".md") and category_of(name)
+        }
+
+        changed = False
+        for name in list(self.docs):
+            if name not in current:
+                del self.docs[name]
+                changed = True
+
+        for name, info in current.items():
+            cached = self.docs.get(name)
+            if cached and cached["size"] == info.size and cached["mtime"] == info.mtime:
+                continue
+            terms = read_terms(self.doc_path / name)
+            self.reads += 1
+            self.docs[name] = {
+                "size": info.size,
+                "mtime": info.mtime,
+                "terms": dict(terms.most_common(MAX_TERMS_PER_DOC))
+            }
+            changed = True
+        return changed
+
+    def build(self):
+        """Compute idf and doc vectors from the cached term counts"""
+        doc_freq = Counter()
+        for doc in self.docs.values():
+            doc_freq.update(doc["terms"].keys())
+        total = len(self.docs)
+        self.idf = {t: math.log((1 + total) / (1 + df)) + 1 for t, df in doc_freq.items()}
+
+        self.vectors = [
+            (category_of(name), self.vectorize(doc["terms"]))
+            for name, doc in self.docs.items()
+        ]
+
+    def vectorize(self, counts):
+        """Unit-length TF-IDF vector for a term-count mapping"""
+        vector = {
+            t: (1 + math.log(n)) * self.idf[t]
+            for t, n in counts.items() if t in self.idf
+        }
+        return _normalize(vector)
+
+    def categories(self):
+        return sorted({category for category, _ in self.vectors})
+
+    def classify(self, counts):
+        """Return (category, confidence, ranked [(category, score), ...])"""
+        vector = self.vectorize(counts)
+        similarities = sorted(
+            ((sum(w * other.get(t, 0.0) for t, w in vector.items()), category)
+             for category, other in self.vectors),
+            reverse=True
+        )[:NEIGHBOURS]
+
+        votes = Counter()
+        for similarity, category in similarities:
+            if similarity > 0:
+                votes[category] += similarity
+        ranked = votes.most_common()
+        if not ranked:
+            return None, 0.0, ranked
+        # Confidence is the winning category's share of the neighbours' votes
+        return ranked[0][0], ranked[0][1] / sum(votes.values()), ranked
+
+    def classify_file(self, path):
+        return self.classify(read_terms(path))
+
+def _normalize(vector):
+    norm = math.sqrt(sum(w * w for w in vector.values()))
+    return {t: w / norm for t, w in vector.items()} if norm else {}
+
+def load_classifier(doc_path=None, cache_path=None):
+    """Load the cached model, re-reading only changed docs, and build it"""
+    classifier = DocClassifier(doc_path, cache_path)
+    classifier.load_cache()
+    if classifier.refresh():
+        classifier.save_cache()
+    classifier.build()
+    return classifier
+
+def unplanned_root_files(root_snapshot):
+    """Root .md files that aren't in the reorganization plan"""
+    planned = {f for files in file_mapping.values() for f in files}
+    return sorted(n for n in root_snapshot.names(".md") if n not in planned)
+
+def main():
+    parser = argparse.ArgumentParser(description="Suggest categories for unplanned .md files")
+    parser.add_argument("files", nargs="*", help="files to classify (default: unplanned root .md files)")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    classifier = load_classifier()
+    files = args.files or [ROOT_PATH / n for n in unplanned_root_files(DirSnapshot(ROOT_PATH))]
+
+    results = []
+    for path in files:
+        category, confidence, _ = classifier.classify_file(path)
+        results.append({"file": Path(path).name, "category": category, "confidence": round(confidence, 3)})
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print("=" * 80)
+    print("DOCUMENT CLASSIFICATION")
+    print("=" * 80)
+    print(f"Model: {len(classifier.docs)} docs in {len(classifier.categories())} categories "
+          f"({classifier.reads} re-read)")
+    print()
+    for r in results:
+        print(f"   {r['file']} → {r['category']} ({r['confidence']:.2f})")
+    print()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Codemod Engine
+Reads each file once, applies an ordered list of transforms to the same
+in-memory buffer, and writes it back atomically (temp file + rename) only
+if the bytes changed. Hit counts are kept per transform.
+
+As a script it is the runner for the rules in codemod_rules/: one route
+scan decides which selected rules apply to each file, and only the
+selected rule modules are imported. The project root is the nearest
+directory above the current one that has src/app/api.
+
+Usage:
+  python codemod.py                # run every rule across src/app/api
+  python codemod.py --rule admin-guard --rule require-admin
+  python codemod.py --list-rules
+  python codemod.py --root PATH
+  python codemod.py --dry-run      # stream a unified diff instead of writing
+  python codemod.py --patch-out auth.patch
+  python codemod.py --trace trace.json --timings
+"""
+
+import argparse
+import difflib
+import os
+import sys
+import tempfile
+import time
+from collections import Counter, deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import codemod_rules
+import instrument
+from git_changes import add_incremental_arguments, incremental_from_args
+from route_scan import RouteScan
+
+
+def write_atomic(path, data):
+    """Replace path with data via a temp file in the same directory"""
+    path = str(path)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".codemod-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        try:
+            os.chmod(tmp, os.stat(path).st_mode & 0o7777)
+        except OSError:
+            pass
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+MISSING = "missing"
+SKIPPED = "skipped"
+UNCHANGED = "unchanged"
+CHANGED = "changed"
+
+# One file to process: transforms is a list of (name, transform) pairs, files
+# containing the text unless are skipped, label is the path shown in diffs
+Job = namedtuple("Job", ["path", "transforms", "unless", "label"], defaults=(None, None))
+Result = namedtuple("Result", ["job", "status", "hits", "diff"])
+
+
+def apply_transforms(content, transforms):
+    """Run transforms over content in order; returns (content, {name: hits})"""
+    hits = {}
+    for name, transform in transforms:
+        content, count = transform(content)
+        if count:
+            hits[name] = count
+    return content, hits
+
+def unified_diff(label, before, after):
+    """git-style unified diff of one file, applicable with git apply / patch -p1"""
+    lines = []
+    for line in difflib.unified_diff(
+        before.splitlines(keepends=True), after.splitlines(keepends=True),
+        f"a/{label}", f"b/{label}"
+    ):
+        if line.endswith("\n"):
+            lines.append(line)
+        else:
+            lines.append(line + "\n\\ No newline at end of file\n")
+    return f"diff --git a/{label} b/{label}\n" + "".join(lines)
+
+def process_file(job, dry_run=False, want_diff=False):
+    """One read, all transforms, at most one write; returns (status, hits, diff)"""
+    try:
+        with open(job.path, "rb") as f:
+            original = f.read()
+    except FileNotFoundError:
+        return MISSING, {}, None
+    if job.unless and job.unless.encode("utf-8") in original:
+        return SKIPPED, {}, None
+    before = original.decode("utf-8", "surrogateescape")
+    after, hits = apply_transforms(before, job.transforms)
+    data = after.encode("utf-8", "surrogateescape")
+    if data == original:
+        return UNCHANGED, {}, None
+    diff = unified_diff(job.label or str(job.path), before, after) if want_diff else None
+    if not dry_run:
+        write_atomic(job.path, data)
+    return CHANGED, hits, diff
+
+def _traced_process_file(job, dry_run, want_diff):
+    """process_file in a pool worker, plus its start time, duration and pid for the trace"""
+    start = time.perf_counter_ns()
+    result = process_file(job, dry_run, want_diff)
+    return result, start, time.perf_counter_ns() - start, os.getpid()
+
+
+class CodemodEngine:
+    """
+    Applies jobs to files, in a process pool when workers != 1. Results come
+    back in job order with at most a few jobs per worker in flight, and each
+    diff is streamed to diff_out as soon as its file is done.
+    """
+
+    def __init__(self, dry_run=False, diff_out=None, workers=1, initializer=None, initargs=()):
+        self.dry_run = dry_run
+        self.diff_out = diff_out
+        self.workers = workers
+        self.initializer = initializer
+        self.initargs = initargs
+        self.hits = Counter()
+        self.files_changed = 0
+        self.files_unchanged = 0
+        self.files_missing = 0
+        self.files_skipped = 0
+        # Report text goes to stderr while diffs are streamed to stdout
+        self.log_file = sys.stderr if diff_out is sys.stdout else sys.stdout
+
+    def log(self, *args):
+        print(*args, file=self.log_file)
+
+    def _record(self, job, status, hits, diff):
+        instrument.count(f"files.{status}")
+        if status == CHANGED:
+            self.files_changed += 1
+            self.hits.update(hits)
+            if diff and self.diff_out:
+                self.diff_out.write(diff)
+                self.diff_out.flush()
+        elif status == UNCHANGED:
+            self.files_unchanged += 1
+        elif status == SKIPPED:
+            self.files_skipped += 1
+        else:
+            self.files_missing += 1
+        return Result(job, status, hits, diff)
+
+    def run_file(self, path, transforms, unless=None, label=None):
+        """Process one file in this process; returns its Result"""
+        job = Job(path, transforms, unless, label)
+        with instrument.file_span(label or path):
+            result = process_file(job, self.dry_run, self.diff_out is not None)
+        return self._record(job, *result)
+
+    def run(self, jobs):
+        """Yield a Result per job, in order"""
+        jobs = list(jobs)
+        want_diff = self.diff_out is not None
+        if self.workers == 1 or len(jobs) < 2:
+            for job in jobs:
+                with instrument.file_span(job.label or job.path):
+                    result = process_file(job, self.dry_run, want_diff)
+                yield self._record(job, *result)
+            return
+
+        workers = self.workers or os.cpu_count() or 1
+        window = 4 * workers
+        # Workers time their own files; their syscall counters aren't collected
+        worker_func = _traced_process_file if instrument.enabled else process_file
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=workers, initializer=self.initializer,
+                                 initargs=self.initargs) as pool:
+            for job in jobs:
+                pending.append((job, pool.submit(worker_func, job, self.dry_run, want_diff)))
+                if len(pending) >= window:
+                    yield self._collect(*pending.popleft())
+            while pending:
+                yield self._collect(*pending.popleft())
+
+    def _collect(self, job, future):
+        result = future.result()
+        if instrument.enabled:
+            result, start, elapsed, pid = result
+            instrument.record(str(job.label or job.path), start, elapsed, "file", pid=pid, tid=pid)
+        return self._record(job, *result)
+
+    def close(self):
+        if self.diff_out not in (None, sys.stdout):
+            self.diff_out.close()
+
+    def report(self):
+        self.log("\n" + "=" * 60)
+        self.log("CODEMOD SUMMARY" + (" (dry run)" if self.dry_run else ""))
+        self.log("=" * 60)
+        for name, count in sorted(self.hits.items()):
+            self.log(f"{name:<22} {count:>5} hit(s)")
+        self.log(f"Files changed: {self.files_changed}")
+        self.log(f"Files unchanged: {self.files_unchanged}")
+        if self.files_skipped:
+            self.log(f"Files skipped: {self.files_skipped}")
+        if self.files_missing:
+            self.log(f"Files not found: {self.files_missing}")
+        self.log("=" * 60 + "\n")
+
+def add_engine_arguments(parser):
+    """--dry-run, --patch-out and --workers, shared by the codemod scripts"""
+    parser.add_argument("--dry-run", action="store_true",
+                        help="don't write files; stream a unified diff of each change to stdout")
+    parser.add_argument("--patch-out", metavar="PATH",
+                        help="don't write files; write every change to one patch file")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="process pool size (default: CPU count, 1 = no pool)")
+    instrument.add_trace_arguments(parser)
+
+def engine_from_args(args, initializer=None, initargs=()):
+    instrument.enable_from_args(args)
+    diff_out = None
+    if args.patch_out:
+        diff_out = open(args.patch_out, "w", encoding="utf-8", errors="surrogateescape", newline="")
+    elif args.dry_run:
+        diff_out = sys.stdout
+    return CodemodEngine(
+        dry_run=args.dry_run or bool(args.patch_out), diff_out=diff_out,
+        workers=args.workers, initializer=initializer, initargs=initargs
+    )
+
+
+def plan_rules(scan, rules):
+    """{relpath: [(name, transform), ...]} for every route at least one of rules applies to"""
+    plan = {}
+    for relpath, handlers in scan.routes.items():
+        transforms = []
+        for rule in rules:
+            if rule.applies(relpath, handlers):
+                transforms += rule.transforms
+        if transforms:
+            plan[relpath] = transforms
+    return plan
+
+def plan_auth_migrations(scan):
+    """plan_rules with every built-in rule"""
+    return plan_rules(scan, [codemod_rules.load(name) for name in codemod_rules.BUILTIN_RULES])
+
+def set_match_window(window):
+    """Override the auth transforms' matching window; None keeps their default without importing them"""
+    if window is not None:
+        import auth_transforms
+        auth_transforms.set_match_window(window)
+
+def find_project_root(start):
+    """Nearest directory at or above start with a src/app/api tree, or None"""
+    for path in [Path(start).resolve(), *Path(start).resolve().parents]:
+        if (path / "src" / "app" / "api").is_dir():
+            return path
+    return None
+
+def list_rules():
+    print("=" * 60)
+    print("CODEMOD RULES")
+    print("=" * 60)
+    for name, target in codemod_rules.available().items():
+        builtin = "" if name in codemod_rules.BUILTIN_RULES else "  (installed)"
+        print(f"  {name:<20} {target}{builtin}")
+    print("=" * 60 + "\n")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run codemod rules over the API routes in one pass per file")
+    parser.add_argument("--rule", action="append", metavar="NAME",
+                        help="rule to run (repeatable; default: every built-in rule)")
+    parser.add_argument("--list-rules", action="store_true", help="list built-in and installed rules and exit")
+    parser.add_argument("--root", help="project root (default: found from the current directory)")
+    parser.add_argument("--api-dir", help="src/app/api directory (default: under --root)")
+    parser.add_argument("--match-window", type=int,
+                        help="bounded-time matching window in characters (0 = match whole files; default: 8192)")
+    add_engine_arguments(parser)
+    add_incremental_arguments(parser)
+    args = parser.parse_args()
+    if args.list_rules:
+        list_rules()
+        return
+    set_match_window(args.match_window)
+
+    api_dir = args.api_dir
+    if api_dir is None:
+        root = Path(args.root) if args.root else find_project_root(Path.cwd())
+        if root is None:
+            parser.error("no src/app/api found at or above the current directory; pass --root or --api-dir")
+        api_dir = root / "src" / "app" / "api"
+    names = args.rule or list(codemod_rules.BUILTIN_RULES)
+    try:
+        with instrument.phase("load rules"):
+            rules = [codemod_rules.load(name) for name in names]
+    except KeyError as e:
+        parser.error(f"unknown rule {e} (see --list-rules)")
+
+    engine = engine_from_args(args, set_match_window, (args.match_window,))
+    scan = RouteScan(api_dir).run(args.workers)
+    with instrument.phase("plan"):
+        plan = plan_rules(scan, rules)
+    tracker, changes = incremental_from_args(args, "codemod", api_dir, engine.log)
+    if changes is not None:
+        plan = {relpath: plan[relpath] for relpath in changes.select(api_dir, plan)}
+
+    engine.log("=" * 60)
+    engine.log(f"CODEMODS: {', '.join(names)} ({len(plan)} of {len(scan.routes)} route files)")
+    engine.log("=" * 60 + "\n")
+
+    jobs = [
+        Job(Path(api_dir) / relpath, transforms, label=f"src/app/api/{relpath}")
+        for relpath, transforms in sorted(plan.items())
+    ]
+    with instrument.phase("codemods"):
+        for result in engine.run(jobs):
+            relpath = result.job.label[len("src/app/api/"):]
+            if result.status == CHANGED:
+                detail = ", ".join(f"{name} x{count}" for name, count in result.hits.items())
+                engine.log(f"✓ MIGRATED: {relpath} ({detail})")
+            elif result.status == MISSING:
+                engine.log(f"SKIP (not found): {relpath}")
+            else:
+                engine.log(f"SKIP (no changes): {relpath}")
+    engine.close()
+    engine.report()
+
+    if tracker is not None and not engine.dry_run:
+        tracker.advance()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Codemod Rules
+Registry of the rules codemod.py can run. A rule module is only imported
+when its rule is selected: the built-in table below and any installed
+distribution's "autodoctor.codemod_rules" entry points both map a rule
+name to a "module:attribute" target holding a Rule, and entry points are
+only read when a name isn't built in (or when listing every rule).
+"""
+
+import importlib
+from collections import namedtuple
+
+ENTRY_POINT_GROUP = "autodoctor.codemod_rules"
+
+# name -> "module:attribute", in the order rules are applied to a file
+BUILTIN_RULES = {
+    "admin-guard": "codemod_rules.admin_guard:RULE",
+    "require-admin": "codemod_rules.require_admin:RULE",
+    "mechanic-guard": "codemod_rules.mechanic_guard:RULE",
+}
+
+# applies(relpath, handlers) gets a route file relative to src/app/api and its
+# route_scan handlers; transforms is a list of (name, transform) pairs
+Rule = namedtuple("Rule", ["name", "description", "applies", "transforms"])
+
+_loaded = {}
+
+
+def _entry_points():
+    from importlib.metadata import entry_points
+    return {ep.name: ep.value for ep in entry_points(group=ENTRY_POINT_GROUP)}
+
+def available():
+    """{name: target} for every built-in and installed rule (nothing is imported)"""
+    rules = dict(BUILTIN_RULES)
+    for name, target in _entry_points().items():
+        rules.setdefault(name, target)
+    return rules
+
+def load(name):
+    """Import and return one rule; KeyError if no rule has that name"""
+    if name not in _loaded:
+        target = BUILTIN_RULES.get(name) or _entry_points()[name]
+        module, _, attr = target.partition(":")
+        rule = importlib.import_module(module)
+        for part in attr.split(".") if attr else ["RULE"]:
+            rule = getattr(rule, part)
+        _loaded[name] = rule
+    return _loaded[name]
@@ -0,0 +1,13 @@
+"""Add requireAdminAPI to admin routes with an unguarded handler"""
+
+from auth_transforms import ADMIN_GUARD_TRANSFORMS, PUBLIC_ADMIN_ROUTES
+from codemod_rules import Rule
+from route_scan import UNGUARDED
+
+
+def applies(relpath, handlers):
+    if not relpath.startswith("admin/") or relpath[len("admin/"):] in PUBLIC_ADMIN_ROUTES:
+        return False
+    return any(h["status"] == UNGUARDED for h in handlers)
+
+RULE = Rule("admin-guard", "requireAdminAPI at the top of unguarded admin handlers", applies, ADMIN_GUARD_TRANSFORMS)
@@ -0,0 +1,13 @@
+"""Replace aad_mech cookie/session checks in mechanic routes with requireMechanicAPI"""
+
+from auth_transforms import MECHANIC_TRANSFORMS
+from codemod_rules import Rule
+
+
+def applies(relpath, handlers):
+    if not relpath.startswith("mechanic"):
+        return False
+    guards = {h["guard"] for h in handlers}
+    return "aad_mech" in guards and "requireMechanicAPI" not in guards
+
+RULE = Rule("mechanic-guard", "aad_mech cookie auth -> requireMechanicAPI", applies, MECHANIC_TRANSFORMS)
@@ -0,0 +1,12 @@
+"""Migrate admin routes from the old requireAdmin helper to requireAdminAPI"""
+
+from auth_transforms import OLD_REQUIRE_ADMIN_MODULE, REQUIRE_ADMIN_TRANSFORMS
+from codemod_rules import Rule
+
+
+def applies(relpath, handlers):
+    return relpath.startswith("admin/") and any(
+        h["guard"] == "requireAdmin" and h.get("guard_from") == OLD_REQUIRE_ADMIN_MODULE for h in handlers
+    )
+
+RULE = Rule("require-admin", "old requireAdmin(req) checks -> requireAdminAPI", applies, REQUIRE_ADMIN_TRANSFORMS)
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Documentation Finder
+Shingles every .md file in the repo root and documentation/ once, builds a
+MinHash signature per file and buckets signatures with locality-sensitive
+hashing, so only likely duplicates are ever compared. Clusters are printed
+with the copies that look superseded suggested for 13-archived.
+
+Usage:
+  python dedupe_docs.py                   # report clusters (similarity >= 0.25)
+  python dedupe_docs.py --threshold 0.5   # stricter matching
+  python dedupe_docs.py --json            # machine-readable output
+"""
+
+import argparse
+import hashlib
+import json
+import re
+from collections import defaultdict
+from pathlib import Path
+
+from doc_snapshot import DirSnapshot
+
+# Base paths
+ROOT_PATH = Path("c:/Users/Faiz Hashmi/theautodoctor")
+DOC_PATH = ROOT_PATH / "documentation"
+
+ARCHIVE_FOLDER = "13-archived"
+
+# Words per shingle; rewritten reports share phrases rather than paragraphs
+SHINGLE_SIZE = 3
+
+# Minimums per signature; split into bands x rows for LSH (see lsh_shape)
+SIGNATURE_SIZE = 128
+
+HASH_BITS = 64
+BIN_WIDTH = (1 << HASH_BITS) // SIGNATURE_SIZE
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Names that usually mark the copy to keep
+PREFERRED_MARKERS = ("CORRECTED", "FINAL", "UPDATE")
+
+
+def shingle_hashes(path):
+    """Stream a file once and return the set of 64-bit hashes of its word shingles"""
+    hashes = set()
+    window = []
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            for word in WORD_PATTERN.findall(line.lower()):
+                window.append(word)
+                if len(window) > SHINGLE_SIZE:
+                    del window[0]
+                if len(window) == SHINGLE_SIZE:
+                    digest = hashlib.blake2b(" ".join(window).encode(), digest_size=8).digest()
+                    hashes.add(int.from_bytes(digest, "big"))
+    if not hashes and window:
+        # Short file: the whole text is one shingle
+        digest = hashlib.blake2b(" ".join(window).encode(), digest_size=8).digest()
+        hashes.add(int.from_bytes(digest, "big"))
+    return hashes
+
+def minhash(hashes):
+    """
+    One-permutation MinHash: split the hash space into SIGNATURE_SIZE bins and
+    keep the minimum of each, so a signature costs one hash per shingle
+    instead of one per shingle per permutation
+    """
+    signature = [None] * SIGNATURE_SIZE
+    for h in hashes:
+        b = h // BIN_WIDTH
+        if b >= SIGNATURE_SIZE:
+            b = SIGNATURE_SIZE - 1
+        if signature[b] is None or h < signature[b]:
+            signature[b] = h
+    # Densify: empty bins borrow from the next filled bin (rotating), which
+    # keeps signatures of similar documents aligned
+    filled = [i for i, v in enumerate(signature) if v is not None]
+    if not filled:
+        return None
+    for i in range(SIGNATURE_SIZE):
+        if signature[i] is None:
+            offset = 1
+            while signature[(i + offset) % SIGNATURE_SIZE] is None:
+                offset += 1
+            source = (i + offset) % SIGNATURE_SIZE
+            signature[i] = (signature[source] + offset * 0x9E3779B97F4A7C15) & ((1 << HASH_BITS) - 1)
+    return signature
+
+def estimated_similarity(a, b):
+    """Jaccard estimate from two signatures"""
+    return sum(1 for x, y in zip(a, b) if x == y) / SIGNATURE_SIZE
+
+def lsh_shape(threshold):
+    """
+    (bands, rows) whose LSH threshold (1/bands) ** (1/rows) sits comfortably
+    below the similarity threshold, so true matches are rarely missed while
+    unrelated pairs almost never share a bucket
+    """
+    shapes = [(SIGNATURE_SIZE // r, r) for r in range(1, SIGNATURE_SIZE + 1) if SIGNATURE_SIZE % r == 0]
+    target = threshold * 0.8
+    below = [(b, r) for b, r in shapes if (1 / b) ** (1 / r) <= target]
+    return max(below, key=lambda s: (1 / s[0]) ** (1 / s[1])) if below else shapes[0]
+
+def lsh_candidates(signatures, threshold):
+    """Pairs that share at least one band bucket"""
+    bands, rows = lsh_shape(threshold)
+    pairs = set()
+    for band in range(bands):
+        buckets = defaultdict(list)
+        start = band * rows
+        for name, signature in signatures.items():
+            buckets[tuple(signature[start:start + rows])].append(name)
+        for members in buckets.values():
+            if len(members) > 1:
+                members.sort()
+                for i, a in enumerate(members):
+                    for b in members[i + 1:]:
+                        pairs.add((a, b))
+    return pairs
+
+def cluster(pairs):
+    """Union-find over similar pairs; returns a list of sorted clusters"""
+    parent = {}
+
+    def find(x):
+        parent.setdefault(x, x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for a, b in pairs:
+        parent[find(a)] = find(b)
+
+    groups = defaultdict(list)
+    for x in parent:
+        groups[find(x)].append(x)
+    return sorted((sorted(g) for g in groups.values()), key=lambda g: (-len(g), g[0]))
+
+def pick_keeper(members, infos):
+    """The copy to keep: preferred marker in the name, then newest, then largest"""
+    def rank(name):
+        info = infos[name]
+        preferred = any(marker in name.upper() for marker in PREFERRED_MARKERS)
+        return (preferred, info.mtime, info.size)
+    return max(members, key=rank)
+
+def collect_docs(root_path, doc_path):
+    """{display name: (path, FileInfo)} for root and documentation/ .md files"""
+    docs = {}
+    root = DirSnapshot(root_path)
+    for name in root.names(".md"):
+        docs[name] = (root_path / name, root.get(name))
+    tree = DirSnapshot(doc_path, recursive=True)
+    for name, info in tree.files.items():
+        if name.endswith(".md"):
+            docs[f"documentation/{name}"] = (doc_path / name, info)
+    return docs
+
+def find_duplicates(root_path=None, doc_path=None, threshold=0.25):
+    """Return (clusters, similarity per pair, FileInfo per doc)"""
+    root_path = Path(root_path or ROOT_PATH)
+    doc_path = Path(doc_path or DOC_PATH)
+    docs = collect_docs(root_path, doc_path)
+
+    signatures = {}
+    for name, (path, _) in docs.items():
+        signature = minhash(shingle_hashes(path))
+        if signature is not None:
+            signatures[name] = signature
+
+    similar = {}
+    for a, b in lsh_candidates(signatures, threshold):
+        similarity = estimated_similarity(signatures[a], signatures[b])
+        if similarity >= threshold:
+            similar[(a, b)] = similarity
+
+    infos = {name: info for name, (_, info) in docs.items()}
+    return cluster(similar), similar, infos
+
+def main():
+    parser = argparse.ArgumentParser(description="Find near-duplicate markdown docs")
+    parser.add_argument("--threshold", type=float, default=0.25, help="minimum estimated similarity (default 0.25)")
+    parser.add_argument("--json", action="store_true", help="print clusters as JSON")
+    args = parser.parse_args()
+
+    clusters, similar, infos = find_duplicates(threshold=args.threshold)
+
+    report = []
+    for members in clusters:
+        keeper = pick_keeper(members, infos)
+        scores = [s for pair, s in similar.items() if pair[0] in members]
+        report.append({
+            "keep": keeper,
+            "archive": [m for m in members if m != keeper and f"/{ARCHIVE_FOLDER}/" not in m],
+            "members": members,
+            "min_similarity": round(min(scores), 2),
+        })
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print("=" * 80)
+    print("NEAR-DUPLICATE DOCUMENTS")
+    print("=" * 80)
+    print(f"Scanned {len(infos)} files, threshold {args.threshold:.2f}")
+    print()
+    for i, entry in enumerate(report, start=1):
+        print(f"Cluster {i} ({len(entry['members'])} files, similarity ≥ {entry['min_similarity']:.2f})")
+        for name in entry["members"]:
+            if name == entry["keep"]:
+                print(f"   ✓ keep      {name}")
+            elif name in entry["archive"]:
+                print(f"   → archive   {name}")
+            else:
+                print(f"   - archived  {name}")
+        print()
+
+    candidates = sum(len(e["archive"]) for e in report)
+    print(f"{len(report)} clusters, {candidates} files suggested for {ARCHIVE_FOLDER}")
+
+if __name__ == "__main__":
+    main()
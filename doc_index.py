@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Documentation Index Generator
+Rebuilds the category tables, file lists and counts in documentation/INDEX.md.
+Titles and first-paragraph summaries are cached by path+size+mtime (and by
+inode, so moved files are recognized), so only new or edited docs are opened
+on each run.
+
+Usage:
+  python doc_index.py            # regenerate documentation/INDEX.md
+  python doc_index.py --check    # exit 1 if INDEX.md is out of date
+"""
+
+import argparse
+import json
+import re
+import sys
+from collections import defaultdict
+from datetime import date
+from pathlib import Path
+
+from doc_snapshot import DirSnapshot
+
+# Base paths
+ROOT_PATH = Path("c:/Users/Faiz Hashmi/theautodoctor")
+DOC_PATH = ROOT_PATH / "documentation"
+
+INDEX_NAME = "INDEX.md"
+CACHE_NAME = ".index_cache.json"
+CACHE_VERSION = 2
+
+# Generated region of INDEX.md; the header and the Platform Overview are kept
+GENERATED_START = "## Quick Navigation"
+GENERATED_END = "## Platform Overview"
+
+# Lines scanned for a "# Title" heading, and for the summary paragraph, before giving up
+TITLE_SCAN_LINES = 40
+SUMMARY_SCAN_LINES = 80
+# Summaries longer than this are cut at a word boundary
+SUMMARY_CHARS = 160
+# Lines that are never summary prose: headings, **Field:** metadata, rules,
+# lists, tables, quotes, code fences and HTML
+NON_PROSE_PATTERN = re.compile(r"^(#|\*\*|---|___|[-*+] |\d+\. |\||>|```|~~~|<|!\[)")
+
+CATEGORY_PATTERN = re.compile(r"^\d\d-")
+NAV_ROW_PATTERN = re.compile(r"^\| \[([^\]]+)\]\([^)]*\) \| (.*?) \| \d+ \|$")
+
+
+def shorten(text):
+    if len(text) <= SUMMARY_CHARS:
+        return text
+    return text[:SUMMARY_CHARS].rsplit(" ", 1)[0].rstrip(",;:") + "…"
+
+def is_label(line):
+    return line.rstrip("*_ ").endswith(":")
+
+def read_doc(path):
+    """
+    (title, summary) of a markdown file, reading only the top of it: the first
+    "# " heading and the first prose paragraph after it
+    """
+    title = None
+    paragraph = []
+    fenced = False
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for i, line in enumerate(f):
+            line = line.strip()
+            if title is None:
+                if line.startswith("# "):
+                    title = line[2:].strip()
+                elif i >= TITLE_SCAN_LINES:
+                    break
+                continue
+            if line.startswith(("```", "~~~")):
+                fenced = not fenced
+            if fenced or not line or NON_PROSE_PATTERN.match(line):
+                # A lone "Label:" line introduces something else; keep looking
+                if paragraph and not is_label(paragraph[-1]):
+                    break
+                paragraph = []
+            else:
+                paragraph.append(line)
+            if i >= SUMMARY_SCAN_LINES:
+                break
+    if paragraph and is_label(paragraph[-1]):
+        paragraph = []
+    summary = shorten(" ".join(paragraph)) if paragraph else None
+    return title, summary
+
+def sort_key(name):
+    return name.casefold()
+
+
+class TitleCache:
+    """Titles and summaries keyed by path+size+mtime, with an inode fallback for moved files"""
+
+    def __init__(self, cache_path):
+        self.cache_path = cache_path
+        self.entries = {}
+        self.reads = 0
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+            if cache.get("version") == CACHE_VERSION:
+                self.entries = cache["entries"]
+        except (OSError, ValueError):
+            pass
+
+    def titles(self, doc_path, snapshot, names):
+        """(title, summary) for every name, opening only files the cache can't vouch for"""
+        by_inode = {(e["inode"], e["size"], e["mtime"]): e for e in self.entries.values()}
+        entries = {}
+        for name in names:
+            info = snapshot.get(name)
+            entry = self.entries.get(name)
+            if not (entry and entry["size"] == info.size and entry["mtime"] == info.mtime):
+                # A moved file keeps its inode, size and mtime
+                entry = by_inode.get((info.inode, info.size, info.mtime))
+            if entry is None:
+                title, summary = read_doc(doc_path / name)
+                entry = {"title": title, "summary": summary}
+                self.reads += 1
+            entries[name] = {
+                "size": info.size, "mtime": info.mtime, "inode": info.inode,
+                "title": entry["title"], "summary": entry["summary"]
+            }
+        changed = entries != self.entries
+        self.entries = entries
+        return {name: (e["title"], e["summary"]) for name, e in entries.items()}, changed
+
+    def save(self):
+        with open(self.cache_path, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "entries": self.entries}, f, separators=(",", ":"))
+
+def split_index(text):
+    """Split INDEX.md into (header, generated region, footer)"""
+    start = text.find(GENERATED_START)
+    end = text.find(GENERATED_END)
+    if start == -1:
+        return text.rstrip("\n") + "\n\n---\n\n", "", ""
+    if end == -1:
+        return text[:start], text[start:], ""
+    return text[:start], text[start:end], text[end:]
+
+def nav_descriptions(region):
+    """Hand-written category descriptions from the existing Quick Navigation table"""
+    descriptions = {}
+    for line in region.splitlines():
+        match = NAV_ROW_PATTERN.match(line)
+        if match:
+            descriptions[match.group(1)] = match.group(2)
+    return descriptions
+
+def link(name, title, summary=None):
+    entry = f"- [{name.rsplit('/', 1)[-1]}]({name})"
+    if title:
+        entry = f"{entry} - {title}"
+    return f"{entry} — {summary}" if summary else entry
+
+def render_region(names, titles, descriptions):
+    """Quick Navigation table plus one section per top-level folder"""
+    sections = defaultdict(lambda: defaultdict(list))
+    root_docs = []
+    for name in names:
+        parts = name.split("/")
+        if len(parts) == 1:
+            root_docs.append(name)
+        else:
+            sections[parts[0]]["/".join(parts[1:-1])].append(name)
+
+    categories = sorted(s for s in sections if CATEGORY_PATTERN.match(s))
+    others = sorted((s for s in sections if not CATEGORY_PATTERN.match(s)), key=sort_key)
+
+    lines = [
+        GENERATED_START, "",
+        "| Category | Description | File Count |",
+        "|----------|-------------|------------|"
+    ]
+    for category in categories:
+        count = sum(len(files) for files in sections[category].values())
+        lines.append(f"| [{category}](#{category}) | {descriptions.get(category, '')} | {count} |")
+    lines += ["", "---", ""]
+
+    for section in categories + others:
+        lines += [f"## {section}", ""]
+        for sub in sorted(sections[section], key=sort_key):
+            if sub:
+                lines += [f"### {sub}", ""]
+            for name in sorted(sections[section][sub], key=lambda n: sort_key(n.rsplit("/", 1)[-1])):
+                lines.append(link(name, *titles[name]))
+            lines.append("")
+        lines += ["---", ""]
+
+    lines += ["## Documentation Root", ""]
+    for name in sorted(root_docs, key=sort_key):
+        lines.append(link(name, *titles[name]))
+    lines += ["", "---", "", ""]
+    return "\n".join(lines)
+
+def build_index(doc_path=None, today=None, save_cache=True):
+    """Return (new INDEX.md text, old text, TitleCache); save_cache=False writes nothing"""
+    doc_path = Path(doc_path or DOC_PATH)
+    index_path = doc_path / INDEX_NAME
+    try:
+        old = index_path.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        old = "# Documentation Index\n\n**Total Documents:** 0\n"
+
+    snapshot = DirSnapshot(doc_path, recursive=True)
+    names = [n for n in snapshot.files if n.endswith(".md") and n != INDEX_NAME]
+
+    cache = TitleCache(doc_path / CACHE_NAME)
+    titles, cache_changed = cache.titles(doc_path, snapshot, names)
+    if cache_changed and save_cache:
+        cache.save()
+
+    header, region, footer = split_index(old)
+    text = header + render_region(names, titles, nav_descriptions(region)) + footer
+    text = re.sub(r"(\*\*Total Documents:\*\*) \d+", rf"\g<1> {len(names)}", text)
+
+    # Only bump the date when something else changed
+    if text != old:
+        stamp = (today or date.today()).isoformat()
+        text = re.sub(r"(\*\*Last Updated:\*\*) \d{4}-\d{2}-\d{2}", rf"\g<1> {stamp}", text)
+    return text, old, cache
+
+def update_index(doc_path=None):
+    """Regenerate INDEX.md, writing it only if it changed; returns True if written"""
+    doc_path = Path(doc_path or DOC_PATH)
+    text, old, cache = build_index(doc_path)
+    print(f"✓ Index: {cache.reads} file(s) read for titles and summaries")
+    if text == old:
+        return False
+    (doc_path / INDEX_NAME).write_text(text, encoding="utf-8")
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate documentation/INDEX.md")
+    parser.add_argument("--check", action="store_true", help="exit 1 if INDEX.md is out of date")
+    args = parser.parse_args()
+
+    if args.check:
+        text, old, _ = build_index(save_cache=False)
+        if text != old:
+            print("✗ documentation/INDEX.md is out of date (run python doc_index.py)")
+            sys.exit(1)
+        print("✓ documentation/INDEX.md is up to date")
+        return
+
+    if update_index():
+        print("✓ documentation/INDEX.md regenerated")
+    else:
+        print("✓ documentation/INDEX.md already up to date")
+
+if __name__ == "__main__":
+    main()
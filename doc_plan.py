@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Documentation Reorganization Plan
+Single source of truth for the file mapping, plus a compact JSON plan format
+that preview_reorganization.py writes and reorganize_docs.py --apply runs
+"""
+
+import json
+from collections import OrderedDict
+
+PLAN_VERSION = 1
+PLAN_FIELDS = ["source", "destination", "size", "mtime"]
+
+# File mapping
+file_mapping = {
+    "00-summaries-analysis": [
+        "BUSINESS_LOGIC_FINAL_REPORT.md",
+        "DEVELOPMENT_EFFORT_AND_COST_ANALYSIS.md",
+        "BREAK_EVEN_ANALYSIS_DETAILED.md",
+        "AUDIT_CLAIMS_FINAL_VERDICT.md",
+        "CODEBASE_AUDIT_REPORT.md",
+        "BUSINESS_LOGIC_ANALYSIS_AND_RECOMMENDATIONS.md",
+        "CODEBASE_AUDIT_REPORT_UPDATES.md",
+        "CODEBASE_AUDIT_REPORT_UPDATE_2025-11-08.md",
+        "DAILY_WORK_SUMMARY_2025-11-08.md",
+        "REPORT_GENERATION_VERIFICATION.md",
+        "STRIPE_CONNECT_PAYMENT_SPLITS_ANALYSIS.md",
+        "COMPREHENSIVE_FIX_PLAN.md",
+        "SCHEMA_ANALYSIS_PART1.md"
+    ],
+    "12-legal-compliance": [
+        "CUSTOMER_OWNERSHIP_LEGAL_ANALYSIS.md",
+        "LEGAL_COMPLIANT_DUAL_MODE_SOLUTION.md",
+        "WORKSHOP_MECHANICS_EXECUTIVE_REPORT.md",
+        "VIRTUAL_VS_WORKSHOP_MECHANICS_POLICY.md",
+        "WORKSHOP_MECHANIC_BUSINESS_MODEL.md",
+        "ACCOUNT_SEPARATION_EXPLANATION.md"
+    ],
+    "08-business-strategy/progress-reports": [
+        "IMPLEMENTATION_PROGRESS.md",
+        "IMPLEMENTATION_STATUS_AND_NEXT_STEPS.md",
+        "PHASE1_COMPLETE_NEXT_STEPS.md",
+        "PHASE4_ANALYSIS_REPORT.md",
+        "PHASE4_COMPLETE.md"
+    ],
+    "08-business-strategy/feature-roadmap": [
+        "FINAL_IMPLEMENTATION_PLAN.md",
+        "IMMEDIATE_ACTION_PLAN.md",
+        "FINAL_SEAMLESS_INTEGRATION_PLAN.md",
+        "WORKSHOP_IMPLEMENTATION_PLAN.md",
+        "SMART_WORKSHOP_SOLUTION.md",
+        "TRUST_BASED_WORKSHOP_SOLUTION.md",
+        "FINAL_REALISTIC_WORKSHOP_SOLUTION.md",
+        "ULTIMATE_MECHANIC_SELECTION_PLAN.md"
+    ],
+    "06-bug-fixes": [
+        "CRITICAL_BUGS_FOUND.md",
+        "BUGS_FIXED.md",
+        "COMPLETION_MODAL_FIX.md",
+        "VIDEO_SESSION_MECHANIC_NAME_BUG.md",
+        "VIDEO_SESSION_MECHANIC_NAME_FIX_APPLIED.md",
+        "TAGS_PANEL_MOBILE_UPDATE.md",
+        "PRIVACY_FIXES_IMPLEMENTED.md"
+    ],
+    "02-feature-documentation/inspection-controls": [
+        "PROFESSIONAL_INSPECTION_CONTROLS_PLAN.md",
+        "PROFESSIONAL_INSPECTION_CONTROLS_IMPLEMENTATION.md",
+        "INSPECTION_CONTROLS_BUGS_FIXED.md",
+        "INSPECTION_CONTROLS_ANALYSIS_AND_RECOMMENDATIONS.md",
+        "INSPECTION_CONTROLS_IMPLEMENTATION_REPORT.md",
+        "INSPECTION_CONTROLS_COMPREHENSIVE_UPDATE.md"
+    ],
+    "02-feature-documentation/session-management": [
+        "SESSION_END_LOGIC_INSPECTION_SUMMARY.md",
+        "SESSION_END_LOGIC_VERIFICATION_REPORT.md",
+        "SESSION_EXECUTION_ACTUAL_STATE_REPORT.md",
+        "SESSION_DYNAMIC_PRICING_UPDATE.md",
+        "SESSION_WIZARD_ENHANCEMENT_PLAN.md",
+        "SESSIONWIZARD_REDESIGN_PROPOSAL.md",
+        "SESSIONWIZARD_TESTING_PLAN.md"
+    ],
+    "02-feature-documentation/mechanic-matching": [
+        "MECHANIC_MATCHING_AUDIT.md",
+        "MECHANIC_MATCHING_ISSUES_AND_FIXES.md",
+        "MECHANIC_SELECTION_IMPLEMENTATION_SUMMARY.md",
+        "MECHANIC_SELECTION_COMPLETION_SUMMARY.md",
+        "MECHANIC_DASHBOARD_ACCESS_ANALYSIS.md",
+        "THREE_TIER_MECHANIC_TESTING_PLAN.md"
+    ],
+    "02-feature-documentation/customer-portal": [
+        "VEHICLE_ADD_FLOW_ANALYSIS.md",
+        "VEHICLE_ADD_IMPLEMENTATION_SUMMARY.md",
+        "CONTACT_INFO_PRIVACY_AUDIT.md",
+        "SIGNUP_FLOW_AUDIT_REPORT.md"
+    ],
+    "02-feature-documentation/admin-panel": [
+        "ADMIN_PLANS_CRUD_COMPLETE.md"
+    ],
+    "02-feature-documentation/pricing-system": [
+        "DYNAMIC_PRICING_TESTING_GUIDE.md",
+        "DYNAMIC_PRICING_IMPLEMENTATION_SUMMARY.md",
+        "DYNAMIC_PRICING_COMPLETE_REPORT.md",
+        "PLATFORM_FEE_IMPLEMENTATION_COMPLETE.md"
+    ],
+    "02-feature-documentation/mechanic-portal": [
+        "MECHANIC_REFERRAL_SYSTEM_IMPLEMENTATION.md"
+    ],
+    "11-migration-deployment": [
+        "MIGRATION_SETUP_GUIDE.md",
+        "MIGRATION_WORKFLOW_GUIDE.md",
+        "MIGRATION_SETUP_COMPLETE.md",
+        "MIGRATION_SYNC_SOLUTION.md",
+        "MANUAL_SYNC_PROCEDURE.md"
+    ],
+    "01-project-setup": [
+        "QUICK_START.md",
+        "DOCKER_SETUP_GUIDE.md"
+    ],
+    "05-testing-debugging": [
+        "TESTING_GUIDE.md"
+    ],
+    "11-migration-deployment/troubleshooting": [
+        "SUPABASE_CONNECTION_DIAGNOSIS.md"
+    ],
+    "13-archived": [
+        "RESUME_TOMORROW.md",
+        "PARTNERSHIP_SYSTEM_REMOVAL_COMPLETE.md",
+        "FINAL_STATUS_AND_RECOMMENDATIONS.md",
+        "FINAL_RECOMMENDATION.md"
+    ]
+}
+
+# Folders created before any moves (relative to documentation/)
+new_folders = [
+    "00-summaries-analysis",
+    "12-legal-compliance",
+    "13-archived",
+    "02-feature-documentation/inspection-controls",
+    "02-feature-documentation/mechanic-matching",
+    "02-feature-documentation/pricing-system",
+    "11-migration-deployment/troubleshooting"
+]
+
+# Progress headings printed by reorganize_docs.py and the categories each covers
+move_steps = [
+    ("Moving analysis and summary files", ["00-summaries-analysis"]),
+    ("Moving legal and compliance files", ["12-legal-compliance"]),
+    ("Moving business strategy files", [
+        "08-business-strategy/progress-reports",
+        "08-business-strategy/feature-roadmap"
+    ]),
+    ("Moving bug fix documentation", ["06-bug-fixes"]),
+    ("Moving feature documentation", [
+        "02-feature-documentation/inspection-controls",
+        "02-feature-documentation/session-management",
+        "02-feature-documentation/mechanic-matching",
+        "02-feature-documentation/customer-portal",
+        "02-feature-documentation/admin-panel",
+        "02-feature-documentation/pricing-system",
+        "02-feature-documentation/mechanic-portal"
+    ]),
+    ("Moving infrastructure and setup files", [
+        "11-migration-deployment",
+        "01-project-setup",
+        "05-testing-debugging",
+        "11-migration-deployment/troubleshooting",
+        "13-archived"
+    ])
+]
+
+def build_plan(root_snapshot):
+    """Build a plan from file_mapping using a DirSnapshot of the root"""
+    moves = []
+    missing = []
+    for category, files in file_mapping.items():
+        for filename in files:
+            info = root_snapshot.get(filename)
+            if info is None:
+                missing.append(filename)
+            else:
+                moves.append([filename, category, info.size, info.mtime])
+    return {
+        "version": PLAN_VERSION,
+        "fields": PLAN_FIELDS,
+        "moves": moves,
+        "missing": missing
+    }
+
+def write_plan(plan, path):
+    """Write a plan as compact JSON"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(plan, f, separators=(",", ":"))
+        f.write("\n")
+
+def load_plan(path):
+    """Load a plan written by write_plan"""
+    with open(path, "r", encoding="utf-8") as f:
+        plan = json.load(f)
+    if plan.get("version") != PLAN_VERSION:
+        raise ValueError(f"Unsupported plan version in {path}: {plan.get('version')}")
+    return plan
+
+def group_moves(plan):
+    """Plan moves grouped by destination, preserving plan order"""
+    groups = OrderedDict()
+    for source, destination, size, mtime in plan["moves"]:
+        groups.setdefault(destination, []).append((source, size, mtime))
+    return groups
+
+def diff_plans(old, new):
+    """Compare two plans; returns (added, removed, retargeted, changed) lists"""
+    old_moves = {m[0]: m for m in old["moves"]}
+    new_moves = {m[0]: m for m in new["moves"]}
+
+    added = [new_moves[s] for s in new_moves if s not in old_moves]
+    removed = [old_moves[s] for s in old_moves if s not in new_moves]
+    retargeted = []
+    changed = []
+    for source in new_moves.keys() & old_moves.keys():
+        before, after = old_moves[source], new_moves[source]
+        if before[1] != after[1]:
+            retargeted.append((source, before[1], after[1]))
+        elif before[2:] != after[2:]:
+            changed.append((source, before[2], after[2]))
+    return added, removed, sorted(retargeted), sorted(changed)
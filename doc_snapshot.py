@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Directory Snapshot
+Reads a directory once with os.scandir and answers existence/size questions
+from memory, shared by preview_reorganization.py and reorganize_docs.py
+"""
+
+import os
+from collections import namedtuple
+
+# Per-file entry stored in the snapshot index
+FileInfo = namedtuple("FileInfo", ["size", "mtime", "inode"])
+
+
+class DirSnapshot:
+    """name -> (size, mtime, inode) index of a directory, built in one pass"""
+
+    def __init__(self, root, recursive=False):
+        self.root = root
+        self.files = {}
+        self.dirs = set()
+        if os.path.isdir(root):
+            self._scan(str(root), "", recursive)
+
+    def _scan(self, path, prefix, recursive):
+        with os.scandir(path) as entries:
+            for entry in entries:
+                name = prefix + entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    self.dirs.add(name)
+                    if recursive:
+                        self._scan(entry.path, name + "/", recursive)
+                elif entry.is_file():
+                    st = entry.stat()
+                    self.files[name] = FileInfo(st.st_size, st.st_mtime, entry.inode())
+
+    def exists(self, name):
+        """True if a file called name was present when the snapshot was taken"""
+        return name in self.files
+
+    def is_dir(self, name):
+        """True if name (relative, forward slashes) is a directory in the snapshot"""
+        return name.strip("/") in self.dirs
+
+    def get(self, name):
+        """FileInfo for name, or None if it doesn't exist"""
+        return self.files.get(name)
+
+    def size(self, name):
+        """Size in bytes of name, or None if it doesn't exist"""
+        info = self.files.get(name)
+        return info.size if info else None
+
+    def names(self, suffix=""):
+        """Top-level file names ending in suffix (replacement for glob("*.md"))"""
+        return [n for n in self.files if "/" not in n and n.endswith(suffix)]
+
+    def refresh_entry(self, name):
+        """Re-stat a single file (e.g. one a watcher reported); returns its FileInfo"""
+        try:
+            st = os.stat(os.path.join(self.root, name))
+        except FileNotFoundError:
+            self.files.pop(name, None)
+            return None
+        self.files[name] = FileInfo(st.st_size, st.st_mtime, st.st_ino)
+        return self.files[name]
+
+    def discard(self, name):
+        """Drop name from the snapshot after it has been moved away"""
+        self.files.pop(name, None)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Root Directory Watcher
+Yields batches of .md files that appear in a directory (created or renamed
+in). Uses inotify on Linux and falls back to polling with os.scandir
+elsewhere, so steady-state cost is proportional to new files, not to the
+size of the reorganization plan.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+
+# inotify event masks (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+IN_CLOEXEC = 0o2000000
+
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, name length
+
+# Wait this long after an event for the rest of a burst before yielding
+DEBOUNCE_SECONDS = 0.5
+
+
+def _libc():
+    if not hasattr(os, "uname") or os.uname().sysname != "Linux":
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    except OSError:
+        return None
+    return libc if hasattr(libc, "inotify_init1") else None
+
+def _list_md(path):
+    with os.scandir(path) as entries:
+        return {e.name for e in entries if e.name.endswith(".md") and e.is_file()}
+
+
+class InotifyWatcher:
+    """Watches one directory for files written or moved into it"""
+
+    def __init__(self, libc, path):
+        self.path = path
+        self.fd = libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        wd = libc.inotify_add_watch(self.fd, os.fsencode(path), IN_CLOSE_WRITE | IN_MOVED_TO)
+        if wd < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+
+    def _read(self, names):
+        data = os.read(self.fd, 64 * 1024)
+        pos = 0
+        while pos < len(data):
+            _, mask, _, length = EVENT_HEADER.unpack_from(data, pos)
+            pos += EVENT_HEADER.size
+            name = data[pos:pos + length].rstrip(b"\0").decode("utf-8", "surrogateescape")
+            pos += length
+            if mask & IN_Q_OVERFLOW:
+                # Lost events: fall back to a full listing once
+                names.update(_list_md(self.path))
+            elif name.endswith(".md"):
+                names.add(name)
+
+    def batches(self):
+        while True:
+            names = set()
+            select.select([self.fd], [], [])
+            self._read(names)
+            while select.select([self.fd], [], [], DEBOUNCE_SECONDS)[0]:
+                self._read(names)
+            yield names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Fallback: one directory listing per interval, reporting new names"""
+
+    def __init__(self, path, interval):
+        self.path = path
+        self.interval = interval
+        self.seen = _list_md(path)
+
+    def batches(self):
+        while True:
+            time.sleep(self.interval)
+            current = _list_md(self.path)
+            new = current - self.seen
+            self.seen = current
+            if new:
+                yield new
+
+    def close(self):
+        pass
+
+
+def watch(path, interval=2.0, polling=False):
+    """Return a watcher for path: inotify when available, polling otherwise"""
+    libc = None if polling else _libc()
+    if libc is not None:
+        try:
+            return InotifyWatcher(libc, str(path))
+        except OSError as e:
+            print(f"⚠ inotify unavailable ({e}); polling every {interval:g}s")
+    return PollingWatcher(str(path), interval)
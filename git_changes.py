@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Git Changes
+Incremental mode for the codemod and documentation scripts: asks the local
+git repository which files changed since a recorded base commit (committed,
+staged, unstaged and untracked, with renames followed) so a run only
+processes those files. Each script keeps its own base in
+.incremental_base.json at the repository root and advances it to HEAD after
+a successful run.
+
+Usage:
+  python git_changes.py                          # recorded bases and what changed since
+  python git_changes.py --since HEAD~3           # files changed since a commit
+"""
+
+import argparse
+import json
+import os
+import subprocess
+from pathlib import Path
+
+STATE_NAME = ".incremental_base.json"
+STATE_VERSION = 1
+
+
+class GitError(Exception):
+    pass
+
+def git(root, *args):
+    """Output of one git command run in root"""
+    try:
+        result = subprocess.run(
+            ["git", "-C", str(root), *args], check=True,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+    except FileNotFoundError:
+        raise GitError("git is not installed")
+    except subprocess.CalledProcessError as e:
+        raise GitError(e.stderr.decode("utf-8", "replace").strip() or f"git {args[0]} failed")
+    return result.stdout.decode("utf-8", "surrogateescape")
+
+def repo_root(path):
+    """Top level of the git repository containing path"""
+    path = Path(path)
+    while not path.is_dir():
+        path = path.parent
+    return Path(git(path, "rev-parse", "--show-toplevel").strip())
+
+def resolve(root, rev):
+    """Full commit id of rev, or None if it doesn't exist (e.g. rebased away)"""
+    try:
+        return git(root, "rev-parse", "--verify", "--quiet", f"{rev}^{{commit}}").strip()
+    except GitError:
+        return None
+
+
+class Changes:
+    """
+    Files changed between a base commit and the working tree, as paths
+    relative to the repository root. A rename counts as a change to its new
+    path; the old path lands in removed.
+    """
+
+    def __init__(self, root, base):
+        self.root = Path(root)
+        self.base = base
+        self.paths = set()
+        self.removed = set()
+        self.renamed = {}
+
+        # Working tree against base covers commits since base plus staged and unstaged edits
+        fields = git(root, "diff", "--name-status", "-z", "-M", base, "--").split("\0")
+        i = 0
+        while i < len(fields) - 1:
+            status = fields[i]
+            if status[0] in "RC":
+                old, new = fields[i + 1], fields[i + 2]
+                self.paths.add(new)
+                if status[0] == "R":
+                    self.removed.add(old)
+                    self.renamed[old] = new
+                i += 3
+                continue
+            path = fields[i + 1]
+            if status[0] == "D":
+                self.removed.add(path)
+            else:
+                self.paths.add(path)
+            i += 2
+        for path in git(root, "ls-files", "--others", "--exclude-standard", "-z").split("\0"):
+            if path:
+                self.paths.add(path)
+
+    def __len__(self):
+        return len(self.paths) + len(self.removed)
+
+    def _prefix(self, directory):
+        rel = os.path.relpath(os.path.realpath(directory), os.path.realpath(self.root)).replace(os.sep, "/")
+        return "" if rel == "." else rel + "/"
+
+    def touched(self, directory):
+        """Paths below directory (relative to it) that were changed, added, renamed or deleted"""
+        prefix = self._prefix(directory)
+        return {p[len(prefix):] for p in self.paths | self.removed if p.startswith(prefix)}
+
+    def select(self, directory, relpaths):
+        """
+        The relpaths (relative to directory) to process: changed ones as they
+        are, renamed ones under their new name if it is still below
+        directory, unchanged and deleted ones dropped
+        """
+        prefix = self._prefix(directory)
+        selected = []
+        for relpath in relpaths:
+            path = prefix + relpath.replace(os.sep, "/")
+            new = self.renamed.get(path)
+            if new is not None:
+                if new.startswith(prefix):
+                    selected.append(new[len(prefix):])
+            elif path in self.paths:
+                selected.append(relpath)
+        return list(dict.fromkeys(selected))
+
+
+class IncrementalBase:
+    """The base commit one script recorded in .incremental_base.json"""
+
+    def __init__(self, name, path):
+        self.name = name
+        self.root = repo_root(path)
+        self.state_path = self.root / STATE_NAME
+        self.state = self._load()
+
+    def _load(self):
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return state.get("bases", {}) if state.get("version") == STATE_VERSION else {}
+
+    @property
+    def base(self):
+        return self.state.get(self.name)
+
+    def changes(self, since=None):
+        """Changes since `since` (or the recorded base); None means process everything"""
+        rev = since or self.base
+        if rev is None:
+            return None
+        commit = resolve(self.root, rev)
+        if commit is None:
+            return None
+        return Changes(self.root, commit)
+
+    def advance(self):
+        """Record HEAD as the base for the next run"""
+        self.state = self._load()
+        self.state[self.name] = git(self.root, "rev-parse", "HEAD").strip()
+        tmp = self.state_path.with_name(STATE_NAME + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": STATE_VERSION, "bases": self.state}, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.state_path)
+
+
+def add_incremental_arguments(parser):
+    """--incremental and --since, shared by the scripts"""
+    parser.add_argument("--incremental", action="store_true",
+                        help="only process files changed (in git) since the last successful run")
+    parser.add_argument("--since", metavar="REV",
+                        help="only process files changed since this commit (implies --incremental)")
+
+def incremental_from_args(args, name, path, log=print):
+    """(IncrementalBase or None, Changes or None) for a script run"""
+    if not (args.incremental or args.since):
+        return None, None
+    try:
+        tracker = IncrementalBase(name, path)
+        changes = tracker.changes(args.since)
+    except GitError as e:
+        log(f"⚠ Incremental mode off ({e}); processing everything")
+        return None, None
+    if changes is None:
+        rev = args.since or tracker.base
+        if rev:
+            log(f"⚠ Base {rev} not found in the repository; processing everything")
+        else:
+            log("⚠ No recorded base yet; processing everything")
+    else:
+        log(f"Incremental: {len(changes)} file(s) changed since {changes.base[:10]}")
+    return tracker, changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show incremental bases and the files changed since them")
+    parser.add_argument("--repo", default=".", help="any path inside the repository")
+    parser.add_argument("--since", metavar="REV", help="list changes since this commit instead")
+    args = parser.parse_args()
+
+    root = repo_root(args.repo)
+    if args.since:
+        bases = {"--since": args.since}
+    else:
+        bases = IncrementalBase("", root).state
+
+    print("=" * 60)
+    print(f"INCREMENTAL BASES ({root})")
+    print("=" * 60)
+    if not bases:
+        print("No bases recorded yet.")
+    for name, rev in sorted(bases.items()):
+        commit = resolve(root, rev)
+        if commit is None:
+            print(f"\n⚠ {name}: {rev} (not found; next run processes everything)")
+            continue
+        changes = Changes(root, commit)
+        print(f"\n{name}: {commit[:10]} ({len(changes)} changed)")
+        for old, new in sorted(changes.renamed.items()):
+            print(f"  R {old} → {new}")
+        for path in sorted(changes.paths - set(changes.renamed.values())):
+            print(f"  M {path}")
+        for path in sorted(changes.removed - set(changes.renamed)):
+            print(f"  D {path}")
+    print("=" * 60 + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Route Guard Coverage
+Reads the guard functions exported by src/lib/auth/guards.ts and reports,
+for every API route handler, which of them (if any) protects it. Handler
+classification comes from route_scan.py, so only route files changed since
+the last run are re-scanned.
+
+Usage:
+  python guard_coverage.py                       # route x method matrix + summary
+  python guard_coverage.py --summary             # summary only
+  python guard_coverage.py --json-out coverage.json
+"""
+
+import argparse
+import json
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from route_scan import GUARDED, LEGACY, UNGUARDED, RouteScan, route_name
+from ts_tokens import SourceFile
+
+# Base paths
+ROOT_PATH = Path("c:/Users/Faiz Hashmi/theautodoctor")
+GUARDS_PATH = ROOT_PATH / "src" / "lib" / "auth" / "guards.ts"
+API_DIR = ROOT_PATH / "src" / "app" / "api"
+
+METHOD_ORDER = ["GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"]
+
+
+def load_guards(guards_path):
+    """{"api": [...], "page": [...]} of require* functions exported by guards.ts"""
+    with open(guards_path, "r", encoding="utf-8") as f:
+        tokens = SourceFile(f.read()).tokens
+    names = []
+    for i, token in enumerate(tokens[:-2]):
+        if token.kind != "ident" or token.value != "export":
+            continue
+        j = i + 1
+        while j < len(tokens) and tokens[j].value in ("async", "function", "const"):
+            j += 1
+        if j < len(tokens) and j > i + 1 and tokens[j].value.startswith("require"):
+            names.append(tokens[j].value)
+    return {
+        "api": [n for n in names if n.endswith("API")],
+        "page": [n for n in names if not n.endswith("API")],
+    }
+
+def short_guard(handler):
+    """Matrix cell for one handler: admin / mechanic / legacy:aad_mech / - ..."""
+    guard = handler["guard"]
+    if handler["status"] == GUARDED:
+        if guard.startswith("require") and guard.endswith("API"):
+            return guard[len("require"):-len("API")].lower()
+        return guard
+    if handler["status"] == LEGACY:
+        return f"legacy:{guard}"
+    return "-"
+
+def cell(handler):
+    """JSON matrix value: guard name, "legacy:<marker>" or None"""
+    if handler["status"] == LEGACY:
+        return f"legacy:{handler['guard']}"
+    return handler["guard"] if handler["status"] == GUARDED else None
+
+def build_coverage(scan, guards):
+    """JSON-ready coverage report"""
+    matrix = {}
+    by_guard = Counter()
+    by_area = defaultdict(Counter)
+    for relpath, handlers in scan.routes.items():
+        route = route_name(relpath)
+        matrix[route] = {h["method"]: cell(h) for h in handlers}
+        area = route.split("/", 1)[0]
+        for h in handlers:
+            key = h["guard"] if h["status"] == GUARDED else h["status"]
+            by_guard[key] += 1
+            by_area[area][h["status"]] += 1
+
+    handlers = sum(by_guard.values())
+    guarded = sum(c[GUARDED] for c in by_area.values())
+    return {
+        "guards": guards,
+        "routes": matrix,
+        "summary": {
+            "route_files": len(scan.routes),
+            "handlers": handlers,
+            "guarded": guarded,
+            "legacy_guarded": sum(c[LEGACY] for c in by_area.values()),
+            "unguarded": sum(c[UNGUARDED] for c in by_area.values()),
+            "coverage": round(guarded / handlers, 3) if handlers else 1.0,
+            "by_guard": dict(by_guard.most_common()),
+            "unused_guards": [g for g in guards["api"] if not by_guard[g]],
+            "by_area": {area: dict(counts) for area, counts in sorted(by_area.items())},
+        },
+    }
+
+def print_matrix(scan):
+    methods = [m for m in METHOD_ORDER if any(h["method"] == m for _, h in scan.handlers())]
+    width = max((len(route_name(p)) for p in scan.routes), default=10)
+    print((f"{'ROUTE':<{width}}  " + "  ".join(f"{m:<12}" for m in methods)).rstrip())
+    for relpath, handlers in scan.routes.items():
+        if not handlers:
+            continue
+        cells = {h["method"]: short_guard(h) for h in handlers}
+        row = "  ".join(f"{cells.get(m, ''):<12}" for m in methods)
+        print(f"{route_name(relpath):<{width}}  {row}".rstrip())
+
+def print_summary(summary, elapsed, scan):
+    print("\n" + "=" * 60)
+    print("GUARD COVERAGE SUMMARY")
+    print("=" * 60)
+    print(f"Route files: {summary['route_files']} ({scan.scanned} scanned, {scan.cached} from cache)")
+    print(f"Handlers: {summary['handlers']}  guarded {summary['guarded']}  "
+          f"legacy {summary['legacy_guarded']}  unguarded {summary['unguarded']}  "
+          f"({summary['coverage']:.1%} covered)")
+    print()
+    for guard, count in summary["by_guard"].items():
+        print(f"  {guard:<24} {count:>5}")
+    if summary["unused_guards"]:
+        print(f"\n⚠ Exported but never used: {', '.join(summary['unused_guards'])}")
+    print()
+    print(f"  {'AREA':<24} {'guarded':>8} {'legacy':>8} {'none':>8}")
+    for area, counts in summary["by_area"].items():
+        print(f"  {area:<24} {counts.get(GUARDED, 0):>8} {counts.get(LEGACY, 0):>8} {counts.get(UNGUARDED, 0):>8}")
+    print(f"\nDone in {elapsed * 1000:.0f} ms")
+    print("=" * 60 + "\n")
+
+def main():
+    parser = argparse.ArgumentParser(description="Route x guard authorization coverage")
+    parser.add_argument("--api-dir", default=str(API_DIR), help="src/app/api directory")
+    parser.add_argument("--guards", default=str(GUARDS_PATH), help="guards.ts to read exports from")
+    parser.add_argument("--json-out", metavar="PATH", help="write the full report as JSON")
+    parser.add_argument("--summary", action="store_true", help="skip the per-route matrix")
+    parser.add_argument("--workers", type=int, default=None, help="scan process pool size")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    guards = load_guards(args.guards)
+    scan = RouteScan(args.api_dir, guards=guards["api"]).run(args.workers)
+    report = build_coverage(scan, guards)
+    elapsed = time.perf_counter() - start
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1, sort_keys=True)
+    if not args.summary:
+        print_matrix(scan)
+    print_summary(report["summary"], elapsed, scan)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,590 @@
+#!/usr/bin/env python3
+"""
+Cold-Start Import Cost
+Builds the static import graph of src/ and estimates how much code each
+API route loads at module scope, transitively. Imports whose bindings are
+only used in type positions are dropped (the compiler elides them), and
+import() or require() inside a function is a lazy edge that doesn't count.
+Local modules weigh their source size; packages weigh the JS under
+node_modules/<package> when it is installed, else a rough estimate from
+PACKAGE_ESTIMATES.
+
+An import is a lazy-load candidate when nothing at module scope uses it
+and only some of the route's handlers reach it, directly or through
+top-level helper functions. Routes are ranked by the weight their
+candidates pull in that nothing else in the route does.
+
+Files are parsed in a process pool and cached by mtime and size in
+.import_graph_cache.json, so reruns only re-parse changed files. The
+route list and handlers come from route_scan.py.
+
+Usage:
+  python import_cost.py                          # routes ranked by deferrable weight
+  python import_cost.py --route admin/plans/[id] # one route's imports in detail
+  python import_cost.py --json-out imports.json
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import instrument
+from doc_snapshot import DirSnapshot
+from route_scan import API_DIR, POOL_THRESHOLD, RouteScan, route_name
+from ts_tokens import METHODS, SourceFile
+
+CACHE_NAME = ".import_graph_cache.json"
+# Bump when the parsed record changes shape
+CACHE_VERSION = 1
+
+SOURCE_SUFFIXES = (".ts", ".tsx", ".js", ".jsx", ".mjs", ".json")
+# Handled by the bundler, not loaded by the route at runtime
+ASSET_SUFFIXES = (".css", ".scss", ".svg", ".png", ".jpg")
+RESOLVE_SUFFIXES = ("", ".ts", ".tsx", ".js", ".jsx", ".mjs", ".json", "/index.ts", "/index.tsx", "/index.js")
+
+# Loaded by the Next.js runtime before any route, so free for the route itself
+FRAMEWORK_PACKAGES = frozenset(["next", "react", "react-dom", "server-only"])
+NODE_BUILTINS = frozenset([
+    "assert", "async_hooks", "buffer", "child_process", "crypto", "dns", "events", "fs", "http",
+    "https", "net", "os", "path", "perf_hooks", "querystring", "stream", "string_decoder", "timers",
+    "tls", "url", "util", "worker_threads", "zlib",
+])
+
+# Rough loaded-JS sizes in KB for packages when node_modules isn't installed
+PACKAGE_ESTIMATES = {
+    "@react-pdf/renderer": 2500,
+    "isomorphic-dompurify": 1500,
+    "livekit-client": 1200,
+    "jspdf": 900,
+    "stripe": 900,
+    "livekit-server-sdk": 700,
+    "openai": 700,
+    "@supabase/supabase-js": 400,
+    "zod": 250,
+    "@upstash/redis": 150,
+    "date-fns": 150,
+    "resend": 80,
+    "@supabase/ssr": 60,
+    "@upstash/ratelimit": 60,
+}
+DEFAULT_PACKAGE_KB = 100
+
+# A binding right after one of these is a type reference, not a runtime use
+# (":" is handled separately: object values and ternaries follow one too)
+TYPE_CONTEXT = frozenset(["<", "as", "extends", "implements", "|", "&", "satisfies", "keyof", "is"])
+DECLARE_KEYWORDS = frozenset(["const", "let", "var"])
+TYPE_KEYWORDS = frozenset(["type", "interface", "declare"])
+
+
+class ModuleParser:
+    """Imports and top-level structure of one TypeScript module"""
+
+    def __init__(self, text):
+        self.source = SourceFile(text)
+        self.tokens = self.source.tokens
+        self.text = text
+        self.enclosing = []   # token -> index of its innermost open bracket, or None
+        stack = []
+        for i, token in enumerate(self.tokens):
+            if token.kind == "punct" and token.value in ")]}" and stack:
+                stack.pop()
+            self.enclosing.append(stack[-1] if stack else None)
+            if token.kind == "punct" and token.value in "([{":
+                stack.append(i)
+
+    def _is(self, i, value):
+        return self.source._is(i, value)
+
+    def _line(self, i):
+        return self.text.count("\n", 0, self.tokens[i].start) + 1
+
+    def _string(self, i):
+        token = self.tokens[i] if 0 <= i < len(self.tokens) else None
+        return token.value[1:-1] if token is not None and token.kind == "string" else None
+
+    def _import_clause(self, i):
+        """(specifier, bindings, last token) of the import declaration at i; specifier None if type-only"""
+        tokens = self.tokens
+        j = i + 1
+        if self._string(j) is not None:
+            return self._string(j), [], j
+        type_only = self._is(j, "type") and not (self._is(j + 1, ",") or self._is(j + 1, "from"))
+        bindings = []
+        while j < len(tokens) and not (self._is(j, "from") and self._string(j + 1) is not None):
+            token = tokens[j]
+            if token.kind == "ident" and token.value not in ("as", "type") and not self._is(j + 1, "as"):
+                if not (self._is(j - 1, "type") and (self._is(j - 2, "{") or self._is(j - 2, ","))):
+                    bindings.append(token.value)
+            if self._is(j, ";"):
+                return None, [], j
+            j += 1
+        if j >= len(tokens):
+            return None, [], len(tokens) - 1
+        return (None if type_only else self._string(j + 1)), bindings, j + 1
+
+    def _reexport(self, i):
+        """(specifier, last token) of export ... from '...' at i, else (None, None)"""
+        j = i + 1
+        if self._is(j, "type"):
+            return None, None
+        if self._is(j, "*"):
+            j += 1
+            if self._is(j, "as"):
+                j += 2
+        elif self._is(j, "{") and self.source.partner[j] > 0:
+            j = self.source.partner[j] + 1
+        else:
+            return None, None
+        if self._is(j, "from") and self._string(j + 1) is not None:
+            return self._string(j + 1), j + 1
+        return None, None
+
+    def _runtime(self, i):
+        """True if the identifier at i is a value reference rather than a type, member or key"""
+        if self._is(i - 1, ".") or self._is(i - 1, "?."):
+            return False
+        if self._is(i - 1, ":"):
+            return self._value_colon(i - 1)
+        previous = self.tokens[i - 1] if i > 0 else None
+        if previous is not None and previous.value in TYPE_CONTEXT and previous.kind in ("ident", "punct"):
+            return False
+        if self._is(i - 1, ",") and self._is(i + 1, ">"):
+            return False
+        # Object literal keys: { stripe: ... }
+        return not (self._is(i + 1, ":") and (self._is(i - 1, "{") or self._is(i - 1, ",")))
+
+    def _value_colon(self, c):
+        """True if a value follows the ":" at c (object literal, ternary) rather than a type annotation"""
+        if self._is(c - 1, ")") or self._is(c - 1, "?"):
+            return False
+        if c >= 2 and self.tokens[c - 2].value in DECLARE_KEYWORDS:
+            return False
+        opener = self.enclosing[c]
+        return opener is None or not self._is(opener, "(")
+
+    def _arrow(self, i):
+        """True if the "(" at i starts an arrow function: (req) => ... or (req): Promise<T> => {"""
+        if not self._is(i, "(") or self.source.partner[i] < 0:
+            return False
+        after = self.source.partner[i] + 1
+        if self._is(after, "=>"):
+            return True
+        body = self.source._function_body(i) if self._is(after, ":") else -1
+        return body > 0 and self._is(body - 1, "=>")
+
+    def _top_statements(self):
+        close = len(self.tokens)
+        i = 0
+        while i < close:
+            if self._is(i, ";"):
+                i += 1
+                continue
+            last = min(self.source._block_statement_end(i, close), close - 1)
+            yield i, last
+            i = last + 1
+
+    def parse(self, route=False):
+        """{imports: [[specifier, line, [runtime bindings]]], lazy: [...], route: {...} for route files}"""
+        tokens = self.tokens
+        imports = {}       # specifier -> [line, bindings]
+        bound = {}         # binding -> specifier
+        skip = set()       # token indices of import declarations
+        lazy = set()
+        depth = 0
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            if token.kind == "punct" and token.value == "{":
+                depth += 1
+            elif token.kind == "punct" and token.value == "}":
+                depth -= 1
+            elif token.kind == "ident" and token.value == "import" and self._is(i + 1, "("):
+                if self._string(i + 2) is not None:
+                    lazy.add(self._string(i + 2))
+            elif token.kind == "ident" and token.value == "require" and self._is(i + 1, "(") \
+                    and self._string(i + 2) is not None and not self._is(i - 1, "."):
+                if depth:
+                    lazy.add(self._string(i + 2))
+                else:
+                    imports.setdefault(self._string(i + 2), [self._line(i), None])
+            elif depth == 0 and token.kind == "ident" and token.value == "import" and not self._is(i + 1, "."):
+                specifier, bindings, last = self._import_clause(i)
+                skip.update(range(i, last + 1))
+                if specifier is not None:
+                    entry = imports.setdefault(specifier, [self._line(i), []])
+                    if entry[1] is not None:
+                        entry[1].extend(bindings)
+                    if not bindings:
+                        entry[1] = None        # side-effect import: always loaded
+                    for name in bindings:
+                        bound[name] = specifier
+                i = last + 1
+                continue
+            elif depth == 0 and token.kind == "ident" and token.value == "export":
+                specifier, last = self._reexport(i)
+                if specifier is not None:
+                    imports.setdefault(specifier, [self._line(i), None])[1] = None
+                    skip.update(range(i, last + 1))
+                    i = last + 1
+                    continue
+            i += 1
+
+        # type / interface declarations are erased along with what they reference
+        for first, last in self._top_statements():
+            t = first + 1 if self._is(first, "export") else first
+            if tokens[t].value in TYPE_KEYWORDS and t + 1 <= last and tokens[t + 1].kind == "ident":
+                skip.update(range(first, last + 1))
+
+        used = {}          # binding -> token indices of runtime uses
+        for k, token in enumerate(tokens):
+            if token.kind == "ident" and token.value in bound and k not in skip and self._runtime(k):
+                used.setdefault(token.value, []).append(k)
+
+        record = {"imports": [], "lazy": sorted(lazy - set(imports))}
+        for specifier, (line, bindings) in imports.items():
+            if bindings is None:
+                record["imports"].append([specifier, line, []])
+            elif any(name in used for name in bindings):
+                record["imports"].append([specifier, line, sorted(name for name in bindings if name in used)])
+        if route:
+            record["route"] = self._route_usage(set(used), skip)
+        return record
+
+    def _names(self, first, last, names):
+        """Runtime references to names in first..last, and whether each is called"""
+        found = {}
+        for k in range(first, last + 1):
+            token = self.tokens[k]
+            if token.kind == "ident" and token.value in names and self._runtime(k):
+                found[token.value] = found.get(token.value, False) or self._is(k + 1, "(")
+        return found
+
+    def _route_usage(self, bindings, skip):
+        """Bindings used at module scope and by each handler (through top-level helpers)"""
+        tokens = self.tokens
+        statements = []
+        decls = {}
+        for first, last in self._top_statements():
+            if first in skip:
+                continue
+            t = first
+            if self._is(t, "export"):
+                t += 2 if self._is(t + 1, "default") else 1
+            if self._is(t, "async"):
+                t += 1
+            name = tokens[t + 1].value if t + 1 < len(tokens) and tokens[t + 1].kind == "ident" else None
+            if tokens[t].value in TYPE_KEYWORDS and name is not None:
+                continue
+            lazy = tokens[t].value in ("function", "class")
+            if tokens[t].value in DECLARE_KEYWORDS and self._is(t + 2, "="):
+                init = t + 4 if self._is(t + 3, "async") else t + 3
+                lazy = self._is(init, "function") or self._arrow(init) or (
+                    init < len(tokens) and tokens[init].kind == "ident" and self._is(init + 1, "=>")
+                )
+            statements.append((first, last, name if (lazy or tokens[t].value in DECLARE_KEYWORDS) else None, lazy))
+            if lazy and name is not None:
+                decls[name] = None
+
+        names = bindings | set(decls)
+        module = set()
+        handlers = {}
+        for first, last, name, lazy in statements:
+            found = self._names(first, last, names - {name})
+            if lazy and name is not None:
+                decls[name] = set(found)
+            else:
+                # Runs at load: direct uses are eager, helpers only if called here
+                module |= {n for n, called in found.items() if n in bindings or called}
+                if name in METHODS:
+                    handlers[name] = set(found)
+            if lazy and name in METHODS:
+                handlers[name] = set(found)
+
+        def reach(roots):
+            seen = set()
+            stack = list(roots)
+            while stack:
+                current = stack.pop()
+                if current in seen:
+                    continue
+                seen.add(current)
+                stack.extend(decls.get(current) or ())
+            return seen
+
+        return {
+            "module": sorted(reach(module) & bindings),
+            "handlers": {method: sorted(reach(roots) & bindings) for method, roots in sorted(handlers.items())},
+        }
+
+
+def _parse_file(path, route):
+    if path.endswith(".json"):
+        return {"imports": [], "lazy": []}
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return ModuleParser(f.read()).parse(route)
+
+def package_name(specifier):
+    """@scope/pkg/sub -> @scope/pkg, pkg/sub -> pkg"""
+    parts = specifier.split("/")
+    return "/".join(parts[:2]) if specifier.startswith("@") else parts[0]
+
+
+class ImportGraph:
+    """Parsed modules of a src/ tree, cached by mtime and size"""
+
+    def __init__(self, src_dir, cache_path=None):
+        self.src_dir = Path(src_dir)
+        self.cache_path = Path(cache_path) if cache_path else self.src_dir.parent / CACHE_NAME
+        self.node_modules = self.src_dir.parent / "node_modules"
+        self.files = {}       # relpath -> record
+        self.sizes = {}       # relpath -> bytes
+        self.packages = {}    # name -> [package.json mtime, bytes]
+        self.estimated = set()
+        self.unresolved = set()
+        self.scanned = 0
+        self.cached = 0
+        self._closures = {}
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}, {}
+        if cache.get("version") != CACHE_VERSION:
+            return {}, {}
+        return cache["files"], cache.get("packages", {})
+
+    def _save_cache(self, files):
+        tmp = f"{self.cache_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "files": files, "packages": self.packages},
+                      f, separators=(",", ":"))
+        os.replace(tmp, self.cache_path)
+
+    def run(self, workers=None):
+        """Parse changed files (in a pool when there are many); returns self"""
+        with instrument.phase("import-graph: list"):
+            snapshot = DirSnapshot(self.src_dir, recursive=True)
+            current = {name: info for name, info in snapshot.files.items() if name.endswith(SOURCE_SUFFIXES)}
+            cache, self.packages = self._load_cache()
+        files = {}
+        stale = []
+        for relpath, info in current.items():
+            entry = cache.get(relpath)
+            if entry and entry[0] == info.mtime and entry[1] == info.size:
+                files[relpath] = entry
+                self.cached += 1
+            else:
+                stale.append(relpath)
+
+        paths = [str(self.src_dir / relpath) for relpath in stale]
+        routes = [relpath.endswith("/route.ts") for relpath in stale]
+        with instrument.phase("import-graph: parse", files=len(paths)):
+            if len(stale) >= POOL_THRESHOLD and workers != 1:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    results = list(pool.map(_parse_file, paths, routes, chunksize=16))
+            else:
+                results = []
+                for path, route in zip(paths, routes):
+                    with instrument.file_span(path):
+                        results.append(_parse_file(path, route))
+        for relpath, record in zip(stale, results):
+            info = current[relpath]
+            files[relpath] = [info.mtime, info.size, record]
+        self.scanned = len(stale)
+        instrument.count("import_graph.scanned", self.scanned)
+        instrument.count("import_graph.cached", self.cached)
+
+        packages_before = dict(self.packages)
+        self.files = {relpath: entry[2] for relpath, entry in files.items()}
+        self.sizes = {relpath: entry[1] for relpath, entry in files.items()}
+        for relpath in self.files:
+            for specifier, _, _ in self.files[relpath]["imports"]:
+                self.resolve(relpath, specifier)
+        if stale or len(files) != len(cache) or self.packages != packages_before:
+            self._save_cache(files)
+        return self
+
+    def resolve(self, relpath, specifier):
+        """Graph node for an import: a src-relative path, "pkg:name", or None (builtin/framework/unknown)"""
+        if specifier.endswith(ASSET_SUFFIXES):
+            return None
+        if specifier.startswith("@/"):
+            base = specifier[2:]
+        elif specifier.startswith("."):
+            base = os.path.normpath(os.path.join(os.path.dirname(relpath), specifier)).replace(os.sep, "/")
+        else:
+            name = package_name(specifier[5:] if specifier.startswith("node:") else specifier)
+            if specifier.startswith("node:") or name in NODE_BUILTINS or name in FRAMEWORK_PACKAGES:
+                return None
+            self._package_weight(name)
+            return f"pkg:{name}"
+        for suffix in RESOLVE_SUFFIXES:
+            if base + suffix in self.sizes:
+                return base + suffix
+        self.unresolved.add(specifier)
+        return None
+
+    def _package_weight(self, name):
+        package_json = self.node_modules / name / "package.json"
+        try:
+            mtime = package_json.stat().st_mtime
+        except OSError:
+            self.estimated.add(name)
+            return PACKAGE_ESTIMATES.get(name, DEFAULT_PACKAGE_KB) * 1024
+        cached = self.packages.get(name)
+        if cached is None or cached[0] != mtime:
+            total = 0
+            for dirpath, dirnames, filenames in os.walk(package_json.parent):
+                dirnames[:] = [d for d in dirnames if d != "node_modules"]
+                total += sum(os.path.getsize(os.path.join(dirpath, f)) for f in filenames
+                             if f.endswith((".js", ".cjs", ".mjs")))
+            self.packages[name] = cached = [mtime, total]
+        return cached[1]
+
+    def weight(self, node):
+        if node.startswith("pkg:"):
+            return self._package_weight(node[4:])
+        return self.sizes.get(node, 0)
+
+    def edges(self, relpath):
+        nodes = []
+        for specifier, _, _ in self.files.get(relpath, {}).get("imports", ()):
+            node = self.resolve(relpath, specifier)
+            if node is not None:
+                nodes.append(node)
+        return nodes
+
+    def closure(self, node):
+        """Every node loaded by importing node, itself included"""
+        if node not in self._closures:
+            seen = set()
+            stack = [node]
+            while stack:
+                current = stack.pop()
+                if current in seen:
+                    continue
+                seen.add(current)
+                if not current.startswith("pkg:"):
+                    stack.extend(self.edges(current))
+            self._closures[node] = frozenset(seen)
+        return self._closures[node]
+
+    def total(self, nodes):
+        return sum(self.weight(n) for n in nodes)
+
+
+def route_report(graph, relpath, name):
+    """Load weight of one route and its lazy-load candidates"""
+    record = graph.files[relpath]
+    usage = record.get("route", {"module": [], "handlers": {}})
+    handlers = usage["handlers"]
+    module = set(usage["module"])
+    loaded = graph.closure(relpath)
+
+    imports = []
+    for specifier, line, bindings in record["imports"]:
+        node = graph.resolve(relpath, specifier)
+        if node is None:
+            continue
+        users = sorted(m for m, names in handlers.items() if set(bindings) & set(names))
+        deferrable = bool(bindings) and not (set(bindings) & module) and len(users) < len(handlers)
+        imports.append({"specifier": specifier, "line": line, "node": node,
+                        "users": users, "deferrable": deferrable})
+
+    def without(excluded):
+        keep = {relpath}
+        for item in imports:
+            if item["node"] not in excluded:
+                keep |= graph.closure(item["node"])
+        return keep
+
+    for item in imports:
+        item["exclusive"] = graph.total(loaded - without({item["node"]}))
+    # A module imported eagerly elsewhere in the route stays loaded
+    deferred = {item["node"] for item in imports if item["deferrable"]} \
+        - {item["node"] for item in imports if not item["deferrable"]}
+    return {
+        "route": name,
+        "handlers": sorted(handlers),
+        "total": graph.total(loaded),
+        "deferrable": graph.total(loaded - without(deferred)) if deferred else 0,
+        "imports": sorted(imports, key=lambda item: -item["exclusive"]),
+    }
+
+def scan_import_costs(api_dir, workers=None):
+    """(route reports by deferrable weight, ImportGraph, RouteScan)"""
+    api_dir = Path(api_dir)
+    src_dir = api_dir.parents[1]
+    scan = RouteScan(api_dir).run(workers)
+    graph = ImportGraph(src_dir).run(workers)
+    prefix = api_dir.relative_to(src_dir).as_posix()
+    reports = [route_report(graph, f"{prefix}/{relpath}", route_name(relpath)) for relpath in scan.routes
+               if f"{prefix}/{relpath}" in graph.files]
+    reports.sort(key=lambda r: (-r["deferrable"], -r["total"], r["route"]))
+    return reports, graph, scan
+
+def kb(size):
+    return f"{size / 1024:.0f}"
+
+def describe(item):
+    users = "/".join(item["users"]) if item["users"] else "no handler"
+    return f"{item['specifier']} {kb(item['exclusive'])}KB ({users} only)"
+
+def print_route(report):
+    print(f"{report['route']}  handlers: {', '.join(report['handlers']) or '-'}")
+    print(f"  loads {kb(report['total'])}KB, {kb(report['deferrable'])}KB deferrable\n")
+    for item in report["imports"]:
+        marker = "⚠" if item["deferrable"] else "✓"
+        users = ", ".join(item["users"]) or "-"
+        print(f"  {marker} L{item['line']:<4} {item['specifier']:<40} {kb(item['exclusive']):>6}KB  {users}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank API routes by module-scope imports that could load lazily")
+    parser.add_argument("--api-dir", default=str(API_DIR), help="src/app/api directory")
+    parser.add_argument("--route", help="show one route's imports (e.g. admin/plans/[id])")
+    parser.add_argument("--min-kb", type=int, default=20,
+                        help="only list routes deferring at least this many KB")
+    parser.add_argument("--json-out", metavar="PATH", help="write every route's report as JSON")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size")
+    instrument.add_trace_arguments(parser)
+    args = parser.parse_args()
+    instrument.enable_from_args(args)
+
+    reports, graph, scan = scan_import_costs(args.api_dir, args.workers)
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=1)
+
+    if args.route:
+        matches = [r for r in reports if r["route"] == args.route.strip("/")]
+        if not matches:
+            parser.error(f"no route {args.route}")
+        print_route(matches[0])
+        return
+
+    listed = [r for r in reports if r["deferrable"] >= args.min_kb * 1024]
+    width = max((len(r["route"]) for r in listed), default=10)
+    print(f"{'ROUTE':<{width}}  {'LOADS':>7} {'DEFER':>7}  CANDIDATES")
+    for r in listed:
+        candidates = ", ".join(describe(item) for item in r["imports"] if item["deferrable"])
+        print(f"{r['route']:<{width}}  {kb(r['total']):>5}KB {kb(r['deferrable']):>5}KB  {candidates}")
+
+    print("\n" + "=" * 60)
+    print("COLD-START IMPORT SUMMARY")
+    print("=" * 60)
+    print(f"Source files: {len(graph.files)}  parsed: {graph.scanned}  cached: {graph.cached}")
+    print(f"Route files: {len(scan.routes)}  with deferrable imports: "
+          f"{sum(1 for r in reports if r['deferrable'])}")
+    print(f"Deferrable weight: {kb(sum(r['deferrable'] for r in reports))}KB over all routes")
+    if graph.estimated:
+        print(f"Estimated package weights (not installed): {len(graph.estimated)}")
+    if graph.unresolved:
+        print(f"Unresolved imports: {len(graph.unresolved)}")
+    print("=" * 60 + "\n")
+
+if __name__ == "__main__":
+    main()
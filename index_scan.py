@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+Missing Index Scan
+Builds a schema model from the CREATE TABLE / ALTER TABLE / CREATE INDEX
+statements in supabase/migrations and cross-references it with every
+.eq() / .in() / .order() column the API routes filter on, including
+filters added later to a stored query builder. A (table, column) pair is
+covered when the column leads some index, primary key or unique
+constraint; a column only in second place of a composite index is not.
+REFERENCES doesn't create an index in Postgres, so foreign keys don't
+count either.
+
+Tables the migrations never create (the base schema predates them) are
+assumed to have an `id` primary key and are marked ⚠ rather than ✗,
+since they may have indexes the migrations can't see.
+
+Usage:
+  python index_scan.py                             # filtered twice or more, no index
+  python index_scan.py --min-uses 1
+  python index_scan.py --stub-out supabase/migrations/20251120000000_add_missing_indexes.sql
+  python index_scan.py --json-out indexes.json
+"""
+
+import argparse
+import json
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from query_chains import QuerySource
+from route_scan import API_DIR, POOL_THRESHOLD, RouteScan, route_name
+
+FILTER_METHODS = ("eq", "in", "order")
+
+# Postgres truncates identifiers past this length
+MAX_IDENTIFIER = 63
+
+NAME = r'(?:"[^"]+"|[\w$]+)(?:\.(?:"[^"]+"|[\w$]+))?'
+CREATE_TABLE_PATTERN = re.compile(
+    r"create\s+(?:(?:global|local)\s+)?(?:temp(?:orary)?\s+|unlogged\s+)?table\s+"
+    rf"(?:if\s+not\s+exists\s+)?(?P<table>{NAME})\s*\(",
+    re.IGNORECASE,
+)
+CREATE_INDEX_PATTERN = re.compile(
+    r"create\s+(?P<unique>unique\s+)?index\s+(?:concurrently\s+)?(?:if\s+not\s+exists\s+)?"
+    rf"(?P<name>{NAME}\s+)?on\s+(?:only\s+)?(?P<table>{NAME})\s*(?:using\s+\w+\s*)?\(",
+    re.IGNORECASE,
+)
+ALTER_TABLE_PATTERN = re.compile(
+    rf"alter\s+table\s+(?:if\s+exists\s+)?(?:only\s+)?(?P<table>{NAME})\s+(?P<actions>.*)",
+    re.IGNORECASE | re.DOTALL,
+)
+DROP_PATTERN = re.compile(
+    r"drop\s+(?P<kind>table|index)\s+(?:concurrently\s+)?(?:if\s+exists\s+)?(?P<names>.*?)"
+    r"(?:\s+(?:cascade|restrict))?$",
+    re.IGNORECASE | re.DOTALL,
+)
+KEY_PATTERN = re.compile(r"^(?:constraint\s+\S+\s+)?(?P<kind>primary\s+key|unique)\s*\(", re.IGNORECASE)
+INLINE_KEY_PATTERN = re.compile(r"\b(primary\s+key|unique)\b", re.IGNORECASE)
+ADD_COLUMN_PATTERN = re.compile(
+    r"^add\s+(?:column\s+)?(?:if\s+not\s+exists\s+)?(?P<definition>.*)", re.IGNORECASE | re.DOTALL
+)
+DROP_COLUMN_PATTERN = re.compile(
+    rf"^drop\s+(?:column\s+)?(?:if\s+exists\s+)?(?P<column>{NAME})", re.IGNORECASE
+)
+DO_BLOCK_PATTERN = re.compile(r"do\s+(?P<tag>\$\w*\$)(?P<body>.*)(?P=tag)", re.IGNORECASE | re.DOTALL)
+DDL_START_PATTERN = re.compile(r"\b(?:create|alter|drop)\s+(?:unique\s+)?(?:table|index)\b", re.IGNORECASE)
+TABLE_CONSTRAINT_WORDS = ("constraint", "primary", "unique", "foreign", "check", "exclude", "like")
+COLUMN_ELEMENT_PATTERN = re.compile(r'^(?:"([^"]+)"|(\w+))(?:\s|$)')
+
+
+def unquote(name):
+    """Bare lower-case table/column name: public."Foo" -> foo"""
+    return name.strip().split(".")[-1].strip('"').lower()
+
+def strip_comments(sql):
+    """sql without -- and /* */ comments, leaving strings and $$ bodies alone"""
+    out = []
+    i = 0
+    n = len(sql)
+    while i < n:
+        if sql.startswith("--", i):
+            i = sql.find("\n", i)
+            i = n if i < 0 else i
+        elif sql.startswith("/*", i):
+            end = sql.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+            out.append(" ")
+        elif sql[i] == "'":
+            end = sql.find("'", i + 1)
+            while end >= 0 and sql.startswith("''", end):
+                end = sql.find("'", end + 2)
+            end = n if end < 0 else end + 1
+            out.append(sql[i:end])
+            i = end
+        elif sql[i] == "$":
+            tag = re.match(r"\$(\w*)\$", sql[i:])
+            if tag is None:
+                out.append("$")
+                i += 1
+                continue
+            end = sql.find(tag.group(0), i + len(tag.group(0)))
+            end = n if end < 0 else end + len(tag.group(0))
+            out.append(sql[i:end])
+            i = end
+        else:
+            out.append(sql[i])
+            i += 1
+    return "".join(out)
+
+def split_top_level(text, separator):
+    """text split on separator outside parentheses, quotes and $$ bodies"""
+    parts = []
+    depth = 0
+    start = 0
+    i = 0
+    n = len(text)
+    while i < n:
+        char = text[i]
+        if char == "'":
+            end = text.find("'", i + 1)
+            while end >= 0 and text.startswith("''", end):
+                end = text.find("'", end + 2)
+            i = n if end < 0 else end + 1
+            continue
+        if char == "$":
+            tag = re.match(r"\$(\w*)\$", text[i:])
+            if tag is not None:
+                end = text.find(tag.group(0), i + len(tag.group(0)))
+                i = n if end < 0 else end + len(tag.group(0))
+                continue
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:i].strip())
+            start = i + 1
+        i += 1
+    parts.append(text[start:].strip())
+    return [part for part in parts if part]
+
+def parenthesized(text, open_):
+    """Contents of the parentheses opening at text[open_]"""
+    depth = 0
+    for i in range(open_, len(text)):
+        if text[i] == "(":
+            depth += 1
+        elif text[i] == ")":
+            depth -= 1
+            if depth == 0:
+                return text[open_ + 1:i]
+    return text[open_ + 1:]
+
+def index_columns(elements):
+    """Column names of an index's elements; expressions such as lower(email) become None"""
+    columns = []
+    for element in split_top_level(elements, ","):
+        match = COLUMN_ELEMENT_PATTERN.match(element)
+        columns.append((match.group(1) or match.group(2)).lower() if match else None)
+    return tuple(columns)
+
+
+class Table:
+    def __init__(self, name, created_in=None):
+        self.name = name
+        self.created_in = created_in   # migration file with its CREATE TABLE, or None
+        self.columns = set()
+        self.indexes = {}              # index name -> column tuple
+
+    def leading(self):
+        return {columns[0] for columns in self.indexes.values() if columns and columns[0]}
+
+
+class Schema:
+    """Tables, columns and indexes as left by a sequence of migrations"""
+
+    def __init__(self):
+        self.tables = {}
+
+    def table(self, name):
+        if name not in self.tables:
+            self.tables[name] = Table(name)
+        return self.tables[name]
+
+    def load(self, migrations_dir):
+        """Apply every *.sql file in migrations_dir in file name order"""
+        paths = sorted(Path(migrations_dir).glob("*.sql"))
+        for path in paths:
+            sql = strip_comments(path.read_text(encoding="utf-8", errors="replace"))
+            for statement in split_top_level(sql, ";"):
+                self.apply(" ".join(statement.split()), path.name)
+        return len(paths)
+
+    def apply(self, statement, source):
+        match = DO_BLOCK_PATTERN.match(statement)
+        if match:
+            # DDL guarded by IF EXISTS checks inside an anonymous block
+            for inner in split_top_level(match.group("body"), ";"):
+                ddl = DDL_START_PATTERN.search(inner)
+                if ddl:
+                    self.apply(inner[ddl.start():], source)
+            return
+        match = CREATE_TABLE_PATTERN.match(statement)
+        if match:
+            return self._create_table(unquote(match.group("table")),
+                                      parenthesized(statement, match.end() - 1), source)
+        match = CREATE_INDEX_PATTERN.match(statement)
+        if match:
+            table = unquote(match.group("table"))
+            columns = index_columns(parenthesized(statement, match.end() - 1))
+            name = unquote(match.group("name")) if match.group("name") else f"{table}_{'_'.join(map(str, columns))}_idx"
+            self.table(table).indexes[name] = columns
+            return
+        match = ALTER_TABLE_PATTERN.match(statement)
+        if match:
+            table = self.table(unquote(match.group("table")))
+            for action in split_top_level(match.group("actions"), ","):
+                self._alter(table, action)
+            return
+        match = DROP_PATTERN.match(statement)
+        if match:
+            for name in split_top_level(match.group("names"), ","):
+                self._drop(match.group("kind").lower(), unquote(name))
+
+    def _create_table(self, name, body, source):
+        table = self.tables.get(name)
+        if table is None or table.created_in is None:
+            # IF NOT EXISTS over an existing definition keeps the original
+            table = self.table(name)
+            table.created_in = source
+        for element in split_top_level(body, ","):
+            if element.split()[0].lower() in TABLE_CONSTRAINT_WORDS:
+                self._constraint(table, element)
+            else:
+                self._column(table, element)
+
+    def _column(self, table, definition):
+        column = unquote(definition.split()[0])
+        table.columns.add(column)
+        for key in INLINE_KEY_PATTERN.findall(definition):
+            suffix = "pkey" if key.lower().startswith("primary") else f"{column}_key"
+            table.indexes[f"{table.name}_{suffix}"] = (column,)
+
+    def _constraint(self, table, element):
+        match = KEY_PATTERN.match(element)
+        if match is None:
+            return
+        columns = index_columns(parenthesized(element, match.end() - 1))
+        primary = match.group("kind").lower().startswith("primary")
+        suffix = "pkey" if primary else f"{'_'.join(map(str, columns))}_key"
+        table.indexes[f"{table.name}_{suffix}"] = columns
+
+    def _alter(self, table, action):
+        if re.match(r"^add\s+(?:constraint\s+\S+\s+)?(?:primary\s+key|unique)\s*\(", action, re.IGNORECASE):
+            self._constraint(table, action[3:].strip())
+            return
+        match = ADD_COLUMN_PATTERN.match(action)
+        if match and not re.match(r"^(?:constraint|foreign|check)\b", match.group("definition"), re.IGNORECASE):
+            self._column(table, match.group("definition"))
+            return
+        match = DROP_COLUMN_PATTERN.match(action)
+        if match and not action.lower().startswith("drop constraint"):
+            column = unquote(match.group("column"))
+            table.columns.discard(column)
+            table.indexes = {name: cols for name, cols in table.indexes.items() if column not in cols}
+
+    def _drop(self, kind, name):
+        if kind == "table":
+            self.tables.pop(name, None)
+            return
+        for table in self.tables.values():
+            table.indexes.pop(name, None)
+
+    def indexed(self, table, column):
+        """True if an index, primary key or unique constraint leads with column"""
+        known = self.tables.get(table)
+        if known is None or known.created_in is None:
+            # Created before the migrations: only the id primary key is assumed
+            if column == "id":
+                return True
+        return known is not None and column in known.leading()
+
+    def later_in(self, table, column):
+        """Names of composite indexes holding column in second place or later"""
+        known = self.tables.get(table)
+        if known is None:
+            return []
+        return sorted(name for name, columns in known.indexes.items() if column in columns[1:])
+
+
+def scan_file(path):
+    """[(table, column, method, line)] for every filter column in one route file"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if b".from(" not in data:
+        return []
+    query = QuerySource(data.decode("utf-8", "replace"))
+    filters = []
+    for chain in query.chains:
+        calls = list(chain.calls)
+        builder = query.builder_name(chain)
+        if builder is not None:
+            calls += query.builder_call_list(builder, chain.end, query.scope_end(chain))
+        for call in calls:
+            if call.name not in FILTER_METHODS:
+                continue
+            column = query.first_arg(call)
+            # Embedded-table columns (profiles.name) filter the other table
+            if column and "." not in column:
+                filters.append((chain.table, column, call.name, query.line(call.index)))
+    return filters
+
+def collect_filters(api_dir, workers=None):
+    """({(table, column): {methods, routes}}, RouteScan)"""
+    scan = RouteScan(api_dir).run(workers)
+    relpaths = list(scan.routes)
+    paths = [str(Path(api_dir) / r) for r in relpaths]
+    if len(paths) >= POOL_THRESHOLD and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(scan_file, paths, chunksize=16))
+    else:
+        results = [scan_file(p) for p in paths]
+
+    usage = {}
+    for relpath, filters in zip(relpaths, results):
+        for table, column, method, line in filters:
+            entry = usage.setdefault((table, column), {"methods": Counter(), "routes": {}})
+            entry["methods"][method] += 1
+            entry["routes"].setdefault(route_name(relpath), []).append(line)
+    return usage, scan
+
+def missing_indexes(schema, usage, min_uses=2):
+    """Unindexed (table, column) pairs used at least min_uses times, most used first"""
+    rows = []
+    for (table, column), entry in usage.items():
+        uses = sum(entry["methods"].values())
+        if uses < min_uses or schema.indexed(table, column):
+            continue
+        known = schema.tables.get(table)
+        rows.append({
+            "table": table,
+            "column": column,
+            "uses": uses,
+            "methods": dict(entry["methods"]),
+            "routes": entry["routes"],
+            "created_in": known.created_in if known else None,
+            "composite": schema.later_in(table, column),
+        })
+    rows.sort(key=lambda r: (-r["uses"], r["table"], r["column"]))
+    return rows
+
+def index_name(table, column):
+    return f"idx_{table}_{column}"[:MAX_IDENTIFIER]
+
+def describe(row):
+    methods = ", ".join(f"{m} x{n}" for m, n in sorted(row["methods"].items()))
+    text = f"{methods} in {len(row['routes'])} routes"
+    if row["composite"]:
+        text += f"; not leading in {', '.join(row['composite'])}"
+    if row["created_in"] is None:
+        text += "; table not created in migrations"
+    return text
+
+def migration_stub(rows):
+    lines = [
+        "-- Missing indexes found by index_scan.py",
+        "-- Columns the API routes filter or sort on with no index in supabase/migrations.",
+        "-- Review before applying: low-cardinality columns (status, booleans) may be",
+        "-- better served by a composite or partial index.",
+    ]
+    for row in rows:
+        methods = ", ".join(f"{m} x{n}" for m, n in sorted(row["methods"].items()))
+        lines += [
+            "",
+            f"-- {row['table']}.{row['column']}: {methods} in {len(row['routes'])} routes",
+            f"CREATE INDEX IF NOT EXISTS {index_name(row['table'], row['column'])} "
+            f"ON {row['table']}({row['column']});",
+        ]
+    return "\n".join(lines) + "\n"
+
+def main():
+    parser = argparse.ArgumentParser(description="Find route filter columns with no index in the migrations")
+    parser.add_argument("--api-dir", default=str(API_DIR), help="src/app/api directory")
+    parser.add_argument("--migrations", default=None,
+                        help="SQL migrations directory (default: supabase/migrations next to src/)")
+    parser.add_argument("--min-uses", type=int, default=2,
+                        help="only report columns filtered at least this many times")
+    parser.add_argument("--stub-out", metavar="PATH", help="write a CREATE INDEX migration stub")
+    parser.add_argument("--json-out", metavar="PATH", help="write the findings as JSON")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size")
+    args = parser.parse_args()
+
+    migrations = Path(args.migrations) if args.migrations else Path(args.api_dir).parents[2] / "supabase" / "migrations"
+    schema = Schema()
+    files = schema.load(migrations)
+    usage, scan = collect_filters(args.api_dir, args.workers)
+    rows = missing_indexes(schema, usage, args.min_uses)
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=1)
+    if args.stub_out and rows:
+        with open(args.stub_out, "w", encoding="utf-8") as f:
+            f.write(migration_stub(rows))
+
+    print("=" * 60)
+    print(f"MISSING INDEXES ({files} migrations, {len(scan.routes)} route files)")
+    print("=" * 60 + "\n")
+    for row in rows:
+        marker = "⚠" if row["created_in"] is None else "✗"
+        print(f"{marker} MISSING INDEX: {row['table']}.{row['column']} ({describe(row)})")
+
+    created = sum(1 for t in schema.tables.values() if t.created_in)
+    print("\n" + "=" * 60)
+    print("MISSING INDEX SUMMARY")
+    print("=" * 60)
+    print(f"Tables created in migrations: {created}  "
+          f"indexes: {sum(len(t.indexes) for t in schema.tables.values())}")
+    print(f"Filtered columns: {len(usage)}  used {args.min_uses}+ times with no index: {len(rows)}")
+    print(f"  on tables created in migrations: {sum(1 for r in rows if r['created_in'])}")
+    if args.stub_out:
+        print(f"Migration stub: {args.stub_out if rows else 'nothing to write'}")
+    print("=" * 60 + "\n")
+
+if __name__ == "__main__":
+    main()
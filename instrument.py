@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Run Instrumentation
+Phase timers, file/syscall counters and per-file durations shared by the
+documentation and codemod scripts. Everything is off by default: phase()
+and file_span() return one shared no-op context manager and count() returns
+at once, and no hooks are installed, until enable() is called (normally via
+--trace / --profile / --timings). At exit the run is written as a Chrome
+trace-event JSON file (open in chrome://tracing or ui.perfetto.dev) whose
+"otherData" holds the phase totals, counters and slowest files, and cProfile
+stats are dumped if requested.
+
+Usage (from a script):
+  instrument.add_trace_arguments(parser)
+  args = parser.parse_args()
+  instrument.enable_from_args(args)
+  with instrument.phase("scan"):
+      ...
+  with instrument.file_span(path):
+      ...
+"""
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import nullcontext
+
+# Audit events (see sys.addaudithook) counted as file/syscall operations
+AUDIT_EVENTS = {
+    "open": "open",
+    "os.scandir": "scandir",
+    "os.listdir": "listdir",
+    "os.rename": "rename",
+    "os.remove": "remove",
+    "os.mkdir": "mkdir",
+    "os.chmod": "chmod",
+    "shutil.move": "move",
+    "shutil.copyfile": "copy",
+}
+
+# Slowest files listed in the summary
+SLOWEST_FILES = 10
+
+enabled = False
+
+_NULL = nullcontext()
+_lock = threading.Lock()
+_origin = 0
+_events = []
+_phases = defaultdict(lambda: [0, 0])  # name -> [count, total ns]
+_counters = Counter()
+_files = []  # (ns, label)
+_threads = {}
+_trace_path = None
+_profile_path = None
+_profiler = None
+_print_summary = False
+_hooks_installed = False
+
+
+def _tid():
+    """Small per-thread trace lane number, assigned in first-use order"""
+    ident = threading.get_ident()
+    with _lock:
+        if ident not in _threads:
+            _threads[ident] = len(_threads) + 1
+        return _threads[ident]
+
+def record(name, start_ns, elapsed_ns, cat="phase", pid=None, tid=None, args=None):
+    """Add one finished span (start from time.perf_counter_ns, which is shared across processes)"""
+    event = {
+        "name": name, "cat": cat, "ph": "X",
+        "ts": (start_ns - _origin) / 1000, "dur": elapsed_ns / 1000,
+        "pid": pid or os.getpid(), "tid": tid or _tid(),
+    }
+    if args:
+        event["args"] = args
+    with _lock:
+        _events.append(event)
+        if cat == "file":
+            _files.append((elapsed_ns, name))
+        else:
+            totals = _phases[name]
+            totals[0] += 1
+            totals[1] += elapsed_ns
+
+class _Span:
+    __slots__ = ("name", "cat", "args", "start")
+
+    def __init__(self, name, cat, args):
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, self.start, time.perf_counter_ns() - self.start, self.cat, args=self.args)
+        return False
+
+def phase(name, **args):
+    """Context manager timing one phase of the run"""
+    if not enabled:
+        return _NULL
+    return _Span(name, "phase", args)
+
+def file_span(label, **args):
+    """Context manager timing the work on one file"""
+    if not enabled:
+        return _NULL
+    return _Span(str(label), "file", args)
+
+def count(name, n=1):
+    """Add n to a named counter"""
+    if not enabled:
+        return
+    with _lock:
+        _counters[name] += n
+
+
+def _audit(event, args):
+    name = AUDIT_EVENTS.get(event)
+    if name is not None and enabled:
+        with _lock:
+            _counters[f"sys.{name}"] += 1
+
+def _counting(func, name):
+    def wrapper(*args, **kwargs):
+        if enabled:
+            with _lock:
+                _counters[name] += 1
+        return func(*args, **kwargs)
+    wrapper.__wrapped__ = func
+    return wrapper
+
+def _install_hooks():
+    """Audit hook for opens/renames/mkdirs/...; os.stat isn't audited, so it is wrapped"""
+    global _hooks_installed
+    if _hooks_installed:
+        return
+    sys.addaudithook(_audit)
+    os.stat = _counting(os.stat, "sys.stat")
+    os.lstat = _counting(os.lstat, "sys.lstat")
+    _hooks_installed = True
+
+def enable(trace_path=None, profile_path=None, summary=False):
+    """Start recording; the trace, profile and summary are written at exit"""
+    global enabled, _origin, _trace_path, _profile_path, _profiler, _print_summary
+    if enabled:
+        return
+    _origin = time.perf_counter_ns()
+    _trace_path = trace_path
+    _profile_path = profile_path
+    _print_summary = summary
+    _install_hooks()
+    enabled = True
+    atexit.register(finish)
+    if profile_path:
+        import cProfile
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+
+def summary():
+    """Phase totals, counters and slowest files recorded so far"""
+    with _lock:
+        slowest = sorted(_files, reverse=True)[:SLOWEST_FILES]
+        return {
+            "wall_ms": round((time.perf_counter_ns() - _origin) / 1e6, 1),
+            "phases": {name: {"count": c, "ms": round(ns / 1e6, 1)} for name, (c, ns) in _phases.items()},
+            "counters": dict(sorted(_counters.items())),
+            "files": {
+                "count": len(_files),
+                "ms": round(sum(ns for ns, _ in _files) / 1e6, 1),
+                "slowest": [{"file": label, "ms": round(ns / 1e6, 2)} for ns, label in slowest],
+            },
+        }
+
+def print_summary(report, out=sys.stderr):
+    print("\n" + "=" * 60, file=out)
+    print(f"TIMINGS ({report['wall_ms']:.0f} ms wall)", file=out)
+    print("=" * 60, file=out)
+    for name, totals in report["phases"].items():
+        calls = f" x{totals['count']}" if totals["count"] > 1 else ""
+        print(f"  {name:<36} {totals['ms']:>10.1f} ms{calls}", file=out)
+    files = report["files"]
+    if files["count"]:
+        print(f"\n  {files['count']} files, {files['ms']:.1f} ms total; slowest:", file=out)
+        for entry in files["slowest"]:
+            print(f"    {entry['ms']:>8.2f} ms  {entry['file']}", file=out)
+    if report["counters"]:
+        print(file=out)
+        for name, value in report["counters"].items():
+            print(f"  {name:<36} {value:>10}", file=out)
+    print("=" * 60 + "\n", file=out)
+
+def finish():
+    """Stop recording and write the trace, profile and summary (runs at exit)"""
+    global enabled, _profiler
+    if not enabled:
+        return
+    if _profiler is not None:
+        _profiler.disable()
+        _profiler.dump_stats(_profile_path)
+        _profiler = None
+    report = summary()
+    enabled = False
+
+    if _trace_path:
+        events = list(_events)
+        for name, value in report["counters"].items():
+            events.append({"name": name, "ph": "C", "ts": report["wall_ms"] * 1000,
+                           "pid": os.getpid(), "tid": 0, "args": {"value": value}})
+        with open(_trace_path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms",
+                       "otherData": {"argv": sys.argv, **report}}, f)
+    if _print_summary:
+        print_summary(report)
+    if _trace_path:
+        print(f"Trace written to {_trace_path}", file=sys.stderr)
+    if _profile_path:
+        print(f"Profile written to {_profile_path} (python -m pstats {_profile_path})", file=sys.stderr)
+
+
+def add_trace_arguments(parser):
+    """--trace, --profile and --timings, shared by the scripts"""
+    parser.add_argument("--trace", metavar="PATH",
+                        help="write phase/file timings and counters as a Chrome trace JSON at exit")
+    parser.add_argument("--profile", metavar="PATH", help="run under cProfile and dump stats to PATH")
+    parser.add_argument("--timings", action="store_true",
+                        help="print phase timings, slowest files and counters at exit")
+
+def enable_from_args(args):
+    if args.trace or args.profile or args.timings:
+        enable(args.trace, args.profile, args.timings)
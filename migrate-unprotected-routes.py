@@ -2,9 +2,16 @@
 """
 Systematically add requireAdminAPI guard to all unprotected admin routes
 """
+import argparse
 import os
-import re
-from pathlib import Path
+
+import instrument
+from auth_transforms import (
+    ADMIN_GUARD_TRANSFORMS, OLD_REQUIRE_ADMIN_MODULE, PUBLIC_ADMIN_ROUTES, REQUIRE_ADMIN_TRANSFORMS,
+)
+from codemod import CHANGED, MISSING, Job, add_engine_arguments, engine_from_args
+from git_changes import add_incremental_arguments, incremental_from_args
+from route_scan import LEGACY, UNGUARDED, RouteScan
 
 ADMIN_DIR = r"c:\Users\Faiz Hashmi\theautodoctor\src\app\api\admin"
 
@@ -65,134 +72,87 @@ OLD_REQUIRE_ADMIN_ROUTES = [
     "users/[id]/notify/route.ts",
 ]
 
-def add_auth_to_route(file_path):
-    """Add requireAdminAPI auth guard to a route file"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    original_content = content
-
-    # Step 1: Add import if not present
-    if 'requireAdminAPI' not in content:
-        # Find the import section
-        if "import { NextRequest, NextResponse } from 'next/server'" in content:
-            content = content.replace(
-                "import { NextRequest, NextResponse } from 'next/server'",
-                "import { NextRequest, NextResponse } from 'next/server'\nimport { requireAdminAPI } from '@/lib/auth/guards'"
-            )
-        elif 'import { NextRequest, NextResponse } from "next/server"' in content:
-            content = content.replace(
-                'import { NextRequest, NextResponse } from "next/server"',
-                'import { NextRequest, NextResponse } from "next/server"\nimport { requireAdminAPI } from \'@/lib/auth/guards\''
-            )
-
-    # Step 2: Add auth check to each handler function (GET, POST, PUT, DELETE, PATCH)
-    handler_pattern = r'(export async function (GET|POST|PUT|DELETE|PATCH)\([^)]*\)(?:\s*:\s*[^{]+)?\s*\{)\s*(\n\s*try\s*\{)?'
-
-    def add_auth_check(match):
-        func_signature = match.group(1)
-        has_try = match.group(3)
-
-        # Check if auth already exists in the function
-        # Look ahead to see if requireAdminAPI is already called
-        func_start_pos = match.start()
-        func_content = content[func_start_pos:func_start_pos+500]  # Check first 500 chars
-
-        if 'requireAdminAPI' in func_content or 'requireAdmin' in func_content:
-            return match.group(0)  # Already has auth
-
-        if has_try:
-            return f"{func_signature}{has_try}\n    // ✅ SECURITY: Require admin authentication\n    const authResult = await requireAdminAPI(req)\n    if (authResult.error) return authResult.error\n\n    const admin = authResult.data\n"
+def discover_routes(admin_dir, workers=None, log=print):
+    """Build both route lists from a scan of the API tree instead of the lists above"""
+    api_dir = os.path.dirname(os.path.normpath(admin_dir))
+    scan = RouteScan(api_dir).run(workers)
+    prefix = os.path.basename(os.path.normpath(admin_dir)) + "/"
+    unprotected = [
+        path[len(prefix):] for path in scan.files_with(UNGUARDED, prefix)
+        if path[len(prefix):] not in PUBLIC_ADMIN_ROUTES
+    ]
+    old_require_admin = [
+        path[len(prefix):]
+        for path in scan.files_with(LEGACY, prefix, guard="requireAdmin", guard_from=OLD_REQUIRE_ADMIN_MODULE)
+    ]
+    log(f"Discovered {len(unprotected)} unprotected and {len(old_require_admin)} old requireAdmin routes "
+          f"({scan.scanned} files scanned, {scan.cached} from cache)")
+    return unprotected, old_require_admin
+
+def report(engine, results, done, pending):
+    """Print one status line per file as its result streams in"""
+    for result in results:
+        route = result.job.label
+        if result.status == MISSING:
+            engine.log(f"SKIP (not found): {route}")
+        elif result.status == CHANGED:
+            engine.log(f"✓ {done}: {route}")
         else:
-            return f"{func_signature}\n  try {{\n    // ✅ SECURITY: Require admin authentication\n    const authResult = await requireAdminAPI(req)\n    if (authResult.error) return authResult.error\n\n    const admin = authResult.data\n"
-
-    content = re.sub(handler_pattern, add_auth_check, content)
-
-    # Return True if file was modified
-    return content, content != original_content
-
-def migrate_old_require_admin(file_path):
-    """Migrate from old requireAdmin to requireAdminAPI"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    original_content = content
-
-    # Replace import
-    content = content.replace("from '@/lib/auth/requireAdmin'", "from '@/lib/auth/guards'")
-    content = content.replace('import { requireAdmin }', 'import { requireAdminAPI }')
-
-    # Replace auth check pattern
-    content = content.replace('const auth = await requireAdmin(', 'const authResult = await requireAdminAPI(')
-    content = re.sub(
-        r'if \(\!auth\.authorized\) \{\s*return auth\.response!\s*\}',
-        'if (authResult.error) return authResult.error\n\n    const admin = authResult.data',
-        content
-    )
-
-    # Replace references
-    content = content.replace('auth.user!.id', 'admin.id')
-    content = content.replace('auth.user.id', 'admin.id')
-    content = content.replace('auth.profile?.full_name', 'admin.email')
-    content = content.replace('auth.profile?.email', 'admin.email')
-    content = content.replace('auth.profile.full_name', 'admin.email')
-    content = content.replace('auth.profile.email', 'admin.email')
-
-    return content, content != original_content
+            engine.log(f"SKIP ({pending}): {route}")
 
 def main():
-    files_migrated = 0
-    files_skipped = 0
-
-    print("\n" + "="*60)
-    print("MIGRATING UNPROTECTED ROUTES (Adding requireAdminAPI)")
-    print("="*60 + "\n")
-
-    for route in UNPROTECTED_ROUTES:
-        file_path = os.path.join(ADMIN_DIR, route.replace('/', os.sep))
-        if not os.path.exists(file_path):
-            print(f"SKIP (not found): {route}")
-            files_skipped += 1
-            continue
-
-        new_content, changed = add_auth_to_route(file_path)
-        if changed:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(new_content)
-            print(f"✓ SECURED: {route}")
-            files_migrated += 1
-        else:
-            print(f"SKIP (already secured): {route}")
-            files_skipped += 1
-
-    print("\n" + "="*60)
-    print("MIGRATING OLD requireAdmin IMPORTS")
-    print("="*60 + "\n")
-
-    for route in OLD_REQUIRE_ADMIN_ROUTES:
-        file_path = os.path.join(ADMIN_DIR, route.replace('/', os.sep))
-        if not os.path.exists(file_path):
-            print(f"SKIP (not found): {route}")
-            files_skipped += 1
-            continue
-
-        new_content, changed = migrate_old_require_admin(file_path)
-        if changed:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(new_content)
-            print(f"✓ MIGRATED: {route}")
-            files_migrated += 1
-        else:
-            print(f"SKIP (already migrated): {route}")
-            files_skipped += 1
-
-    print("\n" + "="*60)
-    print("MIGRATION SUMMARY")
-    print("="*60)
-    print(f"Files migrated: {files_migrated}")
-    print(f"Files skipped: {files_skipped}")
-    print(f"Total processed: {files_migrated + files_skipped}")
-    print("="*60 + "\n")
+    parser = argparse.ArgumentParser(description="Add requireAdminAPI to unprotected admin routes")
+    parser.add_argument("--discover", action="store_true",
+                        help="find routes by scanning the API tree instead of using the hard-coded lists")
+    parser.add_argument("--admin-dir", default=ADMIN_DIR, help="src/app/api/admin directory")
+    add_engine_arguments(parser)
+    add_incremental_arguments(parser)
+    args = parser.parse_args()
+
+    engine = engine_from_args(args)
+    unprotected_routes = UNPROTECTED_ROUTES
+    old_require_admin_routes = OLD_REQUIRE_ADMIN_ROUTES
+    if args.discover:
+        unprotected_routes, old_require_admin_routes = discover_routes(args.admin_dir, args.workers, engine.log)
+    tracker, changes = incremental_from_args(args, "migrate-unprotected-routes", args.admin_dir, engine.log)
+    if changes is not None:
+        unprotected_routes = changes.select(args.admin_dir, unprotected_routes)
+        old_require_admin_routes = changes.select(args.admin_dir, old_require_admin_routes)
+
+    def jobs(routes, transforms):
+        return [
+            Job(os.path.join(args.admin_dir, route.replace('/', os.sep)), transforms,
+                label=f"src/app/api/admin/{route}")
+            for route in routes
+        ]
+
+    engine.log("\n" + "="*60)
+    engine.log("MIGRATING UNPROTECTED ROUTES (Adding requireAdminAPI)")
+    engine.log("="*60 + "\n")
+    with instrument.phase("admin-guard"):
+        report(engine, engine.run(jobs(unprotected_routes, ADMIN_GUARD_TRANSFORMS)), "SECURED", "already secured")
+
+    engine.log("\n" + "="*60)
+    engine.log("MIGRATING OLD requireAdmin IMPORTS")
+    engine.log("="*60 + "\n")
+    with instrument.phase("require-admin"):
+        report(engine, engine.run(jobs(old_require_admin_routes, REQUIRE_ADMIN_TRANSFORMS)), "MIGRATED", "already migrated")
+    engine.close()
+
+    files_skipped = engine.files_unchanged + engine.files_missing
+    engine.log("\n" + "="*60)
+    engine.log("MIGRATION SUMMARY" + (" (dry run)" if engine.dry_run else ""))
+    engine.log("="*60)
+    for name, count in sorted(engine.hits.items()):
+        engine.log(f"{name}: {count} hit(s)")
+    engine.log(f"Files migrated: {engine.files_changed}")
+    engine.log(f"Files skipped: {files_skipped}")
+    engine.log(f"Total processed: {engine.files_changed + files_skipped}")
+    engine.log("="*60 + "\n")
+
+    # Dry runs leave the tree as it was, so the next real run must still see these files
+    if tracker is not None and not engine.dry_run:
+        tracker.advance()
 
 if __name__ == '__main__':
     main()
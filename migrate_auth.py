@@ -2,96 +2,39 @@
 """
 Script to migrate mechanic API routes from legacy aad_mech cookie auth to requireMechanicAPI
 """
-import re
+import argparse
 import os
 
-def migrate_file(filepath):
-    """Migrate a single route file"""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
-
+import auth_transforms
+import instrument
+from auth_transforms import MECHANIC_TRANSFORMS
+from codemod import CHANGED, MISSING, SKIPPED, UNCHANGED, CodemodEngine, Job, add_engine_arguments, engine_from_args
+from git_changes import add_incremental_arguments, incremental_from_args
+from route_scan import LEGACY, RouteScan
+
+def report(engine, result):
+    """Print the outcome of one file; True if it was migrated"""
+    filepath = result.job.path
+    if result.status == MISSING:
+        engine.log(f"  SKIP (not found): {filepath}")
     # Check if already migrated
-    if 'requireMechanicAPI' in content:
-        print(f"  ✓ Already migrated: {filepath}")
-        return False
-
-    # Add import if not present
-    if 'requireMechanicAPI' not in content:
-        # Find the import section
-        import_pattern = r"(import.*from '@/lib/supabaseAdmin')"
-        if re.search(import_pattern, content):
-            content = re.sub(
-                import_pattern,
-                r"\1\nimport { requireMechanicAPI } from '@/lib/auth/guards'",
-                content,
-                count=1
-            )
-
-    # Remove cookies import if only used for auth
-    content = re.sub(r"import \{ cookies \} from 'next/headers'\n?", "", content)
-
-    # Pattern 1: Replace cookie token retrieval
-    content = re.sub(
-        r"const token = req\.cookies\.get\('aad_mech'\)\?\.value\s*\n\s*\n\s*if \(!token\) \{\s*\n\s*return NextResponse\.json\(\{ error: 'Not authenticated' \}, \{ status: 401 \}\)\s*\n\s*\}",
-        "",
-        content,
-        flags=re.MULTILINE
-    )
-
-    # Pattern 2: Replace session validation block
-    session_validation = r"""// Validate session
-    const \{ data: session, error: sessionError \} = await supabaseAdmin
-      \.from\('mechanic_sessions'\)
-      \.select\('mechanic_id, expires_at'\)
-      \.eq\('token', token\)
-      \.single\(\)
-
-    if \(sessionError \|\| !session\) \{
-      return NextResponse\.json\(\{ error: 'Invalid session' \}, \{ status: 401 \}\)
-    \}
-
-    // Check if session is expired
-    if \(new Date\(session\.expires_at\) < new Date\(\)\) \{
-      return NextResponse\.json\(\{ error: 'Session expired' \}, \{ status: 401 \}\)
-    \}"""
-
-    content = re.sub(session_validation, "", content, flags=re.MULTILINE | re.DOTALL)
-
-    # Simpler pattern
-    content = re.sub(
-        r"\s*// Validate session.*?Session expired.*?\n\s*\}",
-        "",
-        content,
-        flags=re.DOTALL
-    )
-
-    # Replace session.mechanic_id with mechanic.id
-    content = re.sub(r"session\.mechanic_id", "mechanic.id", content)
-
-    # Add auth guard at start of each handler function
-    # Match function declarations
-    handler_pattern = r"(export async function (?:GET|POST|PUT|DELETE|PATCH)\([^)]*\) \{)\s*\n(\s*)const token"
-
-    def add_auth_guard(match):
-        func_start = match.group(1)
-        indent = match.group(2)
-        return f"""{func_start}
-{indent}// ✅ SECURITY: Require mechanic authentication
-{indent}const authResult = await requireMechanicAPI(req)
-{indent}if (authResult.error) return authResult.error
-
-{indent}const mechanic = authResult.data
-
-{indent}const token"""
-
-    # content = re.sub(handler_pattern, add_auth_guard, content, flags=re.MULTILINE)
-
-    # Write the migrated content
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write(content)
-
-    print(f"  ✓ Migrated: {filepath}")
-    return True
+    elif result.status == SKIPPED:
+        engine.log(f"  ✓ Already migrated: {filepath}")
+    elif result.status == UNCHANGED:
+        engine.log(f"  SKIP (no changes): {filepath}")
+    else:
+        detail = ", ".join(f"{name} x{count}" for name, count in result.hits.items())
+        engine.log(f"  ✓ Migrated: {filepath}" + (f" ({detail})" if detail else ""))
+    return result.status == CHANGED
+
+def migration_job(base, file):
+    return Job(os.path.join(base, file), MECHANIC_TRANSFORMS, unless='requireMechanicAPI', label=file)
+
+def migrate_file(filepath, engine=None):
+    """Migrate a single route file"""
+    engine = engine or CodemodEngine()
+    result = engine.run_file(filepath, MECHANIC_TRANSFORMS, unless='requireMechanicAPI')
+    return report(engine, result)
 
 # Files to migrate
 files = [
@@ -112,14 +55,46 @@ files = [
     "src/app/api/mechanics/stripe/onboard/route.ts",
 ]
 
+def discover_files(base, workers=None, log=print):
+    """Route files (relative to base) whose handlers still read the aad_mech cookie"""
+    api_dir = os.path.join(base, "src", "app", "api")
+    scan = RouteScan(api_dir).run(workers)
+    found = scan.files_with(LEGACY, "mechanic", guard="aad_mech")
+    log(f"Discovered {len(found)} aad_mech routes ({scan.scanned} files scanned, {scan.cached} from cache)")
+    return [f"src/app/api/{path}" for path in found]
+
 if __name__ == "__main__":
-    base = "C:\\Users\\Faiz Hashmi\\theautodoctor"
+    parser = argparse.ArgumentParser(description="Migrate aad_mech cookie auth to requireMechanicAPI")
+    parser.add_argument("--discover", action="store_true",
+                        help="find aad_mech routes by scanning the API tree instead of using the list above")
+    parser.add_argument("--base", default="C:\\Users\\Faiz Hashmi\\theautodoctor", help="repository root")
+    parser.add_argument("--match-window", type=int, default=auth_transforms.MATCH_WINDOW,
+                        help="bounded-time matching window in characters (0 = match whole files)")
+    add_engine_arguments(parser)
+    add_incremental_arguments(parser)
+    args = parser.parse_args()
+    auth_transforms.set_match_window(args.match_window)
+
+    engine = engine_from_args(args, auth_transforms.set_match_window, (args.match_window,))
+    base = args.base
     migrated_count = 0
-
-    print("Starting migration...")
-    for file in files:
-        filepath = os.path.join(base, file)
-        if migrate_file(filepath):
-            migrated_count += 1
-
-    print(f"\nMigration complete! Migrated {migrated_count} files.")
+    if args.discover:
+        files = discover_files(base, args.workers, engine.log)
+    tracker, changes = incremental_from_args(args, "migrate_auth", base, engine.log)
+    if changes is not None:
+        files = changes.select(base, files)
+
+    engine.log("Starting migration...")
+    with instrument.phase("migrate"):
+        for result in engine.run(migration_job(base, file) for file in files):
+            if report(engine, result):
+                migrated_count += 1
+    engine.close()
+
+    engine.log(f"\nMigration complete! Migrated {migrated_count} files." + (" (dry run)" if engine.dry_run else ""))
+    for name, count in sorted(engine.hits.items()):
+        engine.log(f"  {name}: {count} hit(s)")
+
+    # Dry runs leave the tree as it was, so the next real run must still see these files
+    if tracker is not None and not engine.dry_run:
+        tracker.advance()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Move Journal
+Append-only record of planned and completed reorganize_docs.py moves, so an
+interrupted run can resume without re-checking finished files and a run can
+be rolled back in reverse order
+"""
+
+import json
+import os
+import time
+
+# Journal operations
+OP_RUN = "run"
+OP_PLAN = "plan"
+OP_DONE = "done"
+OP_UNDONE = "undone"
+
+
+class MoveJournal:
+    """JSON-lines journal; one line per event, flushed as it is written"""
+
+    def __init__(self, path):
+        self.path = path
+        self.completed = {}   # (source, folder) -> run id that moved it
+        self.pending = set()  # planned but never confirmed (interrupted run)
+        self.order = []       # (run id, source, folder) of done events, in order
+        self.run_id = None
+        self._file = None
+        self._torn = False
+        self._load()
+
+    def _load(self):
+        try:
+            f = open(self.path, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                self._torn = not line.endswith("\n")
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    # A crash can leave a torn final line; ignore it
+                    continue
+                key = (event.get("src"), event.get("dest"))
+                op = event.get("op")
+                if op == OP_PLAN:
+                    self.pending.add(key)
+                elif op == OP_DONE:
+                    self.pending.discard(key)
+                    self.completed[key] = event["run"]
+                    self.order.append((event["run"], key[0], key[1]))
+                elif op == OP_UNDONE:
+                    self.completed.pop(key, None)
+
+    def _append(self, event):
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+            if self._torn:
+                # Terminate the partial line left by a crash
+                self._file.write("\n")
+        self._file.write(json.dumps(event, separators=(",", ":")) + "\n")
+        self._file.flush()
+
+    def start_run(self):
+        """Start a new run and return its id"""
+        self.run_id = time.strftime("%Y%m%dT%H%M%S") + f"-{os.getpid()}"
+        self._append({"op": OP_RUN, "run": self.run_id})
+        return self.run_id
+
+    def is_completed(self, source, folder):
+        return (source, folder) in self.completed
+
+    def is_pending(self, source, folder):
+        return (source, folder) in self.pending
+
+    def plan(self, moves):
+        """Record moves that are about to be attempted"""
+        for source, folder in moves:
+            self.pending.add((source, folder))
+            self._append({"op": OP_PLAN, "run": self.run_id, "src": source, "dest": folder})
+
+    def done(self, source, folder):
+        """Record a completed move"""
+        self.pending.discard((source, folder))
+        self.completed[(source, folder)] = self.run_id
+        self.order.append((self.run_id, source, folder))
+        self._append({"op": OP_DONE, "run": self.run_id, "src": source, "dest": folder})
+
+    def undone(self, source, folder):
+        """Record a move that has been rolled back"""
+        self.completed.pop((source, folder), None)
+        self._append({"op": OP_UNDONE, "run": self.run_id, "src": source, "dest": folder})
+
+    def last_run_moves(self):
+        """Still-completed moves of the most recent run that moved anything, newest first"""
+        live = [
+            (run, source, folder) for run, source, folder in self.order
+            if self.completed.get((source, folder)) == run
+        ]
+        if not live:
+            return None, []
+        last_run = live[-1][0]
+        moves = [(source, folder) for run, source, folder in live if run == last_run]
+        return last_run, list(reversed(moves))
+
+    def close(self):
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
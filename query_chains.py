@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Supabase Query Chains
+Finds every client.from('table').method(...).method(...) chain in a
+TypeScript source, with the statement it sits in and the variable its
+result (or the unawaited query builder) is bound to. Shared by the query
+scanners (unbounded_scan.py, index_scan.py).
+"""
+
+from collections import namedtuple
+
+from ts_tokens import SourceFile
+
+# name: method called; index: its token; open/close: its parentheses
+Call = namedtuple("Call", ["name", "index", "open", "close"])
+
+# table: from('...') argument; calls: every call after from(); start/end:
+# first and last token of the chain; block: innermost enclosing "{" (None
+# at module level); statement: (first, last) tokens of the statement in
+# that block holding the chain, or None
+QueryChain = namedtuple("QueryChain", ["table", "calls", "start", "end", "line", "block", "statement"])
+
+WRITE_METHODS = frozenset(["insert", "update", "upsert", "delete"])
+
+
+class QuerySource:
+    """Query chains of one source file"""
+
+    def __init__(self, text):
+        self.text = text
+        self.source = SourceFile(text)
+        self.tokens = self.source.tokens
+        self.partner = self.source.partner
+        self._statements = {}
+        self.chains = self._find_chains()
+
+    def _is(self, i, value):
+        return self.source._is(i, value)
+
+    def line(self, i):
+        return self.text.count("\n", 0, self.tokens[i].start) + 1
+
+    def _find_chains(self):
+        tokens = self.tokens
+        chains = []
+        blocks = []
+        for i, token in enumerate(tokens):
+            if token.kind == "punct":
+                if token.value == "{":
+                    blocks.append(i)
+                elif token.value == "}" and blocks:
+                    blocks.pop()
+                continue
+            if not (token.value == "from" and self._is(i - 1, ".") and self._is(i + 1, "(")
+                    and i + 2 < len(tokens) and tokens[i + 2].kind == "string"):
+                continue
+            close = self.partner[i + 1]
+            if close < 0:
+                continue
+            calls = [Call("from", i, i + 1, close)]
+            j = close + 1
+            while self._is(j, ".") and j + 2 < len(tokens) and tokens[j + 1].kind == "ident" and self._is(j + 2, "("):
+                end = self.partner[j + 2]
+                if end < 0:
+                    break
+                calls.append(Call(tokens[j + 1].value, j + 1, j + 2, end))
+                j = end + 1
+            block = blocks[-1] if blocks else None
+            start = i - 2 if i >= 2 and tokens[i - 2].kind == "ident" else i - 1
+            chains.append(QueryChain(
+                tokens[i + 2].value.strip("'\"`"), calls, start, calls[-1].close,
+                self.line(i), block, self._statement(block, i)
+            ))
+        return chains
+
+    def _statement(self, block, i):
+        if block is None:
+            return None
+        if block not in self._statements:
+            self._statements[block] = self.source.statements(block)
+        return next(((a, b) for a, b in self._statements[block] if a <= i <= b), None)
+
+    def method_names(self, chain):
+        return {call.name for call in chain.calls}
+
+    def is_write(self, chain):
+        return bool(self.method_names(chain) & WRITE_METHODS)
+
+    def first_arg(self, call):
+        """The first argument of a call if it is a plain string, else None"""
+        token = self.tokens[call.open + 1] if call.open + 1 < call.close else None
+        if token is None or token.kind != "string":
+            return None
+        return token.value[1:-1]
+
+    def args_contain(self, call, value):
+        return any(self._is(k, value) for k in range(call.open + 1, call.close))
+
+    def _declaration(self, chain):
+        """(first token of the declared pattern, token after "=") if the chain's statement declares it"""
+        if chain.statement is None:
+            return None
+        first, _ = chain.statement
+        if self.tokens[first].value not in ("const", "let", "var"):
+            return None
+        target = first + 1
+        equals = target + 1 if self.tokens[target].kind == "ident" else self.partner[target] + 1
+        if equals <= target or not self._is(equals, "="):
+            return None
+        return target, equals + 1
+
+    def result_names(self, chain, awaited_start=None):
+        """Variables holding the chain's rows: data / data: name, or the whole response"""
+        declaration = self._declaration(chain)
+        if declaration is None:
+            return set()
+        target, value = declaration
+        start = chain.start if awaited_start is None else awaited_start
+        if not (self._is(value, "await") and value + 1 == start):
+            return set()
+        return self.pattern_data(target)
+
+    def pattern_data(self, target):
+        """Names a declaration target binds to a query's rows"""
+        tokens = self.tokens
+        if tokens[target].kind == "ident":
+            return {tokens[target].value}
+        if not self._is(target, "{"):
+            return set()
+        for k in range(target + 1, self.partner[target]):
+            if self._is(k, "data") and not self._is(k - 1, ":"):
+                if self._is(k + 1, ":") and tokens[k + 2].kind == "ident":
+                    return {tokens[k + 2].value}
+                return {"data"}
+        return set()
+
+    def builder_name(self, chain):
+        """Name of the variable an unawaited query builder is stored in, else None"""
+        declaration = self._declaration(chain)
+        if declaration is None:
+            return None
+        target, value = declaration
+        if value != chain.start or self.tokens[target].kind != "ident":
+            return None
+        return self.tokens[target].value
+
+    def scope_end(self, chain):
+        """Last token index of the block the chain's statement is in"""
+        return self.partner[chain.block] if chain.block is not None else len(self.tokens) - 1
+
+    def builder_call_list(self, name, start, end):
+        """Calls made on a builder variable (name.method(...) / name = name.method(...)) in start..end"""
+        tokens = self.tokens
+        calls = []
+        for k in range(start, end):
+            if tokens[k].kind == "ident" and tokens[k].value == name and not self._is(k - 1, "."):
+                m = k + 1
+                while self._is(m, ".") and m + 2 < len(tokens) and tokens[m + 1].kind == "ident" \
+                        and self._is(m + 2, "("):
+                    if self.partner[m + 2] < 0:
+                        break
+                    calls.append(Call(tokens[m + 1].value, m + 1, m + 2, self.partner[m + 2]))
+                    m = self.partner[m + 2] + 1
+        return calls
+
+    def builder_calls(self, name, start, end):
+        """Names of the methods called on a builder variable in start..end"""
+        return {call.name for call in self.builder_call_list(name, start, end)}
+
+    def awaited_builder_results(self, name, start, end):
+        """Result names of declarations that await the builder: const { data } = await name"""
+        tokens = self.tokens
+        names = set()
+        for k in range(start, end):
+            if not (self._is(k, "await") and self._is(k + 1, name) and self._is(k - 1, "=")):
+                continue
+            target = k - 2
+            if self._is(target, "}") or self._is(target, "]"):
+                target = self.partner[target]
+            if target > 0 and tokens[target - 1].value in ("const", "let", "var"):
+                names |= self.pattern_data(target)
+        return names
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Regex Safety Check
+Times every codemod/scanner pattern and every auth transform against large
+and adversarial synthetic route files at growing sizes, and fails (exit 1)
+if time per KB grows superlinearly. Patterns listed in
+auth_transforms.BOUNDED_PATTERNS are only run through their bounded
+helpers, so their raw form is reported but doesn't fail the check.
+
+Usage:
+  python regex_safety.py                     # check, exit 1 on superlinear growth
+  python regex_safety.py --json-out PATH     # also record timings
+  python regex_safety.py --unbounded         # check with MATCH_WINDOW = 0
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+
+import auth_transforms
+import route_scan
+import ts_tokens
+
+# Input sizes in KB; growth is time per KB at the largest over the smallest
+SIZES_KB = (8, 32, 128)
+MAX_GROWTH = 3.0
+
+# Below this total time at the largest size, timings are too noisy to judge
+MIN_SECONDS = 0.005
+
+# Stop growing an input once one size takes this long (already superlinear)
+BUDGET_SECONDS = 0.5
+
+REPEATS = 3
+
+ROUTE_TEMPLATE = """import { NextRequest, NextResponse } from 'next/server'
+import { supabaseAdmin } from '@/lib/supabaseAdmin'
+import { cookies } from 'next/headers'
+
+export async function GET(req: NextRequest) {
+  try {
+    const token = req.cookies.get('aad_mech')?.value
+
+    if (!token) {
+      return NextResponse.json({ error: 'Not authenticated' }, { status: 401 })
+    }
+
+    // Validate session
+    const { data: session, error: sessionError } = await supabaseAdmin
+      .from('mechanic_sessions')
+      .select('mechanic_id, expires_at')
+      .eq('token', token)
+      .single()
+
+    if (sessionError || !session) {
+      return NextResponse.json({ error: 'Invalid session' }, { status: 401 })
+    }
+
+    // Check if session is expired
+    if (new Date(session.expires_at) < new Date()) {
+      return NextResponse.json({ error: 'Session expired' }, { status: 401 })
+    }
+
+    const { data } = await supabaseAdmin.from('jobs').select('*').eq('mechanic_id', session.mechanic_id)
+    const auth = await requireAdmin(req)
+    if (!auth.authorized) {
+      return auth.response!
+    }
+    return NextResponse.json({ data, by: auth.user.id, label: `job ${data?.length} }` })
+  } catch (error) {
+    return NextResponse.json({ error: 'Internal error' }, { status: 500 })
+  }
+}
+"""
+
+
+def _repeat(unit, size):
+    return (unit * (size // len(unit) + 1))[:size]
+
+# name -> function(size in bytes) -> text
+INPUTS = {
+    # Realistic route files, concatenated
+    "route": lambda n: _repeat(ROUTE_TEMPLATE, n),
+    # Opening anchors of the loose session pattern, closed only at the very end
+    "open-anchor": lambda n: _repeat("    // Validate session\n", n) + "Session expired",
+    # Anchor present once at the top, closing text never appears
+    "anchor-then-code": lambda n: "// Validate session\n" + _repeat("const a = b\n", n),
+    # Long whitespace runs (leading \s* / \s*\n\s* patterns)
+    "whitespace": lambda n: _repeat(" ", n),
+    "blank-lines": lambda n: _repeat("  \n", n),
+    # One minified line full of near-misses
+    "long-line": lambda n: _repeat("import x from 'y'; ", n),
+    # Unterminated string, comment and template
+    "open-string": lambda n: "'" + _repeat("a", n),
+    "open-comment": lambda n: "/*" + _repeat("a", n),
+    "open-template": lambda n: "`${" + _repeat("`${", n),
+    # Deeply nested braces
+    "nesting": lambda n: _repeat("{", n // 2) + _repeat("}", n // 2),
+}
+
+
+def module_patterns():
+    """(label, compiled pattern, bounded?) for every module-level pattern"""
+    found = []
+    for module in (auth_transforms, route_scan, ts_tokens):
+        for name, value in sorted(vars(module).items()):
+            if isinstance(value, re.Pattern):
+                bounded = module is auth_transforms and name in auth_transforms.BOUNDED_PATTERNS
+                found.append((f"{module.__name__}.{name}", value, bounded))
+    return found
+
+def targets():
+    """(label, function(text), bounded?) for everything the suite times"""
+    found = []
+    for label, pattern, bounded in module_patterns():
+        if isinstance(pattern.pattern, bytes):
+            run = lambda text, p=pattern: sum(1 for _ in p.finditer(text.encode("utf-8")))
+        else:
+            run = lambda text, p=pattern: sum(1 for _ in p.finditer(text))
+        found.append((label, run, bounded))
+    groups = (
+        auth_transforms.ADMIN_GUARD_TRANSFORMS
+        + auth_transforms.REQUIRE_ADMIN_TRANSFORMS
+        + auth_transforms.MECHANIC_TRANSFORMS
+    )
+    for name, transform in groups:
+        found.append((f"transform:{name}", transform, False))
+    found.append(("route_scan.scan_source", lambda text: route_scan.scan_source(text.encode("utf-8")), False))
+    return found
+
+def time_call(func, text):
+    best = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        if elapsed > BUDGET_SECONDS:
+            break
+    return best
+
+def measure(func):
+    """{input name: [seconds per size]}; a size over budget ends that input"""
+    results = {}
+    for input_name, make in INPUTS.items():
+        timings = []
+        for kb in SIZES_KB:
+            seconds = time_call(func, make(kb * 1024))
+            timings.append(seconds)
+            if seconds > BUDGET_SECONDS:
+                break
+        results[input_name] = timings
+    return results
+
+def growth(timings):
+    """Time-per-KB ratio between the largest and smallest size measured (None if too fast)"""
+    if len(timings) < len(SIZES_KB):
+        return float("inf")
+    if timings[-1] < MIN_SECONDS:
+        return None
+    per_kb_small = timings[0] / SIZES_KB[0]
+    per_kb_large = timings[-1] / SIZES_KB[-1]
+    return per_kb_large / max(per_kb_small, 1e-9)
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail on codemod patterns with superlinear running time")
+    parser.add_argument("--json-out", help="write timings to this JSON file")
+    parser.add_argument("--unbounded", action="store_true",
+                        help="check transforms with bounded-time matching turned off")
+    parser.add_argument("--only", help="only targets whose label contains this text")
+    args = parser.parse_args()
+
+    if args.unbounded:
+        auth_transforms.MATCH_WINDOW = 0
+
+    print("=" * 60)
+    print(f"REGEX SAFETY ({', '.join(f'{kb} KB' for kb in SIZES_KB)}; max growth {MAX_GROWTH:g}x)")
+    print("=" * 60 + "\n")
+
+    report = {"sizes_kb": list(SIZES_KB), "max_growth": MAX_GROWTH, "targets": {}}
+    failures = 0
+    for label, func, bounded in targets():
+        if args.only and args.only not in label:
+            continue
+        results = measure(func)
+        worst_input, worst = None, 0.0
+        for input_name, timings in results.items():
+            ratio = growth(timings)
+            if ratio is not None and ratio > worst:
+                worst_input, worst = input_name, ratio
+        largest = max(t[-1] / SIZES_KB[len(t) - 1] for t in results.values()) * 1e6
+        report["targets"][label] = {
+            "bounded": bounded,
+            "worst_input": worst_input,
+            "growth": None if worst == float("inf") else round(worst, 2),
+            "us_per_kb": {name: [round(t / kb * 1e6, 1) for t, kb in zip(timings, SIZES_KB)]
+                          for name, timings in results.items()},
+        }
+
+        if worst <= MAX_GROWTH:
+            status = "OK"
+        elif bounded:
+            status = "BOUNDED"
+        else:
+            status = "FAIL"
+            failures += 1
+        detail = f"{worst:.1f}x on {worst_input}" if worst_input else "too fast to measure"
+        print(f"{status:<8} {label:<55} {detail:<28} worst {largest:,.0f} us/KB")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    print("\n" + "=" * 60)
+    print(f"Superlinear targets: {failures}")
+    print("=" * 60 + "\n")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
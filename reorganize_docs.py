@@ -2,23 +2,60 @@
 """
 Documentation Reorganization Script
 Moves all .md files from root to appropriate documentation folders
+
+Usage:
+  python reorganize_docs.py                      # sequential moves
+  python reorganize_docs.py --workers 8          # bounded worker pool
+  python reorganize_docs.py --apply plan.json    # run a precomputed plan
+  python reorganize_docs.py --diff old.json new.json
+  python reorganize_docs.py --rollback           # undo the last run
+  python reorganize_docs.py --watch              # keep the root organized
+  python reorganize_docs.py --timings --trace reorg_trace.json
 """
 
+import argparse
 import os
 import shutil
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import instrument
+from doc_index import update_index
+from doc_plan import (
+    diff_plans, file_mapping, group_moves, load_plan, move_steps, new_folders
+)
+from doc_snapshot import DirSnapshot
+from doc_watch import watch
+from move_journal import MoveJournal
+from rewrite_doc_links import journaled_moves, rewrite_links
+from search_docs import refresh_search_index
+
 # Base paths
 ROOT_PATH = Path("c:/Users/Faiz Hashmi/theautodoctor")
 DOC_PATH = ROOT_PATH / "documentation"
+JOURNAL_NAME = ".reorg_journal.jsonl"
 
 # Track statistics
 stats = {
     "moved": 0,
     "skipped": 0,
-    "errors": 0
+    "errors": 0,
+    "resumed": 0
 }
 
+# Worker pool used by move_files (None = sequential move_file)
+executor = None
+
+# Destination folders already created, and their device ids
+created_dirs = {}
+
+# Snapshot of the root taken once at startup (replaces per-file exists())
+root_snapshot = None
+
+# Journal of planned/completed moves, used to resume and roll back runs
+journal = None
+
 def ensure_dir(path):
     """Create directory if it doesn't exist"""
     path.mkdir(parents=True, exist_ok=True)
@@ -28,10 +65,12 @@ def move_file(filename, destination_folder):
     source = ROOT_PATH / filename
     destination = DOC_PATH / destination_folder / filename
 
-    if source.exists():
+    if root_snapshot.exists(filename):
         try:
-            ensure_dir(DOC_PATH / destination_folder)
-            shutil.move(str(source), str(destination))
+            ensure_dir_once(DOC_PATH / destination_folder)
+            with instrument.file_span(filename):
+                shutil.move(str(source), str(destination))
+            root_snapshot.discard(filename)
             print(f"✓ Moved: {filename} → {destination_folder}")
             stats["moved"] += 1
             return True
@@ -43,192 +82,305 @@ def move_file(filename, destination_folder):
         stats["skipped"] += 1
         return False
 
+def ensure_dir_once(path):
+    """Create a destination directory once per run and cache its device id"""
+    if path not in created_dirs:
+        ensure_dir(path)
+        created_dirs[path] = os.stat(path).st_dev
+    return created_dirs[path]
+
+def _move_one(filename, destination_folder, same_device):
+    """Move a single file inside a worker, returning (status, error)"""
+    source = ROOT_PATH / filename
+    destination = DOC_PATH / destination_folder / filename
+    try:
+        with instrument.file_span(filename):
+            if same_device:
+                # Atomic rename; a missing source shows up as FileNotFoundError
+                # so we don't need a separate exists() round trip
+                os.replace(source, destination)
+            else:
+                shutil.move(str(source), str(destination))
+        return "moved", None
+    except FileNotFoundError:
+        if same_device or not source.exists():
+            return "skipped", None
+        return "errors", "source vanished during move"
+    except Exception as e:
+        return "errors", e
+
+def already_moved(filename, destination_folder):
+    """True if the journal shows this move finished in an earlier run"""
+    if root_snapshot.exists(filename):
+        # Back in root (new copy or rolled back): move it again
+        return False
+    if journal.is_completed(filename, destination_folder):
+        return True
+    if journal.is_pending(filename, destination_folder):
+        # Interrupted between the rename and the journal write
+        if (DOC_PATH / destination_folder / filename).exists():
+            journal.done(filename, destination_folder)
+            return True
+    return False
+
+def move_files(filenames, destination_folder):
+    """Move a group of files to one destination folder"""
+    todo = [f for f in filenames if not already_moved(f, destination_folder)]
+    stats["resumed"] += len(filenames) - len(todo)
+    filenames = todo
+    journal.plan((f, destination_folder) for f in filenames if root_snapshot.exists(f))
+
+    if executor is None:
+        for f in filenames:
+            if move_file(f, destination_folder):
+                journal.done(f, destination_folder)
+        return
+
+    present = [f for f in filenames if root_snapshot.exists(f)]
+    stats["skipped"] += len(filenames) - len(present)
+    if not present:
+        return
+
+    dest_dev = ensure_dir_once(DOC_PATH / destination_folder)
+    same_device = dest_dev == ensure_dir_once(ROOT_PATH)
+    results = executor.map(
+        lambda f: _move_one(f, destination_folder, same_device), present
+    )
+    # map() yields in submission order, so output matches the sequential run
+    for filename, (status, error) in zip(present, results):
+        stats[status] += 1
+        if status == "moved":
+            root_snapshot.discard(filename)
+            journal.done(filename, destination_folder)
+            print(f"✓ Moved: {filename} → {destination_folder}")
+        elif status == "errors":
+            print(f"✗ Error moving {filename}: {error}")
+
+def apply_plan(plan):
+    """Run a plan written by preview_reorganization.py --plan-out"""
+    for destination, entries in group_moves(plan).items():
+        for source, size, mtime in entries:
+            # The startup snapshot already has every mtime, so only entries
+            # that drifted since the plan was written need another look
+            info = root_snapshot.get(source)
+            if info is not None and info.mtime != mtime:
+                print(f"⚠ Changed since plan: {source} ({size} → {info.size} bytes)")
+        move_files([source for source, _, _ in entries], destination)
+    stats["skipped"] += len(plan["missing"])
+
+def rollback():
+    """Undo the most recent run, newest move first; returns {file name: folder it left}"""
+    run, moves = journal.last_run_moves()
+    if run is None:
+        print("Nothing to roll back.")
+        return {}
+
+    journal.start_run()
+    print(f"Rolling back run {run} ({len(moves)} moves)...")
+    restored = {}
+    for filename, destination_folder in moves:
+        source = ROOT_PATH / filename
+        destination = DOC_PATH / destination_folder / filename
+        if root_snapshot.exists(filename):
+            print(f"✗ Not restoring {filename}: a file with that name is already in root")
+            stats["errors"] += 1
+            continue
+        try:
+            shutil.move(str(destination), str(source))
+        except Exception as e:
+            print(f"✗ Error restoring {filename}: {e}")
+            stats["errors"] += 1
+            continue
+        journal.undone(filename, destination_folder)
+        print(f"↶ Restored: {destination_folder}/{filename} → root")
+        restored[filename] = destination_folder
+    return restored
+
+def print_plan_diff(old_path, new_path):
+    """Print the differences between two plans"""
+    added, removed, retargeted, changed = diff_plans(load_plan(old_path), load_plan(new_path))
+
+    print("=" * 60)
+    print(f"PLAN DIFF: {old_path} → {new_path}")
+    print("=" * 60)
+    for source, destination, _, _ in added:
+        print(f"+ {source} → {destination}")
+    for source, destination, _, _ in removed:
+        print(f"- {source} → {destination}")
+    for source, before, after in retargeted:
+        print(f"~ {source}: {before} → {after}")
+    for source, before, after in changed:
+        print(f"* {source}: {before} → {after} bytes")
+    if not (added or removed or retargeted or changed):
+        print("✓ Plans are identical")
+
+def after_moves(args):
+    """Follow-up work for the moves of the current journal run"""
+    # Point relative links in other docs at the new locations
+    if not args.no_links:
+        print("\nRewriting links to moved files...")
+        with instrument.phase("rewrite links"):
+            files_changed, links = rewrite_links(ROOT_PATH, journaled_moves(DOC_PATH, journal.run_id))
+        print(f"✓ Links rewritten: {links} in {files_changed} files")
+
+    # Keep documentation/INDEX.md counts and the search index in step with the moves
+    if not args.no_index:
+        with instrument.phase("update INDEX.md"):
+            updated = update_index(DOC_PATH)
+        if updated:
+            print("✓ documentation/INDEX.md regenerated")
+        with instrument.phase("refresh search index"):
+            reads = refresh_search_index(DOC_PATH)
+        if reads is not None:
+            print(f"✓ Search index updated ({reads} files indexed)")
+
+def after_rollback(args, restored):
+    """Undo after_moves for the files a rollback put back in root"""
+    if not args.no_links:
+        print("\nRewriting links to restored files...")
+        with instrument.phase("rewrite links"):
+            files_changed, links = rewrite_links(ROOT_PATH, restored, restored=True)
+        print(f"✓ Links rewritten: {links} in {files_changed} files")
+
+    if not args.no_index:
+        with instrument.phase("update INDEX.md"):
+            updated = update_index(DOC_PATH)
+        if updated:
+            print("✓ documentation/INDEX.md regenerated")
+        with instrument.phase("refresh search index"):
+            reads = refresh_search_index(DOC_PATH)
+        if reads is not None:
+            print(f"✓ Search index updated ({reads} files indexed)")
+
+def watch_root(args):
+    """Move planned .md files as they appear in root, until interrupted"""
+    destinations = {f: category for category, files in file_mapping.items() for f in files}
+    watcher = watch(ROOT_PATH, interval=args.interval, polling=args.poll)
+    print(f"\n👀 Watching {ROOT_PATH} for new .md files (Ctrl+C to stop)...")
+    try:
+        for names in watcher.batches():
+            groups = defaultdict(list)
+            for name in sorted(names):
+                category = destinations.get(name)
+                if category is None:
+                    print(f"⚠ Not in plan: {name}")
+                    continue
+                # One stat per new file keeps the startup snapshot current
+                if root_snapshot.refresh_entry(name):
+                    groups[category].append(name)
+            if not groups:
+                continue
+
+            journal.start_run()
+            moved_before = stats["moved"]
+            for category, files in groups.items():
+                move_files(files, category)
+            journal.close()
+            if stats["moved"] > moved_before:
+                after_moves(args)
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+    finally:
+        watcher.close()
+        if executor is not None:
+            executor.shutdown()
+
 def main():
+    global executor, root_snapshot, journal
+
+    parser = argparse.ArgumentParser(description="Move root .md files into documentation/")
+    parser.add_argument(
+        "--workers", type=int, default=0,
+        help="move files with a pool of N workers (0 = sequential, default)"
+    )
+    parser.add_argument(
+        "--apply", metavar="PLAN_JSON",
+        help="run a plan written by preview_reorganization.py --plan-out"
+    )
+    parser.add_argument(
+        "--diff", nargs=2, metavar=("OLD_PLAN", "NEW_PLAN"),
+        help="compare two plans and exit"
+    )
+    parser.add_argument(
+        "--rollback", action="store_true",
+        help="move the files from the last journaled run back to root"
+    )
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="after the run, keep moving planned files as they appear in root"
+    )
+    parser.add_argument(
+        "--poll", action="store_true",
+        help="with --watch, poll the root instead of using inotify"
+    )
+    parser.add_argument(
+        "--interval", type=float, default=2.0,
+        help="polling interval in seconds (default 2)"
+    )
+    parser.add_argument(
+        "--no-links", action="store_true",
+        help="don't rewrite markdown links that point at moved files"
+    )
+    parser.add_argument(
+        "--no-index", action="store_true",
+        help="don't regenerate documentation/INDEX.md after moving files"
+    )
+    instrument.add_trace_arguments(parser)
+    args = parser.parse_args()
+    instrument.enable_from_args(args)
+
+    if args.diff:
+        print_plan_diff(*args.diff)
+        return
+
+    with instrument.phase("snapshot root"):
+        root_snapshot = DirSnapshot(ROOT_PATH)
+        ensure_dir_once(DOC_PATH)
+        journal = MoveJournal(DOC_PATH / JOURNAL_NAME)
+
+    if args.rollback:
+        restored = rollback()
+        journal.close()
+        print(f"\n✓ Files restored: {len(restored)}")
+        print(f"✗ Errors: {stats['errors']}")
+        if restored:
+            after_rollback(args, restored)
+        return
+
+    journal.start_run()
+    if args.workers > 0:
+        executor = ThreadPoolExecutor(max_workers=args.workers)
+
     print("=" * 60)
     print("DOCUMENTATION REORGANIZATION")
     print("=" * 60)
 
     # Create new directories
-    print("\n[1/7] Creating new directory structure...")
-    ensure_dir(DOC_PATH / "00-summaries-analysis")
-    ensure_dir(DOC_PATH / "12-legal-compliance")
-    ensure_dir(DOC_PATH / "13-archived")
-    ensure_dir(DOC_PATH / "02-feature-documentation/inspection-controls")
-    ensure_dir(DOC_PATH / "02-feature-documentation/mechanic-matching")
-    ensure_dir(DOC_PATH / "02-feature-documentation/pricing-system")
-    ensure_dir(DOC_PATH / "11-migration-deployment/troubleshooting")
+    total_steps = 2 if args.apply else len(move_steps) + 1
+    print(f"\n[1/{total_steps}] Creating new directory structure...")
+    with instrument.phase("create folders"):
+        for folder in new_folders:
+            ensure_dir_once(DOC_PATH / folder)
     print("✓ Directory structure created")
 
-    # Move files to 00-summaries-analysis
-    print("\n[2/7] Moving analysis and summary files...")
-    analysis_files = [
-        "BUSINESS_LOGIC_FINAL_REPORT.md",
-        "DEVELOPMENT_EFFORT_AND_COST_ANALYSIS.md",
-        "BREAK_EVEN_ANALYSIS_DETAILED.md",
-        "AUDIT_CLAIMS_FINAL_VERDICT.md",
-        "CODEBASE_AUDIT_REPORT.md",
-        "BUSINESS_LOGIC_ANALYSIS_AND_RECOMMENDATIONS.md",
-        "CODEBASE_AUDIT_REPORT_UPDATES.md",
-        "CODEBASE_AUDIT_REPORT_UPDATE_2025-11-08.md",
-        "DAILY_WORK_SUMMARY_2025-11-08.md",
-        "REPORT_GENERATION_VERIFICATION.md",
-        "STRIPE_CONNECT_PAYMENT_SPLITS_ANALYSIS.md",
-        "COMPREHENSIVE_FIX_PLAN.md",
-        "SCHEMA_ANALYSIS_PART1.md"
-    ]
-    for f in analysis_files:
-        move_file(f, "00-summaries-analysis")
-
-    # Move files to 12-legal-compliance
-    print("\n[3/7] Moving legal and compliance files...")
-    legal_files = [
-        "CUSTOMER_OWNERSHIP_LEGAL_ANALYSIS.md",
-        "LEGAL_COMPLIANT_DUAL_MODE_SOLUTION.md",
-        "WORKSHOP_MECHANICS_EXECUTIVE_REPORT.md",
-        "VIRTUAL_VS_WORKSHOP_MECHANICS_POLICY.md",
-        "WORKSHOP_MECHANIC_BUSINESS_MODEL.md",
-        "ACCOUNT_SEPARATION_EXPLANATION.md"
-    ]
-    for f in legal_files:
-        move_file(f, "12-legal-compliance")
-
-    # Move files to 08-business-strategy
-    print("\n[4/7] Moving business strategy files...")
-
-    progress_files = [
-        "IMPLEMENTATION_PROGRESS.md",
-        "IMPLEMENTATION_STATUS_AND_NEXT_STEPS.md",
-        "PHASE1_COMPLETE_NEXT_STEPS.md",
-        "PHASE4_ANALYSIS_REPORT.md",
-        "PHASE4_COMPLETE.md"
-    ]
-    for f in progress_files:
-        move_file(f, "08-business-strategy/progress-reports")
-
-    roadmap_files = [
-        "FINAL_IMPLEMENTATION_PLAN.md",
-        "IMMEDIATE_ACTION_PLAN.md",
-        "FINAL_SEAMLESS_INTEGRATION_PLAN.md",
-        "WORKSHOP_IMPLEMENTATION_PLAN.md",
-        "SMART_WORKSHOP_SOLUTION.md",
-        "TRUST_BASED_WORKSHOP_SOLUTION.md",
-        "FINAL_REALISTIC_WORKSHOP_SOLUTION.md",
-        "ULTIMATE_MECHANIC_SELECTION_PLAN.md"
-    ]
-    for f in roadmap_files:
-        move_file(f, "08-business-strategy/feature-roadmap")
-
-    # Move bug fixes
-    print("\n[5/7] Moving bug fix documentation...")
-    bugfix_files = [
-        "CRITICAL_BUGS_FOUND.md",
-        "BUGS_FIXED.md",
-        "COMPLETION_MODAL_FIX.md",
-        "VIDEO_SESSION_MECHANIC_NAME_BUG.md",
-        "VIDEO_SESSION_MECHANIC_NAME_FIX_APPLIED.md",
-        "TAGS_PANEL_MOBILE_UPDATE.md",
-        "PRIVACY_FIXES_IMPLEMENTED.md"
-    ]
-    for f in bugfix_files:
-        move_file(f, "06-bug-fixes")
-
-    # Move feature documentation
-    print("\n[6/7] Moving feature documentation...")
-
-    inspection_files = [
-        "PROFESSIONAL_INSPECTION_CONTROLS_PLAN.md",
-        "PROFESSIONAL_INSPECTION_CONTROLS_IMPLEMENTATION.md",
-        "INSPECTION_CONTROLS_BUGS_FIXED.md",
-        "INSPECTION_CONTROLS_ANALYSIS_AND_RECOMMENDATIONS.md",
-        "INSPECTION_CONTROLS_IMPLEMENTATION_REPORT.md",
-        "INSPECTION_CONTROLS_COMPREHENSIVE_UPDATE.md"
-    ]
-    for f in inspection_files:
-        move_file(f, "02-feature-documentation/inspection-controls")
-
-    session_files = [
-        "SESSION_END_LOGIC_INSPECTION_SUMMARY.md",
-        "SESSION_END_LOGIC_VERIFICATION_REPORT.md",
-        "SESSION_EXECUTION_ACTUAL_STATE_REPORT.md",
-        "SESSION_DYNAMIC_PRICING_UPDATE.md",
-        "SESSION_WIZARD_ENHANCEMENT_PLAN.md",
-        "SESSIONWIZARD_REDESIGN_PROPOSAL.md",
-        "SESSIONWIZARD_TESTING_PLAN.md"
-    ]
-    for f in session_files:
-        move_file(f, "02-feature-documentation/session-management")
-
-    matching_files = [
-        "MECHANIC_MATCHING_AUDIT.md",
-        "MECHANIC_MATCHING_ISSUES_AND_FIXES.md",
-        "MECHANIC_SELECTION_IMPLEMENTATION_SUMMARY.md",
-        "MECHANIC_SELECTION_COMPLETION_SUMMARY.md",
-        "MECHANIC_DASHBOARD_ACCESS_ANALYSIS.md",
-        "THREE_TIER_MECHANIC_TESTING_PLAN.md"
-    ]
-    for f in matching_files:
-        move_file(f, "02-feature-documentation/mechanic-matching")
-
-    customer_files = [
-        "VEHICLE_ADD_FLOW_ANALYSIS.md",
-        "VEHICLE_ADD_IMPLEMENTATION_SUMMARY.md",
-        "CONTACT_INFO_PRIVACY_AUDIT.md",
-        "SIGNUP_FLOW_AUDIT_REPORT.md"
-    ]
-    for f in customer_files:
-        move_file(f, "02-feature-documentation/customer-portal")
-
-    admin_files = ["ADMIN_PLANS_CRUD_COMPLETE.md"]
-    for f in admin_files:
-        move_file(f, "02-feature-documentation/admin-panel")
-
-    pricing_files = [
-        "DYNAMIC_PRICING_TESTING_GUIDE.md",
-        "DYNAMIC_PRICING_IMPLEMENTATION_SUMMARY.md",
-        "DYNAMIC_PRICING_COMPLETE_REPORT.md",
-        "PLATFORM_FEE_IMPLEMENTATION_COMPLETE.md"
-    ]
-    for f in pricing_files:
-        move_file(f, "02-feature-documentation/pricing-system")
-
-    mechanic_portal_files = ["MECHANIC_REFERRAL_SYSTEM_IMPLEMENTATION.md"]
-    for f in mechanic_portal_files:
-        move_file(f, "02-feature-documentation/mechanic-portal")
-
-    # Move infrastructure files
-    print("\n[7/7] Moving infrastructure and setup files...")
-
-    migration_files = [
-        "MIGRATION_SETUP_GUIDE.md",
-        "MIGRATION_WORKFLOW_GUIDE.md",
-        "MIGRATION_SETUP_COMPLETE.md",
-        "MIGRATION_SYNC_SOLUTION.md",
-        "MANUAL_SYNC_PROCEDURE.md"
-    ]
-    for f in migration_files:
-        move_file(f, "11-migration-deployment")
-
-    setup_files = ["QUICK_START.md", "DOCKER_SETUP_GUIDE.md"]
-    for f in setup_files:
-        move_file(f, "01-project-setup")
-
-    testing_files = ["TESTING_GUIDE.md"]
-    for f in testing_files:
-        move_file(f, "05-testing-debugging")
-
-    troubleshooting_files = ["SUPABASE_CONNECTION_DIAGNOSIS.md"]
-    for f in troubleshooting_files:
-        move_file(f, "11-migration-deployment/troubleshooting")
-
-    # Move archived files
-    archived_files = [
-        "RESUME_TOMORROW.md",
-        "PARTNERSHIP_SYSTEM_REMOVAL_COMPLETE.md",
-        "FINAL_STATUS_AND_RECOMMENDATIONS.md",
-        "FINAL_RECOMMENDATION.md"
-    ]
-    for f in archived_files:
-        move_file(f, "13-archived")
+    if args.apply:
+        plan = load_plan(args.apply)
+        print(f"\n[2/{total_steps}] Applying plan {args.apply} ({len(plan['moves'])} moves)...")
+        with instrument.phase("apply plan"):
+            apply_plan(plan)
+    else:
+        for step, (title, categories) in enumerate(move_steps, start=2):
+            print(f"\n[{step}/{total_steps}] {title}...")
+            with instrument.phase(title):
+                for category in categories:
+                    move_files(file_mapping[category], category)
+
+    if executor is not None and not args.watch:
+        executor.shutdown()
+    journal.close()
+
+    for key, value in stats.items():
+        instrument.count(f"files.{key}", value)
 
     # Print summary
     print("\n" + "=" * 60)
@@ -236,16 +388,24 @@ def main():
     print("=" * 60)
     print(f"✓ Files moved: {stats['moved']}")
     print(f"- Files skipped (not found): {stats['skipped']}")
+    if stats["resumed"]:
+        print(f"↷ Already moved (journal): {stats['resumed']}")
     print(f"✗ Errors: {stats['errors']}")
 
+    if stats["moved"]:
+        after_moves(args)
+
     # List remaining .md files in root
-    remaining = list(ROOT_PATH.glob("*.md"))
+    remaining = root_snapshot.names(".md")
     if remaining:
         print(f"\n⚠ Remaining .md files in root ({len(remaining)}):")
-        for f in remaining:
-            print(f"  - {f.name}")
+        for name in remaining:
+            print(f"  - {name}")
     else:
         print("\n✓ All .md files moved from root directory!")
 
+    if args.watch:
+        watch_root(args)
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Documentation Link Rewriter
+Fixes relative markdown links after reorganize_docs.py moves files out of
+the repo root. All moved (and still-in-root) file names go into a single
+Aho-Corasick automaton, every .md file is scanned once, and only files whose
+content actually changed are written back.
+
+Usage:
+  python rewrite_doc_links.py              # rewrite for every journaled move
+  python rewrite_doc_links.py --dry-run    # report without writing
+"""
+
+import argparse
+import posixpath
+from collections import deque
+from pathlib import Path
+
+from doc_snapshot import DirSnapshot
+from move_journal import MoveJournal
+
+# Base paths
+ROOT_PATH = Path("c:/Users/Faiz Hashmi/theautodoctor")
+DOC_PATH = ROOT_PATH / "documentation"
+JOURNAL_NAME = ".reorg_journal.jsonl"
+
+# Characters that end a link target when scanning backwards from a match
+TARGET_STOP = frozenset(" \t\r\n()<>\"'[]")
+
+# Characters allowed right before a file name inside a target
+NAME_BOUNDARY = frozenset("/(<\"' \t:")
+
+
+class AhoCorasick:
+    """Multi-pattern matcher: one pass over the text finds every pattern"""
+
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+        for pattern in patterns:
+            state = 0
+            for ch in pattern:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                state = nxt
+            self.out[state].append(pattern)
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                fallback = self.goto[f].get(ch, 0)
+                # Children of the root fail back to the root, not themselves
+                self.fail[nxt] = fallback if fallback != nxt else 0
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def finditer(self, text):
+        """Yield (start, pattern) for every occurrence, in order of match end"""
+        goto, fail, out = self.goto, self.fail, self.out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                for pattern in out[state]:
+                    yield i - len(pattern) + 1, pattern
+
+
+def link_target_start(text, start):
+    """Start of the link target containing text[start], or None if not a link"""
+    i = start
+    while i > 0 and text[i - 1] not in TARGET_STOP:
+        i -= 1
+    before = text[max(0, i - 6):i]
+    if before.endswith("](") or before.endswith("](<") or before.endswith("]: ") or before.endswith('href="'):
+        return i
+    return None
+
+def rewrite_text(text, automaton, old_dir, new_dir, locations):
+    """
+    Rewrite link targets in one document.
+    old_dir/new_dir: repo-relative directory of the document before/after the
+    moves; locations: name -> (old repo-relative path, new repo-relative path)
+    """
+    edits = []
+    last_end = -1
+    for start, name in automaton.finditer(text):
+        if start <= last_end:
+            continue
+        if start > 0 and text[start - 1] not in NAME_BOUNDARY:
+            continue
+        old_path, new_path = locations[name]
+        # Names that didn't move only matter inside documents that did
+        if old_path == new_path and old_dir == new_dir:
+            continue
+        target_start = link_target_start(text, start)
+        if target_start is None:
+            continue
+        prefix = text[target_start:start]
+        if "://" in prefix or prefix.startswith("/"):
+            continue
+        if posixpath.normpath(posixpath.join(old_dir, prefix + name)) != old_path:
+            continue
+        replacement = posixpath.relpath(new_path, new_dir or ".")
+        end = start + len(name)
+        if text[target_start:end] != replacement:
+            edits.append((target_start, end, replacement))
+        last_end = end
+
+    if not edits:
+        return text, 0
+    parts = []
+    pos = 0
+    for s, e, replacement in edits:
+        parts.append(text[pos:s])
+        parts.append(replacement)
+        pos = e
+    parts.append(text[pos:])
+    return "".join(parts), len(edits)
+
+def rewrite_links(root_path, moves, dry_run=False, restored=False):
+    """
+    moves: {file name: destination folder under documentation/} for files that
+    moved out of root, or with restored=True, for files moved back from that
+    folder to root (a rollback). Returns (files changed, links rewritten)
+    """
+    root_path = Path(root_path)
+    doc_path = root_path / "documentation"
+    if not moves:
+        return 0, 0
+
+    root = DirSnapshot(root_path)
+    locations = {name: (name, name) for name in root.names(".md")}
+    for name, folder in moves.items():
+        moved_path = f"documentation/{folder}/{name}"
+        locations[name] = (moved_path, name) if restored else (name, moved_path)
+    automaton = AhoCorasick(locations)
+
+    documents = root.names(".md")
+    tree = DirSnapshot(doc_path, recursive=True)
+    documents += [f"documentation/{name}" for name in tree.files if name.endswith(".md")]
+
+    files_changed = 0
+    links_rewritten = 0
+    for relpath in documents:
+        new_dir = posixpath.dirname(relpath)
+        filename = posixpath.basename(relpath)
+        moved = filename in moves and locations[filename][1] == relpath
+        old_dir = posixpath.dirname(locations[filename][0]) if moved else new_dir
+
+        path = root_path / relpath
+        with open(path, "r", encoding="utf-8", errors="surrogateescape", newline="") as f:
+            text = f.read()
+        new_text, count = rewrite_text(text, automaton, old_dir, new_dir, locations)
+        if count:
+            files_changed += 1
+            links_rewritten += count
+            print(f"✓ {relpath}: {count} link(s)")
+            if not dry_run:
+                with open(path, "w", encoding="utf-8", errors="surrogateescape", newline="") as f:
+                    f.write(new_text)
+    return files_changed, links_rewritten
+
+def journaled_moves(doc_path, run_id=None):
+    """{name: folder} of completed journal moves (optionally one run only)"""
+    journal = MoveJournal(Path(doc_path) / JOURNAL_NAME)
+    return {
+        source: folder for (source, folder), run in journal.completed.items()
+        if run_id is None or run == run_id
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Fix markdown links after reorganize_docs.py moves")
+    parser.add_argument("--dry-run", action="store_true", help="report changes without writing")
+    args = parser.parse_args()
+
+    moves = journaled_moves(DOC_PATH)
+    print(f"Rewriting links for {len(moves)} moved files...")
+    files_changed, links = rewrite_links(ROOT_PATH, moves, dry_run=args.dry_run)
+    print(f"\n✓ Links rewritten: {links} in {files_changed} files")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+API Route Scanner
+Finds every route.ts under src/app/api and classifies each exported handler
+as guarded (requireXxxAPI / withXxxAuth), legacy-guarded (old requireAdmin,
+aad_mech cookies, hand-rolled auth.getUser checks, cron/webhook secrets) or
+unguarded. Files are scanned in a process pool with a byte-level prefilter,
+and results are cached by mtime so reruns only re-scan changed files.
+
+Usage:
+  python route_scan.py                     # table of every handler
+  python route_scan.py --status unguarded  # only unguarded handlers
+  python route_scan.py --json
+"""
+
+import argparse
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import instrument
+from doc_snapshot import DirSnapshot
+from ts_tokens import SourceFile
+
+# Base paths
+ROOT_PATH = Path("c:/Users/Faiz Hashmi/theautodoctor")
+API_DIR = ROOT_PATH / "src" / "app" / "api"
+CACHE_NAME = ".route_scan_cache.json"
+
+CACHE_VERSION = 3
+
+GUARDED = "guarded"
+LEGACY = "legacy-guarded"
+UNGUARDED = "unguarded"
+
+# Below this many files to (re)scan, a process pool costs more than it saves
+POOL_THRESHOLD = 32
+
+# Any of these bytes in a file means per-handler guard detection is needed;
+# files with none of them are unguarded without any per-handler analysis
+GUARD_BYTES = (
+    b"requireAdminAPI", b"requireMechanicAPI", b"requireCustomerAPI", b"requireWorkshopAPI",
+    b"Auth(", b"requireAdmin", b"requireMechanic", b"requireCustomer",
+    b"aad_mech", b"auth.getUser", b"CRON_SECRET", b"webhooks.constructEvent",
+)
+
+GUARDS = ("requireAdminAPI", "requireMechanicAPI", "requireCustomerAPI", "requireWorkshopAPI")
+WRAPPER_PATTERN = re.compile(r"^with\w*Auth$")
+# Legacy markers, matched on code tokens so comments never count
+LEGACY_CALLS = ("requireAdmin", "requireMechanic", "requireCustomer")
+LEGACY_MEMBER_CALLS = {("auth", "getUser"): "auth.getUser", ("webhooks", "constructEvent"): "webhooks.constructEvent"}
+LEGACY_NAMES = ("aad_mech", "CRON_SECRET")
+
+
+def find_route_files(api_dir):
+    """{relpath: FileInfo} for every route.ts below api_dir (one scandir pass)"""
+    snapshot = DirSnapshot(api_dir, recursive=True)
+    return {
+        name: info for name, info in snapshot.files.items()
+        if name == "route.ts" or name.endswith("/route.ts")
+    }
+
+def route_name(relpath):
+    """admin/logs/stats/route.ts -> admin/logs/stats"""
+    return relpath[:-len("/route.ts")] if relpath.endswith("/route.ts") else ""
+
+def legacy_marker(source, handler):
+    """First legacy auth marker in the handler's code (nested functions included), or None"""
+    tokens = source.tokens
+    for i in range(handler.open + 1, handler.close):
+        token = tokens[i]
+        if token.kind == "ident":
+            if token.value in LEGACY_CALLS and source._is(i + 1, "("):
+                return token.value
+            if source._is(i - 1, ".") and source._is(i + 1, "(") and i >= 2:
+                marker = LEGACY_MEMBER_CALLS.get((tokens[i - 2].value, token.value))
+                if marker:
+                    return marker
+        if token.kind in ("ident", "string", "template"):
+            marker = next((name for name in LEGACY_NAMES if name in token.value), None)
+            if marker:
+                return marker
+    return None
+
+def classify(source, handler, has_markers=True, guards=GUARDS):
+    """(status, guard) for one handler; guards called only by nested functions don't count"""
+    if handler.wrapper and WRAPPER_PATTERN.match(handler.wrapper):
+        return GUARDED, handler.wrapper
+    if not has_markers or handler.open < 0:
+        return UNGUARDED, None
+    calls = source.direct_calls(handler)
+    guard = next((g for g in guards if g in calls), None)
+    if guard:
+        return GUARDED, guard
+    marker = legacy_marker(source, handler)
+    if marker:
+        return LEGACY, marker
+    return UNGUARDED, None
+
+def scan_source(data, guards=GUARDS):
+    """Classify every handler in one route file's bytes"""
+    if b"export" not in data:
+        return []
+    has_markers = (any(marker in data for marker in GUARD_BYTES)
+                   or any(guard.encode() in data for guard in guards))
+    source = SourceFile(data.decode("utf-8", "replace"))
+    imports = source.imports() if has_markers else {}
+    handlers = []
+    for handler in source.handlers():
+        status, guard = classify(source, handler, has_markers, guards)
+        handlers.append({
+            "method": handler.method,
+            "status": status,
+            "guard": guard,
+            # Module the guard is imported from (None for cookie/secret checks)
+            "guard_from": imports.get(guard),
+            "line": source.text.count("\n", 0, handler.start) + 1
+        })
+    return handlers
+
+def _scan_file(path, guards=GUARDS):
+    with open(path, "rb") as f:
+        return scan_source(f.read(), guards)
+
+
+def project_dir(api_dir):
+    """The project root for src/app/api; api_dir's parent when the path is too shallow for that"""
+    api_dir = Path(api_dir)
+    return api_dir.parents[2] if len(api_dir.parents) >= 3 else api_dir.parent
+
+
+class RouteScan:
+    """Scan results for one API directory, cached by mtime and size"""
+
+    def __init__(self, api_dir=None, cache_path=None, guards=GUARDS):
+        self.api_dir = Path(api_dir or API_DIR)
+        self.guards = tuple(sorted(guards))
+        self.cache_path = Path(cache_path) if cache_path else project_dir(self.api_dir) / CACHE_NAME
+        self.routes = {}      # relpath -> [handler, ...]
+        self.scanned = 0
+        self.cached = 0
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # A different guard set changes every classification
+        if cache.get("version") != CACHE_VERSION or cache.get("guards") != list(self.guards):
+            return {}
+        return cache["files"]
+
+    def _save_cache(self, files):
+        tmp = f"{self.cache_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "guards": list(self.guards), "files": files},
+                      f, separators=(",", ":"))
+        os.replace(tmp, self.cache_path)
+
+    def run(self, workers=None):
+        """Scan changed files (in a pool when there are many); returns self"""
+        with instrument.phase("route-scan: list"):
+            current = find_route_files(self.api_dir)
+            cache = self._load_cache()
+        files = {}
+        stale = []
+        for relpath, info in current.items():
+            entry = cache.get(relpath)
+            if entry and entry[0] == info.mtime and entry[1] == info.size:
+                files[relpath] = entry
+                self.cached += 1
+            else:
+                stale.append(relpath)
+
+        paths = [str(self.api_dir / relpath) for relpath in stale]
+        with instrument.phase("route-scan: classify", files=len(paths)):
+            if len(stale) >= POOL_THRESHOLD and workers != 1:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    results = list(pool.map(_scan_file, paths, [self.guards] * len(paths), chunksize=16))
+            else:
+                results = []
+                for path in paths:
+                    with instrument.file_span(path):
+                        results.append(_scan_file(path, self.guards))
+        for relpath, handlers in zip(stale, results):
+            info = current[relpath]
+            files[relpath] = [info.mtime, info.size, handlers]
+        self.scanned = len(stale)
+        instrument.count("route_scan.scanned", self.scanned)
+        instrument.count("route_scan.cached", self.cached)
+
+        if stale or len(files) != len(cache):
+            self._save_cache(files)
+        self.routes = {relpath: entry[2] for relpath, entry in sorted(files.items())}
+        return self
+
+    def handlers(self, status=None, prefix=""):
+        """(relpath, handler) pairs, optionally filtered by status and route prefix"""
+        for relpath, handlers in self.routes.items():
+            if not relpath.startswith(prefix):
+                continue
+            for handler in handlers:
+                if status is None or handler["status"] == status:
+                    yield relpath, handler
+
+    def files_with(self, status, prefix="", guard=None, guard_from=None):
+        """Route files (relative to api_dir) with at least one matching handler"""
+        return sorted({
+            relpath for relpath, h in self.handlers(status, prefix)
+            if (guard is None or h["guard"] == guard)
+            and (guard_from is None or h.get("guard_from") == guard_from)
+        })
+
+def scan_routes(api_dir=None, workers=None):
+    return RouteScan(api_dir).run(workers)
+
+def print_table(rows):
+    """rows: (status, method, route, guard) — the layout shared by the codemod reports"""
+    for status, method, route, guard in rows:
+        suffix = f"  ({guard})" if guard else ""
+        print(f"{status:<15} {method:<7} {route}{suffix}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Classify API route handlers by auth guard")
+    parser.add_argument("--api-dir", default=None, help="src/app/api directory to scan")
+    parser.add_argument("--status", choices=[GUARDED, LEGACY, UNGUARDED], help="only show this status")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    scan = scan_routes(args.api_dir, args.workers)
+    if args.json:
+        print(json.dumps(scan.routes, indent=2))
+        return
+
+    rows = [
+        (h["status"], h["method"], route_name(relpath), h["guard"])
+        for relpath, h in scan.handlers(args.status)
+    ]
+    print("=" * 60)
+    print("API ROUTE GUARD DISCOVERY")
+    print("=" * 60 + "\n")
+    print_table(rows)
+
+    counts = {GUARDED: 0, LEGACY: 0, UNGUARDED: 0}
+    for _, h in scan.handlers():
+        counts[h["status"]] += 1
+    print("\n" + "=" * 60)
+    print(f"Route files: {len(scan.routes)} ({scan.scanned} scanned, {scan.cached} from cache)")
+    print(f"Guarded handlers: {counts[GUARDED]}")
+    print(f"Legacy-guarded handlers: {counts[LEGACY]}")
+    print(f"Unguarded handlers: {counts[UNGUARDED]}")
+    print("=" * 60 + "\n")
+
+if __name__ == "__main__":
+    main()
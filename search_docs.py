@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Documentation Search
+Full-text search over documentation/ backed by an on-disk inverted index.
+Segments are memory-mapped, so a query only touches the posting lists of its
+terms. The index is refreshed incrementally: moved files are renamed in the
+doc table, and only new or edited files are tokenized into a new segment.
+
+Usage:
+  python search_docs.py stripe webhook          # ranked results
+  python search_docs.py -n 20 "session timeout"
+  python search_docs.py --rebuild               # rebuild from scratch
+  python search_docs.py --self-check            # exercise refresh/compact on a scratch index
+"""
+
+import argparse
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import shutil
+import struct
+import sys
+import tempfile
+import time
+from array import array
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from doc_snapshot import DirSnapshot
+
+# Base paths
+ROOT_PATH = Path("c:/Users/Faiz Hashmi/theautodoctor")
+DOC_PATH = ROOT_PATH / "documentation"
+INDEX_NAME = ".search_index"
+
+INDEX_VERSION = 1
+SEGMENT_MAGIC = b"DSX1"
+SEGMENT_HEADER = struct.Struct("<4sIII")  # magic, term count, terms blob size, postings size
+
+# Merge all segments into one once there are more than this many
+MAX_SEGMENTS = 8
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9_]+")
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+def read_terms(path):
+    """Stream a file once; returns (term counts, token count)"""
+    counts = Counter()
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            counts.update(tokenize(line))
+    return counts, sum(counts.values())
+
+def encode_varint(value, out):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def decode_postings(buf, start, end):
+    """Yield (doc id, term frequency) from a delta/varint encoded posting list"""
+    pos = start
+    doc_id = 0
+    while pos < end:
+        values = []
+        for _ in range(2):
+            shift = 0
+            value = 0
+            while True:
+                byte = buf[pos]
+                pos += 1
+                value |= (byte & 0x7F) << shift
+                if byte < 0x80:
+                    break
+                shift += 7
+            values.append(value)
+        doc_id += values[0]
+        yield doc_id, values[1]
+
+def _offsets(buf, start, count):
+    """uint32 offset table inside a mapped segment"""
+    view = memoryview(buf)[start:start + 4 * count]
+    if sys.byteorder == "little":
+        return view.cast("I")
+    table = array("I", view.tobytes())
+    table.byteswap()
+    return table
+
+
+def write_segment(path, postings):
+    """Write {term: [(doc id, tf), ...]} as a segment file"""
+    terms = sorted(postings)
+    term_blob = bytearray()
+    posting_blob = bytearray()
+    term_offsets = array("I", [0])
+    posting_offsets = array("I", [0])
+    for term in terms:
+        term_blob += term.encode("utf-8")
+        term_offsets.append(len(term_blob))
+        previous = 0
+        for doc_id, tf in sorted(postings[term]):
+            encode_varint(doc_id - previous, posting_blob)
+            encode_varint(tf, posting_blob)
+            previous = doc_id
+        posting_offsets.append(len(posting_blob))
+    if sys.byteorder != "little":
+        term_offsets.byteswap()
+        posting_offsets.byteswap()
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(SEGMENT_HEADER.pack(SEGMENT_MAGIC, len(terms), len(term_blob), len(posting_blob)))
+        f.write(term_offsets.tobytes())
+        f.write(posting_offsets.tobytes())
+        f.write(term_blob)
+        f.write(posting_blob)
+    os.replace(tmp, path)
+
+
+class Segment:
+    """Read-only, memory-mapped segment; terms are found by binary search"""
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self.buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, terms_size, _ = SEGMENT_HEADER.unpack_from(self.buf, 0)
+        if magic != SEGMENT_MAGIC:
+            raise ValueError(f"Not a search segment: {path}")
+        pos = SEGMENT_HEADER.size
+        self.term_offsets = _offsets(self.buf, pos, self.count + 1)
+        pos += 4 * (self.count + 1)
+        self.posting_offsets = _offsets(self.buf, pos, self.count + 1)
+        pos += 4 * (self.count + 1)
+        self.terms_start = pos
+        self.postings_start = pos + terms_size
+
+    def term(self, i):
+        start = self.terms_start + self.term_offsets[i]
+        end = self.terms_start + self.term_offsets[i + 1]
+        return self.buf[start:end]
+
+    def postings(self, term):
+        """(doc id, tf) pairs for term, or nothing if the segment lacks it"""
+        key = term.encode("utf-8")
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.term(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == self.count or self.term(lo) != key:
+            return iter(())
+        return decode_postings(
+            self.buf,
+            self.postings_start + self.posting_offsets[lo],
+            self.postings_start + self.posting_offsets[lo + 1]
+        )
+
+    def all_postings(self):
+        """(term, [(doc id, tf), ...]) for every term, used when merging"""
+        for i in range(self.count):
+            term = bytes(self.term(i)).decode("utf-8")
+            yield term, list(self.postings(term))
+
+    def close(self):
+        # Offset views must be released before the map can close
+        self.term_offsets = self.posting_offsets = None
+        self.buf.close()
+        self._file.close()
+
+
+class SearchIndex:
+    """Doc table (JSON) plus memory-mapped posting segments"""
+
+    def __init__(self, doc_path=None):
+        self.doc_path = Path(doc_path or DOC_PATH)
+        self.index_path = self.doc_path / INDEX_NAME
+        self.docs = {}        # doc id (str) -> [relpath, size, mtime, inode, length]
+        self.segments = []    # segment file names
+        self.next_id = 1
+        self._mapped = None
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_path / "docs.json", "r", encoding="utf-8") as f:
+                table = json.load(f)
+        except (OSError, ValueError):
+            return
+        if table.get("version") == INDEX_VERSION:
+            self.docs = table["docs"]
+            self.segments = table["segments"]
+            self.next_id = table["next_id"]
+
+    def _save(self):
+        self.index_path.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path / "docs.json.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": INDEX_VERSION,
+                "next_id": self.next_id,
+                "segments": self.segments,
+                "docs": self.docs
+            }, f, separators=(",", ":"))
+        os.replace(tmp, self.index_path / "docs.json")
+
+    def mapped(self):
+        if self._mapped is None:
+            self._mapped = [Segment(self.index_path / name) for name in self.segments]
+        return self._mapped
+
+    def close(self):
+        for segment in self._mapped or []:
+            segment.close()
+        self._mapped = None
+
+    def _add_segment(self, relpaths, snapshot):
+        """Tokenize relpaths into one new segment; returns files read"""
+        postings = defaultdict(list)
+        for relpath in relpaths:
+            info = snapshot.get(relpath)
+            counts, length = read_terms(self.doc_path / relpath)
+            doc_id = self.next_id
+            self.next_id += 1
+            self.docs[str(doc_id)] = [relpath, info.size, info.mtime, info.inode, length]
+            for term, tf in counts.items():
+                postings[term].append((doc_id, tf))
+        if not relpaths:
+            return 0
+        self.index_path.mkdir(parents=True, exist_ok=True)
+        name = f"seg-{self.next_id:08d}.bin"
+        write_segment(self.index_path / name, postings)
+        # Mapped segments are a snapshot of self.segments; drop it so the new one is seen
+        self.close()
+        self.segments.append(name)
+        return len(relpaths)
+
+    def refresh(self, snapshot=None):
+        """Bring the index in line with documentation/; returns files read"""
+        snapshot = snapshot or DirSnapshot(self.doc_path, recursive=True)
+        current = {n for n in snapshot.files if n.endswith(".md")}
+        by_path = {doc[0]: doc_id for doc_id, doc in self.docs.items()}
+
+        # Files that vanished from their path: renamed (same inode/size/mtime) or gone
+        by_inode = {}
+        for name in current - by_path.keys():
+            info = snapshot.get(name)
+            by_inode[(info.inode, info.size, info.mtime)] = name
+        added = set(current - by_path.keys())
+        for path, doc_id in by_path.items():
+            doc = self.docs[doc_id]
+            if path in current:
+                info = snapshot.get(path)
+                if (info.size, info.mtime) != (doc[1], doc[2]):
+                    del self.docs[doc_id]
+                    added.add(path)
+                continue
+            moved_to = by_inode.get((doc[3], doc[1], doc[2]))
+            if moved_to:
+                doc[0] = moved_to
+                added.discard(moved_to)
+            else:
+                del self.docs[doc_id]
+
+        reads = self._add_segment(sorted(added), snapshot)
+        if len(self.segments) > MAX_SEGMENTS:
+            self.compact()
+        self._save()
+        return reads
+
+    def compact(self):
+        """Merge every segment into one, dropping deleted docs"""
+        self.close()
+        live = {int(doc_id) for doc_id in self.docs}
+        merged = defaultdict(list)
+        for segment in self.mapped():
+            for term, postings in segment.all_postings():
+                merged[term].extend(p for p in postings if p[0] in live)
+        self.close()
+        old_segments = self.segments
+        name = f"seg-{self.next_id:08d}-merged.bin"
+        write_segment(self.index_path / name, {t: p for t, p in merged.items() if p})
+        self.segments = [name]
+        for old in old_segments:
+            try:
+                os.remove(self.index_path / old)
+            except OSError:
+                pass
+
+    def rebuild(self):
+        self.close()
+        for name in self.segments:
+            try:
+                os.remove(self.index_path / name)
+            except OSError:
+                pass
+        self.docs = {}
+        self.segments = []
+        return self.refresh()
+
+    def search(self, query, limit=10):
+        """BM25-ranked [(score, relpath), ...] for a free-text query"""
+        terms = set(tokenize(query))
+        if not terms or not self.docs:
+            return []
+        total = len(self.docs)
+        avg_len = sum(doc[4] for doc in self.docs.values()) / total
+
+        scores = defaultdict(float)
+        for term in terms:
+            matches = []
+            for segment in self.mapped():
+                for doc_id, tf in segment.postings(term):
+                    doc = self.docs.get(str(doc_id))
+                    if doc is not None:
+                        matches.append((doc, tf))
+            if not matches:
+                continue
+            idf = math.log(1 + (total - len(matches) + 0.5) / (len(matches) + 0.5))
+            for doc, tf in matches:
+                norm = tf + K1 * (1 - B + B * doc[4] / avg_len)
+                scores[doc[0]] += idf * tf * (K1 + 1) / norm
+        return heapq.nlargest(limit, ((s, p) for p, s in scores.items()))
+
+def refresh_search_index(doc_path):
+    """Refresh an existing index after files moved; no-op if there is no index"""
+    index = SearchIndex(doc_path)
+    if not index.segments:
+        return None
+    reads = index.refresh()
+    index.close()
+    return reads
+
+def self_check():
+    """
+    Search, then refresh in more new segments than MAX_SEGMENTS on the same
+    instance: every doc must stay findable through the compaction. Returns
+    a list of failures.
+    """
+    root = Path(tempfile.mkdtemp(prefix="search-check-"))
+    failures = []
+    try:
+        (root / "seed.md").write_text("# Seed\n\nwidget seed\n", encoding="utf-8")
+        index = SearchIndex(root)
+        index.rebuild()
+        index.search("widget")
+        for i in range(MAX_SEGMENTS + 2):
+            (root / f"doc{i}.md").write_text(f"# Doc {i}\n\nwidget batch{i}\n", encoding="utf-8")
+            index.refresh()
+            found = {path for _, path in index.search("widget", limit=100)}
+            if found != {"seed.md", *(f"doc{j}.md" for j in range(i + 1))}:
+                failures.append(f"after refresh {i + 1}: {len(found)} of {i + 2} docs found")
+        index.close()
+
+        reopened = SearchIndex(root)
+        for i in range(MAX_SEGMENTS + 2):
+            if not reopened.search(f"batch{i}"):
+                failures.append(f"doc{i}.md lost its postings ({len(reopened.segments)} segments on disk)")
+        reopened.close()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Search documentation/")
+    parser.add_argument("query", nargs="*", help="search terms")
+    parser.add_argument("-n", "--limit", type=int, default=10, help="number of results (default 10)")
+    parser.add_argument("--rebuild", action="store_true", help="rebuild the index from scratch")
+    parser.add_argument("--no-refresh", action="store_true", help="search without checking for changed files")
+    parser.add_argument("--self-check", action="store_true",
+                        help="check refresh and compaction on a scratch index, exit 1 on failure")
+    args = parser.parse_args()
+
+    if args.self_check:
+        failures = self_check()
+        for failure in failures:
+            print(f"✗ {failure}")
+        if failures:
+            sys.exit(1)
+        print("✓ Search index keeps every doc across refresh and compaction")
+        return
+
+    index = SearchIndex()
+    if args.rebuild:
+        reads = index.rebuild()
+        print(f"✓ Indexed {reads} files into {index.index_path}")
+    elif not args.no_refresh:
+        reads = index.refresh()
+        if reads:
+            print(f"✓ Indexed {reads} new or changed files")
+
+    if not args.query:
+        return
+
+    start = time.perf_counter()
+    results = index.search(" ".join(args.query), args.limit)
+    elapsed = (time.perf_counter() - start) * 1000
+    for rank, (score, relpath) in enumerate(results, start=1):
+        print(f"{rank:3d}. {score:6.2f}  documentation/{relpath}")
+    print(f"\n{len(results)} results in {elapsed:.1f} ms ({len(index.docs)} docs indexed)")
+    index.close()
+
+if __name__ == "__main__":
+    main()
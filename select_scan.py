@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Select-Star Scan
+Pairs every .select('*') Supabase query in the API routes with the columns
+the handler actually reads from its result, and suggests a column list.
+A query is "complete" when its result is bound to a variable (const
+{ data: rows } = await ..., or const result = await ... read through
+result.data) and every later use of that variable is a property read:
+row.col, row?.col, rows.map(r => r.col) (also filter/find/forEach/...,
+destructured callback params and for...of loops), rows[0].col, rows.length
+or a truthiness check. Anything else (returning the rows, spreading them,
+passing them to a function) makes it incomplete and it is left alone.
+
+Route files come from route_scan.py. With --apply, complete queries that
+read at least one column are narrowed in place through the codemod engine
+(--dry-run / --patch-out work as for the other codemods).
+
+Usage:
+  python select_scan.py                       # every select('*') with suggestions
+  python select_scan.py --complete            # only queries that can be narrowed
+  python select_scan.py --json-out selects.json
+  python select_scan.py --apply --dry-run     # diff of the narrowed selects
+"""
+
+import argparse
+import json
+import re
+from collections import Counter
+from pathlib import Path
+
+import instrument
+from codemod import CHANGED, Job, add_engine_arguments, engine_from_args
+from route_scan import API_DIR, RouteScan, route_name
+from ts_tokens import OPENERS, SourceFile
+
+SELECT_BYTES = (b"select('*'", b'select("*"')
+STAR_STRINGS = ("'*'", '"*"')
+
+# Array methods whose first argument is a callback receiving one row
+ROW_CALLBACK_METHODS = frozenset([
+    "map", "filter", "find", "findIndex", "forEach", "some", "every", "flatMap", "sort",
+])
+# Reading these from a result needs no column
+NO_COLUMN_PROPS = frozenset(["length"])
+
+COMPLETE = "complete"
+INCOMPLETE = "incomplete"
+NO_COLUMNS = "no-columns"
+HEAD_ONLY = "head-only"
+
+IDENT_PATTERN = re.compile(r"^[A-Za-z_]\w*$")
+
+
+class SelectAnalyzer:
+    """select('*') queries in one source and the columns read from their results"""
+
+    def __init__(self, text):
+        self.text = text
+        self.source = SourceFile(text)
+        self.tokens = self.source.tokens
+        self.partner = self.source.partner
+        self._blocks = self._enclosing_blocks()
+
+    def _is(self, i, value):
+        return self.source._is(i, value)
+
+    def _line(self, i):
+        return self.text.count("\n", 0, self.tokens[i].start) + 1
+
+    def _enclosing_blocks(self):
+        """{token index of each select('*') string: index of the innermost enclosing "{"}"""
+        blocks = {}
+        stack = []
+        for i, token in enumerate(self.tokens):
+            if token.kind == "punct":
+                if token.value == "{":
+                    stack.append(i)
+                elif token.value == "}" and stack:
+                    stack.pop()
+            elif (token.kind == "string" and token.value in STAR_STRINGS
+                  and self._is(i - 1, "(") and self._is(i - 2, "select")):
+                blocks[i] = stack[-1] if stack else None
+        return blocks
+
+    def queries(self):
+        """One dict per select('*'): line, table, status, columns, reason, star (token index)"""
+        return [self._query(star, block) for star, block in self._blocks.items()]
+
+    def _table(self, star):
+        for i in range(star, max(star - 60, 0), -1):
+            if self._is(i, "from") and self._is(i + 1, "(") and self.tokens[i + 2].kind == "string":
+                return self.tokens[i + 2].value.strip("'\"`")
+        return None
+
+    def _query(self, star, block):
+        query = {"line": self._line(star), "table": self._table(star), "star": star,
+                 "status": INCOMPLETE, "columns": [], "reason": None}
+        # select('*', { count: 'exact', head: true }) returns no rows
+        close = self.partner[star - 1]
+        if any(self._is(i, "head") for i in range(star, close)):
+            query["status"] = HEAD_ONLY
+            return query
+        if block is None:
+            query["reason"] = "not inside a function"
+            return query
+
+        statement = next(((a, b) for a, b in self.source.statements(block) if a <= star <= b), None)
+        if statement is None:
+            query["reason"] = "nested in another statement"
+            return query
+        first, last = statement
+        binding = self._binding(first, last, star)
+        if isinstance(binding, str):
+            query["reason"] = binding
+            return query
+        name, through_data, single = binding
+
+        reads = Reads(self, last + 1, self.partner[block])
+        if through_data:
+            reads.result(name, single)
+        elif single:
+            reads.row(name)
+        else:
+            reads.rows(name)
+        query["columns"] = sorted(reads.columns)
+        if reads.escapes:
+            query["reason"] = reads.escapes[0]
+        elif not reads.columns:
+            query["status"] = NO_COLUMNS
+        else:
+            query["status"] = COMPLETE
+        return query
+
+    def _binding(self, first, last, star):
+        """(name, read through .data?, single row?) for the statement's result, or a reason string"""
+        tokens = self.tokens
+        if tokens[first].value not in ("const", "let", "var"):
+            return "result not assigned to a variable"
+        equals = first + 2 if tokens[first + 1].kind == "ident" else self.partner[first + 1] + 1
+        if not self._is(equals, "=") or not self._is(equals + 1, "await"):
+            return "result not awaited in a declaration"
+        # The select must be part of the awaited chain itself, not an argument
+        i = equals + 2
+        while i < star - 2:
+            if tokens[i].kind == "punct" and tokens[i].value in OPENERS:
+                if self.partner[i] < 0 or self.partner[i] > star:
+                    return "select is nested in another expression"
+                i = self.partner[i]
+            i += 1
+        single = any(
+            self._is(i, "single") or self._is(i, "maybeSingle") for i in range(star, last + 1)
+        )
+
+        if tokens[first + 1].kind == "ident":
+            return tokens[first + 1].value, True, single
+        if not self._is(first + 1, "{"):
+            return "array destructuring"
+        pattern_end = self.partner[first + 1]
+        for i in range(first + 2, pattern_end):
+            if self._is(i, "data") and not self._is(i - 1, ":"):
+                if self._is(i + 1, ":") and tokens[i + 2].kind == "ident" and not self._is(i + 3, "="):
+                    return tokens[i + 2].value, False, single
+                if self._is(i + 1, ",") or i + 1 == pattern_end:
+                    return "data", False, single
+                return "data has a default or nested pattern"
+        return "data not destructured"
+
+
+class Reads:
+    """Columns read from one query result between two token indices"""
+
+    def __init__(self, analyzer, start, end):
+        self.a = analyzer
+        self.start = start
+        self.end = end
+        self.columns = set()
+        self.escapes = []
+
+    def _uses(self, name, start, end):
+        """Indices of name used as a variable (not a property or object key)"""
+        a = self.a
+        for i in range(start, end):
+            token = a.tokens[i]
+            if token.kind != "ident" or token.value != name:
+                continue
+            if a._is(i - 1, ".") or a._is(i - 1, "?."):
+                continue
+            if a._is(i + 1, ":") and (a._is(i - 1, "{") or a._is(i - 1, ",")) and not a._is(i + 2, ":"):
+                continue  # object key
+            yield i
+
+    def _prop(self, i):
+        """(property, index of property token) for name.prop / name?.prop at i, else None"""
+        a = self.a
+        if (a._is(i + 1, ".") or a._is(i + 1, "?.")) and i + 2 < len(a.tokens) and a.tokens[i + 2].kind == "ident":
+            return a.tokens[i + 2].value, i + 2
+        return None
+
+    def _test(self, i):
+        """True for truthiness-only uses: !x, if (x), x &&"""
+        a = self.a
+        if a._is(i - 1, "!"):
+            return True
+        if a._is(i - 1, "(") and a._is(i + 1, ")") and a._is(i - 2, "if"):
+            return True
+        return a._is(i + 1, "&") and a._is(i + 2, "&")
+
+    def _escape(self, i, what):
+        self.escapes.append(f"{what} used as a whole on line {self.a._line(i)}")
+
+    def result(self, name, single):
+        """name is the whole response: only name.data counts"""
+        for i in self._uses(name, self.start, self.end):
+            prop = self._prop(i)
+            if prop is None or prop[0] in ("error", "count", "status"):
+                if prop is None:
+                    self._escape(i, name)
+                continue
+            if prop[0] != "data":
+                continue
+            self._value(i + 2, name + ".data", rows=not single)
+
+    def row(self, name, start=None, end=None):
+        for i in self._uses(name, self.start if start is None else start, self.end if end is None else end):
+            self._value(i, name, rows=False)
+
+    def rows(self, name):
+        for i in self._uses(name, self.start, self.end):
+            self._value(i, name, rows=True)
+
+    def _value(self, i, label, rows):
+        """One use of a row (rows=False), rows array (True) or unknown data (None) at token i"""
+        a = self.a
+        if self._test(i):
+            return
+        prop = self._prop(i)
+        if prop is not None:
+            if prop[0] in NO_COLUMN_PROPS and rows is not False:
+                return
+            if prop[0] in ROW_CALLBACK_METHODS and rows is not False and a._is(prop[1] + 1, "("):
+                self._callback(prop[1] + 2, label)
+                return
+            if rows:
+                self._escape(i, label)
+                return
+            self.columns.add(prop[0])
+            return
+        if rows is not False and a._is(i + 1, "[") and a.partner[i + 1] > 0:
+            after = a.partner[i + 1]
+            prop = self._prop(after)
+            if prop is not None:
+                self.columns.add(prop[0])
+                return
+        if rows is not False and a._is(i - 1, "of") and a._is(i - 3, "const") and a._is(i - 4, "("):
+            self._loop(i - 4, label)
+            return
+        self._escape(i, label)
+
+    def _callback(self, i, label):
+        """Row callback starting at token i: (r) => ..., r => ..., ({ a, b }) => ..."""
+        a = self.a
+        call_close = a.partner[i - 1]
+        if a._is(i, "async"):
+            i += 1
+        if a._is(i, "("):
+            close = a.partner[i]
+            params = (i + 1, close)
+            arrow = close + 1
+        else:
+            params = (i, i + 1)
+            arrow = i + 1
+        if not a._is(arrow, "=>"):
+            self._escape(i, label)
+            return
+        body_start = arrow + 1
+        body_end = a.partner[body_start] if a._is(body_start, "{") else call_close
+        first = params[0]
+        if a._is(first, "{"):
+            # ({ a, b: alias }) => ...: the keys are the columns
+            for k in range(first + 1, a.partner[first]):
+                token = a.tokens[k]
+                if token.kind == "ident" and not a._is(k - 1, ":") and (a._is(k + 1, ",") or a._is(k + 1, ":")
+                                                                       or k + 1 == a.partner[first]):
+                    self.columns.add(token.value)
+                elif a._is(k, "..."):
+                    self._escape(k, label)
+            return
+        if a.tokens[first].kind != "ident":
+            self._escape(first, label)
+            return
+        self.row(a.tokens[first].value, body_start, body_end)
+
+    def _loop(self, paren, label):
+        """for (const row of rows) { ... }"""
+        a = self.a
+        variable = a.tokens[paren + 2]
+        close = a.partner[paren]
+        if variable.kind != "ident" or close < 0:
+            self._escape(paren, label)
+            return
+        body_end = a.partner[close + 1] if a._is(close + 1, "{") else a.source._statement_end(close + 1)
+        self.row(variable.value, close + 1, body_end)
+
+
+def narrow_selects(content):
+    """Replace complete select('*') queries with the columns they read"""
+    if not any(s.decode() in content for s in SELECT_BYTES):
+        return content, 0
+    analyzer = SelectAnalyzer(content)
+    edits = []
+    for query in analyzer.queries():
+        if query["status"] != COMPLETE or not all(IDENT_PATTERN.match(c) for c in query["columns"]):
+            continue
+        token = analyzer.tokens[query["star"]]
+        quote = token.value[0]
+        edits.append((token.start, token.end, f"{quote}{', '.join(query['columns'])}{quote}"))
+    for start, end, text in reversed(edits):
+        content = content[:start] + text + content[end:]
+    return content, len(edits)
+
+NARROW_TRANSFORMS = [("narrow-select", narrow_selects)]
+
+
+def analyze_file(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    if not any(marker in data for marker in SELECT_BYTES):
+        return []
+    queries = SelectAnalyzer(data.decode("utf-8", "replace")).queries()
+    for query in queries:
+        del query["star"]
+    return queries
+
+def scan_selects(api_dir, workers=None):
+    """(rows, RouteScan): one row per select('*') in a route file"""
+    scan = RouteScan(api_dir).run(workers)
+    rows = []
+    with instrument.phase("select analysis"):
+        for relpath in scan.routes:
+            with instrument.file_span(relpath):
+                queries = analyze_file(Path(api_dir) / relpath)
+            for query in queries:
+                rows.append({"route": route_name(relpath), "file": relpath, **query})
+    return rows, scan
+
+def print_table(rows):
+    width = max((len(r["route"]) for r in rows), default=10)
+    for r in rows:
+        if r["status"] == COMPLETE:
+            detail = ", ".join(r["columns"])
+        elif r["status"] == INCOMPLETE:
+            detail = r["reason"] + (f" (reads {', '.join(r['columns'])})" if r["columns"] else "")
+        else:
+            detail = ""
+        print(f"{r['route']:<{width}} {r['line']:>5}  {r['table'] or '?':<24} {r['status']:<10} {detail}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Suggest column lists for select('*') queries")
+    parser.add_argument("--api-dir", default=str(API_DIR), help="src/app/api directory")
+    parser.add_argument("--complete", action="store_true", help="only list queries that can be narrowed")
+    parser.add_argument("--json-out", metavar="PATH", help="write every query as JSON")
+    parser.add_argument("--apply", action="store_true", help="narrow complete queries in place")
+    add_engine_arguments(parser)
+    args = parser.parse_args()
+
+    engine = engine_from_args(args) if args.apply else None
+    rows, scan = scan_selects(args.api_dir, args.workers)
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=1)
+
+    if engine:
+        files = sorted({r["file"] for r in rows if r["status"] == COMPLETE})
+        jobs = [Job(Path(args.api_dir) / relpath, NARROW_TRANSFORMS, label=f"src/app/api/{relpath}")
+                for relpath in files]
+        for result in engine.run(jobs):
+            if result.status == CHANGED:
+                engine.log(f"✓ NARROWED: {result.job.label} ({result.hits['narrow-select']} select(s))")
+        engine.close()
+        engine.report()
+        return
+
+    print_table([r for r in rows if r["status"] == COMPLETE] if args.complete else rows)
+    statuses = Counter(r["status"] for r in rows)
+    print("\n" + "=" * 60)
+    print("SELECT('*') SUMMARY")
+    print("=" * 60)
+    print(f"Queries: {len(rows)} in {len({r['file'] for r in rows})} of {len(scan.routes)} route files")
+    print(f"  ✓ Can be narrowed: {statuses[COMPLETE]}")
+    print(f"  ⚠ Incomplete analysis: {statuses[INCOMPLETE]}")
+    print(f"  - No column read (existence checks): {statuses[NO_COLUMNS]}")
+    print(f"  - Head-only counts: {statuses[HEAD_ONLY]}")
+    print("=" * 60 + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+TypeScript Tokenizer
+Single-pass tokenizer and bracket matcher for route files. Strings,
+comments, template literals (including ${} substitutions) and regex literals
+are recognised, so braces inside them never confuse handler detection. Used
+by route_scan.py and the auth codemods to get exact handler body spans.
+"""
+
+import bisect
+import re
+from collections import namedtuple
+
+# kind: ident, number, string, template, regex or punct (comments are dropped)
+Token = namedtuple("Token", ["kind", "value", "start", "end"])
+
+# One exported route handler. body_start/body_end are the offsets just inside
+# its braces (None for wrapped handlers such as withDebugAuth(getHandler));
+# open/close are the token indices of those braces.
+Handler = namedtuple("Handler", [
+    "method", "start", "end", "body_start", "body_end", "open", "close", "param", "wrapper"
+])
+
+METHODS = frozenset(["GET", "POST", "PUT", "DELETE", "PATCH", "HEAD", "OPTIONS"])
+
+# Keywords after which a "/" starts a regex literal rather than a division
+REGEX_KEYWORDS = frozenset([
+    "return", "typeof", "instanceof", "case", "do", "else", "in", "of", "new",
+    "delete", "void", "throw", "yield", "await"
+])
+
+CODE_PATTERN = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<string>'(?:[^'\\\n]|\\.)*'?|"(?:[^"\\\n]|\\.)*"?)
+  | (?P<ident>[A-Za-z_$][\w$]*)
+  | (?P<number>\d[\w.]*)
+  | (?P<punct>=>|\.\.\.|\?\.|.)
+""", re.VERBOSE | re.DOTALL)
+
+# Rest of a template literal chunk, up to the closing backtick or a ${
+TEMPLATE_CHUNK = re.compile(r"(?:[^`\\$]|\\.|\$(?!\{))*(?:`|\$\{|\Z)", re.DOTALL)
+
+REGEX_LITERAL = re.compile(r"/(?:[^/\\\n\[]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[A-Za-z]*")
+
+OPENERS = {"(": ")", "[": "]", "{": "}"}
+
+# A line break ends a statement unless the line ends in one of these...
+CONTINUES_AFTER = frozenset("= + - * / % & | ^ < > ? : , . ( [ { ~ => ... ?.".split())
+# ...or the next line starts with one of these (leading ( and [ aren't
+# treated as continuations; formatted code never starts a line with them)
+CONTINUES_BEFORE = frozenset("= + * / % & | ^ < > ? : , . ) ] } => ?.".split())
+CONTINUES_KEYWORDS = frozenset(["as", "satisfies", "in", "instanceof"])
+
+# Statements whose body is a block or statement after a (...) head
+COMPOUND_KEYWORDS = frozenset(["if", "for", "while", "switch", "with"])
+
+
+def _regex_allowed(previous):
+    if previous is None:
+        return True
+    if previous.kind == "ident":
+        return previous.value in REGEX_KEYWORDS
+    return previous.kind == "punct" and previous.value not in (")", "]", "}")
+
+def tokenize(text):
+    """List of Tokens for text in one left-to-right pass"""
+    tokens = []
+    braces = []   # "{" for code blocks, "`" for open template substitutions
+    pos = 0
+    length = len(text)
+    previous = None
+    while pos < length:
+        ch = text[pos]
+        if ch == "`" or (ch == "}" and braces and braces[-1] == "`"):
+            if ch == "}":
+                braces.pop()
+            match = TEMPLATE_CHUNK.match(text, pos + 1)
+            end = match.end()
+            if text.endswith("${", pos, end):
+                braces.append("`")
+            previous = Token("template", text[pos:end], pos, end)
+            tokens.append(previous)
+            pos = end
+            continue
+        if ch == "/" and text[pos + 1:pos + 2] not in ("/", "*") and _regex_allowed(previous):
+            match = REGEX_LITERAL.match(text, pos)
+            if match:
+                previous = Token("regex", match.group(), pos, match.end())
+                tokens.append(previous)
+                pos = match.end()
+                continue
+
+        match = CODE_PATTERN.match(text, pos)
+        kind = match.lastgroup
+        end = match.end()
+        if kind not in ("space", "comment"):
+            value = match.group()
+            if value == "{":
+                braces.append("{")
+            elif value == "}" and braces:
+                braces.pop()
+            previous = Token(kind, value, pos, end)
+            tokens.append(previous)
+        pos = end
+    return tokens
+
+def match_brackets(tokens):
+    """partner[i] = index of the bracket matching tokens[i] (-1 if none)"""
+    partner = [-1] * len(tokens)
+    stack = []
+    for i, token in enumerate(tokens):
+        if token.kind != "punct":
+            continue
+        if token.value in OPENERS:
+            stack.append(i)
+        elif token.value in (")", "]", "}"):
+            # Pop past unbalanced openers rather than pairing mismatched kinds
+            while stack and OPENERS[tokens[stack[-1]].value] != token.value:
+                stack.pop()
+            if stack:
+                opener = stack.pop()
+                partner[opener] = i
+                partner[i] = opener
+    return partner
+
+
+class SourceFile:
+    """Tokens and bracket pairs for one TypeScript source"""
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = tokenize(text)
+        self.partner = match_brackets(self.tokens)
+        self._starts = None
+
+    def _is(self, i, value):
+        if not 0 <= i < len(self.tokens):
+            return False
+        token = self.tokens[i]
+        return token.value == value and token.kind in ("ident", "punct")
+
+    def _function_body(self, i):
+        """Index of the "{" opening a function body, given the index of its "(" """
+        close = self.partner[i]
+        if close < 0:
+            return -1
+        i = close + 1
+        angles = 0
+        # Skip a return type annotation (Promise<...>, object types) to the body
+        while i < len(self.tokens):
+            value = self.tokens[i].value
+            if self.tokens[i].kind == "punct":
+                if value == "<":
+                    angles += 1
+                elif value == ">" and angles:
+                    angles -= 1
+                elif value == "{" and not angles and not self._is(i - 1, ":"):
+                    return i
+                elif value in OPENERS and self.partner[i] > 0:
+                    i = self.partner[i]
+                elif value == "=>" and not angles:
+                    return i + 1 if self._is(i + 1, "{") else -1
+                elif value == ";" and not angles:
+                    return -1
+            i += 1
+        return -1
+
+    def _statement_end(self, i):
+        """Index of the last token of the top-level statement containing i"""
+        while i < len(self.tokens):
+            token = self.tokens[i]
+            if token.kind == "punct" and token.value in OPENERS and self.partner[i] > 0:
+                i = self.partner[i]
+            elif self._is(i, ";"):
+                return i
+            elif self._is(i + 1, "export"):
+                return i
+            i += 1
+        return len(self.tokens) - 1
+
+    def _handler(self, i):
+        """Handler for the export statement at token i, or None"""
+        tokens = self.tokens
+        j = i + 1
+        if self._is(j, "async"):
+            j += 1
+        if self._is(j, "function") and j + 1 < len(tokens) and tokens[j + 1].value in METHODS:
+            method = tokens[j + 1].value
+            if not self._is(j + 2, "("):
+                return None
+            param = tokens[j + 3].value if j + 3 < len(tokens) and tokens[j + 3].kind == "ident" else None
+            open_ = self._function_body(j + 2)
+            if open_ < 0 or self.partner[open_] < 0:
+                return None
+            close = self.partner[open_]
+            return Handler(method, tokens[i].start, tokens[close].end, tokens[open_].end,
+                           tokens[close].start, open_, close, param, None)
+
+        if not (self._is(i + 1, "const") and i + 2 < len(tokens) and tokens[i + 2].value in METHODS
+                and self._is(i + 3, "=")):
+            return None
+        method = tokens[i + 2].value
+        j = i + 4
+        last = self._statement_end(j)
+        end = tokens[last].end
+        if j < len(tokens) and tokens[j].kind == "ident" and self._is(j + 1, "(") and tokens[j].value != "async":
+            return Handler(method, tokens[i].start, end, None, None, -1, -1, None, tokens[j].value)
+        if self._is(j, "async"):
+            j += 1
+        param = None
+        if self._is(j, "("):
+            if j + 1 < len(tokens) and tokens[j + 1].kind == "ident":
+                param = tokens[j + 1].value
+            open_ = self._function_body(j)
+        else:
+            param = tokens[j].value if j < len(tokens) and tokens[j].kind == "ident" else None
+            open_ = j + 2 if self._is(j + 1, "=>") and self._is(j + 2, "{") else -1
+        if open_ < 0 or self.partner[open_] < 0:
+            return Handler(method, tokens[i].start, end, None, None, -1, -1, param, None)
+        close = self.partner[open_]
+        return Handler(method, tokens[i].start, end, tokens[open_].end,
+                       tokens[close].start, open_, close, param, None)
+
+    def _continues(self, i):
+        """True if the statement running through token i goes on past a line break"""
+        tokens = self.tokens
+        if i + 1 >= len(tokens):
+            return False
+        last, following = tokens[i], tokens[i + 1]
+        if "\n" not in self.text[last.end:following.start]:
+            return True
+        if last.kind == "punct" and last.value in CONTINUES_AFTER:
+            return True
+        if following.kind == "punct" and following.value in CONTINUES_BEFORE:
+            return True
+        return following.kind == "ident" and following.value in CONTINUES_KEYWORDS
+
+    def _block_statement_end(self, i, close):
+        """Index of the last token of the statement starting at i, within a block ending at close"""
+        tokens = self.tokens
+        if self._is(i, "{") and self.partner[i] > 0:
+            return self.partner[i]
+        if tokens[i].value in COMPOUND_KEYWORDS and self._is(i + 1, "(") and self.partner[i + 1] > 0:
+            end = self._block_statement_end(self.partner[i + 1] + 1, close)
+            if self._is(end + 1, "else") and tokens[i].value == "if":
+                end = self._block_statement_end(end + 2, close)
+            return end
+        if self._is(i, "try") or self._is(i, "do"):
+            end = self._block_statement_end(i + 1, close)
+            while self._is(end + 1, "catch") or self._is(end + 1, "finally") or self._is(end + 1, "while"):
+                j = end + 2
+                if self._is(j, "("):
+                    j = self.partner[j] + 1
+                    if self._is(end + 1, "while"):
+                        return j - 1
+                end = self._block_statement_end(j, close)
+            return end
+        while i < close - 1:
+            token = tokens[i]
+            if token.kind == "punct" and token.value in OPENERS and self.partner[i] > 0:
+                i = self.partner[i]
+                continue
+            if self._is(i, ";") or not self._continues(i):
+                return i
+            i += 1
+        return close - 1
+
+    def statements(self, open_):
+        """(first, last) token indices of each statement directly inside the block opened at open_"""
+        close = self.partner[open_]
+        if close < 0:
+            return []
+        found = []
+        i = open_ + 1
+        while i < close:
+            if self._is(i, ";"):
+                i += 1
+                continue
+            last = min(self._block_statement_end(i, close), close - 1)
+            found.append((i, last))
+            i = last + 1
+        return found
+
+    def handlers(self):
+        """Every exported route handler, in source order"""
+        found = []
+        i = 0
+        while i < len(self.tokens):
+            token = self.tokens[i]
+            if token.kind == "ident" and token.value == "export":
+                handler = self._handler(i)
+                if handler:
+                    found.append(handler)
+            if token.kind == "punct" and token.value in OPENERS and self.partner[i] > 0:
+                i = self.partner[i]
+            i += 1
+        return found
+
+    def body_tokens(self, handler, nested=False):
+        """Token indices in a handler body; nested function bodies skipped unless nested"""
+        if handler.open < 0:
+            return
+        i = handler.open + 1
+        while i < handler.close:
+            if not nested:
+                if self._is(i, "function"):
+                    paren = i + 1 if self._is(i + 1, "(") else i + 2
+                    body = self._function_body(paren) if self._is(paren, "(") else -1
+                    if body > 0 and self.partner[body] > 0:
+                        i = self.partner[body] + 1
+                        continue
+                elif self._is(i, "=>") and self._is(i + 1, "{") and self.partner[i + 1] > 0:
+                    i = self.partner[i + 1] + 1
+                    continue
+            yield i
+            i += 1
+
+    def direct_calls(self, handler):
+        """Names called as plain functions by the handler itself (not by nested functions)"""
+        tokens = self.tokens
+        calls = set()
+        for i in self.body_tokens(handler):
+            if (tokens[i].kind == "ident" and self._is(i + 1, "(")
+                    and not self._is(i - 1, ".") and not self._is(i - 1, "?.")):
+                calls.add(tokens[i].value)
+        return calls
+
+    def leading_try(self, handler):
+        """Offset just inside the try block if the body starts with try {, else None"""
+        i = handler.open + 1
+        if handler.open >= 0 and self._is(i, "try") and self._is(i + 1, "{"):
+            return self.tokens[i + 1].end
+        return None
+
+    def member_accesses(self, handler, obj, prop):
+        """(start, end) spans of obj.prop in code inside the handler body"""
+        tokens = self.tokens
+        spans = []
+        for i in self.body_tokens(handler, nested=True):
+            if (tokens[i].kind == "ident" and tokens[i].value == obj and self._is(i + 1, ".")
+                    and i + 2 < len(tokens) and tokens[i + 2].kind == "ident"
+                    and tokens[i + 2].value == prop and not self._is(i - 1, ".")):
+                spans.append((tokens[i].start, tokens[i + 2].end))
+        return spans
+
+    def declares(self, handler, name):
+        """True if the handler body binds name with const/let/var (incl. destructuring)"""
+        tokens = self.tokens
+        for i in self.body_tokens(handler, nested=True):
+            if tokens[i].kind == "ident" and tokens[i].value in ("const", "let", "var"):
+                j = i + 1
+                if self._is(j, "{") or self._is(j, "["):
+                    last = self.partner[j]
+                    if any(tokens[k].value == name and tokens[k].kind == "ident"
+                           and not self._is(k + 1, ":") for k in range(j + 1, last)):
+                        return True
+                elif j < len(tokens) and tokens[j].value == name:
+                    return True
+        return False
+
+    def import_declarations(self):
+        """(first, last, module, names) for each import ... from '...' declaration; names are local bindings"""
+        tokens = self.tokens
+        found = []
+        for i, token in enumerate(tokens):
+            if token.kind != "ident" or token.value != "import" or self._is(i + 1, "(") or self._is(i + 1, "."):
+                continue
+            names = []
+            j = i + 1
+            while j < len(tokens) and not (self._is(j, "from") and j + 1 < len(tokens)
+                                           and tokens[j + 1].kind == "string"):
+                if self._is(j, ";") or tokens[j].kind == "string":
+                    break
+                if tokens[j].kind == "ident" and tokens[j].value not in ("type", "as") and not self._is(j + 1, "as"):
+                    names.append(tokens[j].value)
+                j += 1
+            if not self._is(j, "from"):
+                continue
+            last = j + 2 if self._is(j + 2, ";") else j + 1
+            found.append((i, last, tokens[j + 1].value[1:-1], names))
+        return found
+
+    def imports(self):
+        """{local name: module} for the file's import declarations"""
+        return {name: module for _, _, module, names in self.import_declarations() for name in names}
+
+    def parameters(self, handler):
+        """Token index of the "(" opening the handler's parameter list, or -1 (wrapped handlers)"""
+        if handler.open < 0:
+            return -1
+        if self._starts is None:
+            self._starts = [t.start for t in self.tokens]
+        i = bisect.bisect_left(self._starts, handler.start)
+        while i < handler.open:
+            if self._is(i, "("):
+                return i
+            i += 1
+        return -1
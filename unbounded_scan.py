@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Unbounded Query Scan
+Flags Supabase reads in API routes that can return a whole table: no
+.range(), .limit(), .single()/.maybeSingle(), head-only count or .eq('id')
+anywhere on the chain, or on the query builder variable it is stored in.
+Two patterns that hold an entire result set in memory are flagged on top:
+an unbounded result (or anything derived from it) passed to the response,
+and a loop that pages through a table with .range() while pushing every
+page into one array. Routes are listed worst first, one line per route in
+the same format as the auth codemods.
+
+Usage:
+  python unbounded_scan.py                      # every route with unbounded reads
+  python unbounded_scan.py --prefix admin/
+  python unbounded_scan.py --json-out unbounded.json
+"""
+
+import argparse
+import json
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from query_chains import QuerySource
+from route_scan import API_DIR, POOL_THRESHOLD, RouteScan, route_name
+
+BOUNDING_METHODS = frozenset(["range", "limit", "single", "maybeSingle"])
+LOOP_KEYWORDS = frozenset(["for", "while", "do"])
+
+UNBOUNDED = "unbounded"
+RETURNED = "returned"
+ACCUMULATED = "accumulated"
+
+# Weight of each finding when ranking routes
+SCORES = {UNBOUNDED: 1, RETURNED: 2, ACCUMULATED: 2}
+
+
+def is_bounded(query, chain):
+    names = query.method_names(chain)
+    if names & BOUNDING_METHODS:
+        return True
+    for call in chain.calls:
+        if call.name == "select" and query.args_contain(call, "head"):
+            return True
+        if call.name == "eq" and query.first_arg(call) == "id":
+            return True
+    builder = query.builder_name(chain)
+    if builder is not None:
+        return bool(query.builder_calls(builder, chain.end, query.scope_end(chain)) & BOUNDING_METHODS)
+    return False
+
+def derived_names(query, names, start, end):
+    """names plus every variable declared from them (transitively) in start..end"""
+    names = set(names)
+    tokens = query.tokens
+    k = start
+    while k < end:
+        if tokens[k].kind == "ident" and tokens[k].value in ("const", "let", "var") and k + 1 < end:
+            target = k + 1
+            equals = target + 1 if tokens[target].kind == "ident" else query.partner[target] + 1
+            if 0 < equals < end and query._is(equals, "="):
+                last = query.source._block_statement_end(equals + 1, end)
+                if any(tokens[m].kind == "ident" and tokens[m].value in names and not query._is(m - 1, ".")
+                       for m in range(equals + 1, last + 1)):
+                    names |= {tokens[m].value for m in range(target, equals)
+                              if tokens[m].kind == "ident" and not query._is(m + 1, ":")}
+        k += 1
+    return names
+
+def reaches_response(query, names, start, end):
+    """True if any of names is used in NextResponse.json(...) / new Response(...) in start..end"""
+    tokens = query.tokens
+    for k in range(start, end):
+        if query._is(k, "json") and query._is(k - 1, ".") and query._is(k - 2, "NextResponse"):
+            args = k + 1
+        elif query._is(k, "new") and (query._is(k + 1, "NextResponse") or query._is(k + 1, "Response")):
+            args = k + 2
+        else:
+            continue
+        if not query._is(args, "(") or query.partner[args] < 0:
+            continue
+        if any(tokens[m].kind == "ident" and tokens[m].value in names and not query._is(m - 1, ".")
+               for m in range(args + 1, query.partner[args])):
+            return True
+    return False
+
+def accumulating_loops(query):
+    """(token index, table) of loops paging with .range() and pushing every page into an array"""
+    found = []
+    tokens = query.tokens
+    for k, token in enumerate(tokens):
+        if token.kind != "ident" or token.value not in LOOP_KEYWORDS:
+            continue
+        body = k + 1
+        if query._is(body, "("):
+            body = query.partner[body] + 1
+        if not query._is(body, "{") or query.partner[body] < 0:
+            continue
+        end = query.partner[body]
+        paged = [c.table for c in query.chains if body < c.start < end and "range" in query.method_names(c)]
+        # Paging through a builder stored before the loop: base.range(...)
+        paged += [c.table for c in query.chains if c.end < k and query.builder_name(c) is not None
+                  and "range" in query.builder_calls(query.builder_name(c), body, end)]
+        pushes = any(query._is(m, "push") and query._is(m - 1, ".") for m in range(body, end))
+        if paged and pushes:
+            found.append((k, paged[0]))
+    return found
+
+def scan_file(path):
+    """[{method, line, table, kind}] for one route file"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if b".from(" not in data:
+        return []
+    query = QuerySource(data.decode("utf-8", "replace"))
+    handlers = [(h.method, h.start, h.end) for h in query.source.handlers()]
+
+    def method_at(offset):
+        return next((m for m, start, end in handlers if start <= offset < end), None)
+
+    findings = []
+    for chain in query.chains:
+        if query.is_write(chain) or "select" not in query.method_names(chain) or is_bounded(query, chain):
+            continue
+        names = query.result_names(chain)
+        builder = query.builder_name(chain)
+        scope_end = query.scope_end(chain)
+        if builder is not None:
+            names |= query.awaited_builder_results(builder, chain.end, scope_end)
+        kind = UNBOUNDED
+        if names and reaches_response(query, derived_names(query, names, chain.end, scope_end),
+                                      chain.end, scope_end):
+            kind = RETURNED
+        findings.append({"method": method_at(query.tokens[chain.start].start), "line": chain.line,
+                         "table": chain.table, "kind": kind})
+    for k, table in accumulating_loops(query):
+        findings.append({"method": method_at(query.tokens[k].start), "line": query.line(k),
+                         "table": table, "kind": ACCUMULATED})
+    return findings
+
+def scan_unbounded(api_dir, workers=None, prefix=""):
+    """(rows worst first, RouteScan): one row per route with findings"""
+    scan = RouteScan(api_dir).run(workers)
+    relpaths = [r for r in scan.routes if r.startswith(prefix)]
+    paths = [str(Path(api_dir) / r) for r in relpaths]
+    if len(paths) >= POOL_THRESHOLD and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(scan_file, paths, chunksize=16))
+    else:
+        results = [scan_file(p) for p in paths]
+
+    rows = []
+    for relpath, findings in zip(relpaths, results):
+        if findings:
+            rows.append({
+                "route": route_name(relpath),
+                "score": sum(SCORES[f["kind"]] for f in findings),
+                "findings": findings,
+            })
+    rows.sort(key=lambda r: (-r["score"], r["route"]))
+    return rows, scan
+
+def describe(finding):
+    text = f"{finding['method'] or '-'} {finding['table']}:L{finding['line']}"
+    return text if finding["kind"] == UNBOUNDED else f"{text} {finding['kind']}"
+
+def main():
+    parser = argparse.ArgumentParser(description="Flag Supabase queries without a row limit")
+    parser.add_argument("--api-dir", default=str(API_DIR), help="src/app/api directory")
+    parser.add_argument("--prefix", default="", help="only routes under this path (e.g. admin/)")
+    parser.add_argument("--json-out", metavar="PATH", help="write the findings as JSON")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size")
+    args = parser.parse_args()
+
+    rows, scan = scan_unbounded(args.api_dir, args.workers, args.prefix)
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=1)
+
+    print("=" * 60)
+    print(f"UNBOUNDED QUERIES ({len(rows)} of {len(scan.routes)} route files)")
+    print("=" * 60 + "\n")
+    for row in rows:
+        marker = "✗" if any(f["kind"] != UNBOUNDED for f in row["findings"]) else "⚠"
+        print(f"{marker} UNBOUNDED: {row['route']} ({', '.join(describe(f) for f in row['findings'])})")
+
+    findings = [f for row in rows for f in row["findings"]]
+    print("\n" + "=" * 60)
+    print("UNBOUNDED QUERY SUMMARY")
+    print("=" * 60)
+    print(f"Unbounded reads: {sum(1 for f in findings if f['kind'] != ACCUMULATED)}")
+    print(f"  returned in the response: {sum(1 for f in findings if f['kind'] == RETURNED)}")
+    print(f"Loops collecting every page: {sum(1 for f in findings if f['kind'] == ACCUMULATED)}")
+    print(f"Routes affected: {len(rows)}")
+    print("=" * 60 + "\n")
+
+if __name__ == "__main__":
+    main()